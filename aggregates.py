@@ -0,0 +1,49 @@
+DOCUMENT_REFERENCES = 'all document references'
+
+# Counted keys; they match the status filters in the UI
+STATUS_FILTERS = ('all', 'pending', 'yes', 'no')
+
+def is_document_reference(item):
+    """"All Document References" rows are not shown in the UI or counted"""
+    return DOCUMENT_REFERENCES in (item.get('description') or '').lower()
+
+def status_filter(status):
+    """UI status filter an item status falls under, or None"""
+    if status in ('Pending', ''):
+        return 'pending'
+    if status == 'Yes':
+        return 'yes'
+    if status == 'No':
+        return 'no'
+    return None
+
+def empty_counts():
+    return dict.fromkeys(STATUS_FILTERS, 0)
+
+def count_items(items):
+    """{all, pending, yes, no} counts of a list of bid items, skipping document reference rows"""
+    counts = empty_counts()
+    for item in items:
+        if is_document_reference(item):
+            continue
+        counts['all'] += 1
+        key = status_filter(item.get('status'))
+        if key is not None:
+            counts[key] += 1
+    return counts
+
+class ScopeAggregator:
+    """Collects the status counts of a scope's groups as they are written"""
+
+    def __init__(self):
+        self.totals = empty_counts()
+        self.groups = {}
+
+    def add_group(self, name, items):
+        counts = count_items(items)
+        self.groups[name] = counts
+        for key, value in counts.items():
+            self.totals[key] += value
+
+    def to_dict(self):
+        return {**self.totals, 'groups': self.groups}
@@ -3,16 +3,37 @@ let currentScope = 'electrical-by-masterformat';
 let currentFilter = 'all';
 let expandedCategories = new Set();
 let bidItemsData = {};
+let scopeFiles = null; // Set when data.json is a sharded index ({scopes, scopeFiles})
+let scopeAggregates = {}; // Per-scope and per-group status counts from data.json
+let refTables = null; // Set when data.json stores references as IDs ({categories, sheets, specs})
+let expandedScopes = new Set(); // Scopes whose references have been expanded from refTables
 let packageMappingData = {};
 let currentView = 'scopes'; // 'scopes' or 'packageMapping'
+let dataVersion = null; // data.json version last announced by the server's /events stream
+let apiMode = false; // Set when server.py answers /api/ queries; items are then fetched a page at a time
+let itemPages = {}; // API mode: loaded items per scope, package and status filter
+const PAGE_SIZE = 200;
+let scopeNames = {}; // Scope id -> name, for labelling search results
+let searchRequest = 0; // Increments per search so only the latest response is rendered
+let searchTimer = null;
+const SEARCH_RESULTS = 50;
+const NEXT_STATUS = { 'Pending': 'Yes', '': 'Yes', 'Yes': 'No', 'No': 'Pending' };
 
 // Load data
 async function loadData() {
     try {
-        const response = await fetch('data.json');
-        const data = await response.json();
-        bidItemsData = data.bidItems;
-        renderScopes(data.scopes);
+        let scopes = await loadScopesFromApi();
+        if (!scopes) {
+            const response = await fetch('data.json');
+            const data = await response.json();
+            bidItemsData = data.bidItems || {};
+            scopeFiles = data.scopeFiles || null;
+            scopeAggregates = data.aggregates || {};
+            refTables = data.refTables || null;
+            scopes = data.scopes;
+        }
+        renderScopes(scopes);
+        await loadScopeData(currentScope);
         populateCategoryFilter(currentScope);
         renderBidItems(currentScope);
         
@@ -25,6 +46,142 @@ async function loadData() {
     }
 }
 
+// Scope list from the server's query API, or null when the page is served statically
+async function loadScopesFromApi() {
+    try {
+        const response = await fetch('api/scopes');
+        if (!response.ok) return null;
+        const data = await response.json();
+        apiMode = true;
+        bidItemsData = {};
+        scopeAggregates = {};
+        itemPages = {};
+        return data.scopes;
+    } catch (error) {
+        return null;
+    }
+}
+
+// Projects hosted by server.py; each one's page is /projects/<id>/, the default one's also /
+async function loadProjects() {
+    try {
+        const response = await fetch('api/projects');
+        if (!response.ok) return;
+        const data = await response.json();
+        const list = document.getElementById('projectList');
+        list.innerHTML = '';
+        data.projects.forEach(project => {
+            const link = document.createElement('a');
+            link.className = 'nav-item clickable project-link' + (project.id === data.current ? ' active' : '');
+            link.href = project.id === data.default ? '/' : `/projects/${encodeURIComponent(project.id)}/`;
+            link.textContent = project.name;
+            list.appendChild(link);
+        });
+    } catch (error) {
+        // Served statically: no project list
+    }
+}
+
+// API mode: package counts of a scope; items are fetched when a package is expanded
+async function loadScopePackages(scopeId) {
+    const response = await fetch(`api/scopes/${encodeURIComponent(scopeId)}/packages`);
+    if (!response.ok) {
+        throw new Error(`Failed to fetch packages of ${scopeId}`);
+    }
+    const data = await response.json();
+    const aggregate = { all: 0, pending: 0, yes: 0, no: 0, groups: {} };
+    data.packages.forEach(({ name, ...counts }) => {
+        Object.keys(counts).forEach(key => aggregate[key] += counts[key]);
+        aggregate.groups[name] = counts;
+    });
+    scopeAggregates[scopeId] = aggregate;
+    bidItemsData[scopeId] = {};
+}
+
+// API mode: the loaded items of a package for a status filter. The first page is
+// fetched on first use and the next one when more is set; the scope is re-rendered
+// once a page arrives
+function loadItemPage(scopeId, category, status, more = false) {
+    const key = JSON.stringify([scopeId, category, status]);
+    let page = itemPages[key];
+    if (!page) {
+        page = itemPages[key] = { items: [], total: null, loading: null };
+        more = true;
+    }
+    if (more && !page.loading) {
+        const params = new URLSearchParams({ package: category, status, offset: page.items.length, limit: PAGE_SIZE });
+        page.loading = fetch(`api/scopes/${encodeURIComponent(scopeId)}/items?${params}`)
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`Failed to fetch items of ${category}`);
+                }
+                return response.json();
+            })
+            .then(data => {
+                page.items.push(...data.items);
+                page.total = data.total;
+            })
+            .catch(error => console.error('Error loading bid items:', error))
+            .finally(() => {
+                page.loading = null;
+                if (currentScope === scopeId) renderBidItems(scopeId);
+            });
+    }
+    return page;
+}
+
+// API mode: drop everything loaded for a scope so it is fetched again
+function clearApiScope(scopeId) {
+    delete bidItemsData[scopeId];
+    delete scopeAggregates[scopeId];
+    for (const key of Object.keys(itemPages)) {
+        if (JSON.parse(key)[0] === scopeId) delete itemPages[key];
+    }
+}
+
+// Load a single scope's bid items when data.json is a sharded index
+async function loadScopeData(scopeId) {
+    if (apiMode) {
+        if (!scopeAggregates[scopeId]) {
+            await loadScopePackages(scopeId);
+        }
+        return;
+    }
+    
+    if (!bidItemsData[scopeId] && scopeFiles && scopeFiles[scopeId]) {
+        const response = await fetch(scopeFiles[scopeId]);
+        if (!response.ok) {
+            throw new Error(`Failed to fetch ${scopeFiles[scopeId]}`);
+        }
+        bidItemsData[scopeId] = await response.json();
+    }
+    
+    if (refTables && bidItemsData[scopeId] && !expandedScopes.has(scopeId)) {
+        bidItemsData[scopeId] = expandScopeRefs(bidItemsData[scopeId]);
+        expandedScopes.add(scopeId);
+    }
+}
+
+// Expand [category id, item id, ...] references of a normalized data.json
+// (see interned_refs.py) back to {category, count, items}
+function expandScopeRefs(groups) {
+    const expandRefs = (refs, table) => (refs || []).map(ref => ({
+        category: refTables.categories[ref[0]],
+        count: ref.length - 1,
+        items: ref.slice(1).map(id => table[id])
+    }));
+    
+    const expanded = {};
+    for (const [group, items] of Object.entries(groups)) {
+        expanded[group] = items.map(item => ({
+            ...item,
+            drawingRefs: expandRefs(item.drawingRefs, refTables.sheets),
+            specRefs: expandRefs(item.specRefs, refTables.specs)
+        }));
+    }
+    return expanded;
+}
+
 // Load package mapping data
 async function loadPackageMappingData() {
     try {
@@ -50,16 +207,114 @@ async function loadPackageMappingData() {
     }
 }
 
+// Follow data.json rebuilds when the server runs with --watch; without it /events
+// answers 404 and EventSource gives up
+function watchDataChanges() {
+    if (!window.EventSource) return;
+    const events = new EventSource('events');
+    
+    // Sent on every (re)connect: reload everything if an update was missed meanwhile
+    events.addEventListener('hello', (e) => {
+        const { version } = JSON.parse(e.data);
+        if (dataVersion !== null && version !== dataVersion) {
+            loadData();
+        }
+        dataVersion = version;
+    });
+    
+    events.addEventListener('data', async (e) => {
+        const { scopes, version } = JSON.parse(e.data);
+        dataVersion = version;
+        for (const scopeId of scopes) {
+            await refreshScope(scopeId);
+        }
+    });
+    
+    events.addEventListener('packages', async () => {
+        await loadPackageMappingData();
+        if (currentView === 'packageMapping') {
+            const activeTab = document.querySelector('.package-tab.active');
+            renderPackageMapping(activeTab ? activeTab.dataset.scope : 'electrical');
+        }
+    });
+}
+
+// Refetch one rebuilt scope (already expanded by the server) instead of all of data.json
+async function refreshScope(scopeId) {
+    if (!document.querySelector(`.scope-item[data-scope-id="${scopeId}"]`)) {
+        await loadData(); // New scope: the scope list changed too
+        return;
+    }
+    try {
+        if (apiMode) {
+            clearApiScope(scopeId);
+            await loadScopePackages(scopeId);
+        } else {
+            const response = await fetch(`scope-data/${encodeURIComponent(scopeId)}`);
+            if (!response.ok) {
+                throw new Error(`Failed to fetch scope-data/${scopeId}`);
+            }
+            const data = await response.json();
+            bidItemsData[scopeId] = data.bidItems;
+            scopeAggregates[scopeId] = data.aggregates;
+            expandedScopes.add(scopeId);
+        }
+    } catch (error) {
+        console.error('Error refreshing scope:', error);
+        return;
+    }
+    
+    if (scopeId === currentScope) {
+        populateCategoryFilter(scopeId);
+        renderBidItems(scopeId);
+    }
+}
+
+// Hidden "All Document References" rows
+function isDocumentReference(item) {
+    return item.description && item.description.toLowerCase().includes('all document references');
+}
+
+// Status filter an item belongs to ('pending', 'yes', 'no') or null
+function statusFilterOf(status) {
+    if (status === 'Pending' || status === '') return 'pending';
+    if (status === 'Yes') return 'yes';
+    if (status === 'No') return 'no';
+    return null;
+}
+
+// Status counts of a scope and its groups, excluding document reference rows.
+// Precomputed by the generators; counted once here for an older data.json without them.
+function getScopeAggregate(scopeId) {
+    if (!scopeAggregates[scopeId] && bidItemsData[scopeId]) {
+        const aggregate = { all: 0, pending: 0, yes: 0, no: 0, groups: {} };
+        for (const [group, items] of Object.entries(bidItemsData[scopeId])) {
+            const counts = { all: 0, pending: 0, yes: 0, no: 0 };
+            items.forEach(item => {
+                if (isDocumentReference(item)) return;
+                counts.all++;
+                const key = statusFilterOf(item.status);
+                if (key) counts[key]++;
+            });
+            Object.keys(counts).forEach(key => aggregate[key] += counts[key]);
+            aggregate.groups[group] = counts;
+        }
+        scopeAggregates[scopeId] = aggregate;
+    }
+    return scopeAggregates[scopeId] || null;
+}
+
 // Populate category filter dropdown
 function populateCategoryFilter(scopeId) {
     const categoryList = document.getElementById('categoryList');
-    if (!categoryList || !bidItemsData[scopeId]) return;
+    const aggregate = getScopeAggregate(scopeId);
+    if (!categoryList || !aggregate) return;
     
     // Clear existing options
     categoryList.innerHTML = '';
     
     // Get all categories for current scope
-    const categories = Object.keys(bidItemsData[scopeId]).sort();
+    const categories = Object.keys(aggregate.groups).sort();
     
     categories.forEach(category => {
         const label = document.createElement('label');
@@ -76,9 +331,7 @@ function populateCategoryFilter(scopeId) {
         
         const text = document.createElement('span');
         text.className = 'checkbox-text';
-        const itemCount = bidItemsData[scopeId][category].filter(item => 
-            !item.description || !item.description.toLowerCase().includes('all document references')
-        ).length;
+        const itemCount = aggregate.groups[category].all;
         text.innerHTML = `${category} <span style="color: #999; margin-left: 8px;">(${itemCount} items)</span>`;
         
         label.appendChild(checkbox);
@@ -155,6 +408,7 @@ function renderScopes(scopes) {
     scopesList.innerHTML = '';
     
     scopes.forEach(scope => {
+        scopeNames[scope.id] = scope.name;
         const scopeItem = document.createElement('div');
         scopeItem.className = 'scope-item';
         scopeItem.dataset.scopeId = scope.id; // Store scope ID as data attribute
@@ -175,7 +429,7 @@ function renderScopes(scopes) {
 }
 
 // Select scope
-function selectScope(scopeId) {
+async function selectScope(scopeId) {
     currentScope = scopeId;
     expandedCategories.clear();
     
@@ -187,6 +441,15 @@ function selectScope(scopeId) {
         }
     });
     
+    try {
+        await loadScopeData(scopeId);
+    } catch (error) {
+        console.error('Error loading scope data:', error);
+    }
+    
+    // Ignore the result if another scope was selected while this one loaded
+    if (currentScope !== scopeId) return;
+    
         populateCategoryFilter(scopeId);
         renderBidItems(scopeId);
         
@@ -206,7 +469,8 @@ function renderBidItems(scopeId) {
     }
     
     const categories = bidItemsData[scopeId];
-    const sortedCategories = Object.keys(categories).sort();
+    const aggregate = getScopeAggregate(scopeId);
+    const sortedCategories = Object.keys(aggregate.groups).sort();
     
     let allCount = 0;
     let pendingCount = 0;
@@ -214,26 +478,31 @@ function renderBidItems(scopeId) {
     let noCount = 0;
     
     sortedCategories.forEach(category => {
-        const items = categories[category];
-        // Filter out "All Document References" items
-        const itemsWithoutDocRefs = items.filter(item => 
-            !item.description || !item.description.toLowerCase().includes('all document references')
-        );
-        const filteredItems = filterItems(itemsWithoutDocRefs);
+        // Counts exclude "All Document References" items
+        const counts = aggregate.groups[category];
         
-        if (filteredItems.length === 0) return;
+        // Skip categories with nothing matching the current filter without scanning their items
+        if (counts[currentFilter] === 0) return;
         
-        allCount += itemsWithoutDocRefs.length;
-        itemsWithoutDocRefs.forEach(item => {
-            if (item.status === 'Pending' || item.status === '') pendingCount++;
-            else if (item.status === 'Yes') yesCount++;
-            else if (item.status === 'No') noCount++;
-        });
+        allCount += counts.all;
+        pendingCount += counts.pending;
+        yesCount += counts.yes;
+        noCount += counts.no;
+        
+        const isExpanded = expandedCategories.has(category);
+        let filteredItems;
+        let page = null;
+        if (apiMode) {
+            // Only expanded packages are fetched, already filtered by the server
+            page = isExpanded ? loadItemPage(scopeId, category, currentFilter) : null;
+            filteredItems = page ? page.items : [];
+        } else {
+            filteredItems = filterItems(categories[category].filter(item => !isDocumentReference(item)));
+        }
         
         // Create category accordion row
         const categoryRow = document.createElement('tr');
         categoryRow.className = 'category-row';
-        const isExpanded = expandedCategories.has(category);
         if (isExpanded) {
             categoryRow.classList.add('expanded');
         }
@@ -245,7 +514,7 @@ function renderBidItems(scopeId) {
             <td colspan="5">
                 <div class="category-header">
                     <span class="category-arrow">▶</span>
-                    <span class="category-name">${category} (${itemsWithoutDocRefs.length} items)</span>
+                    <span class="category-name">${category} (${counts.all} items)</span>
                 </div>
             </td>
         `;
@@ -284,13 +553,174 @@ function renderBidItems(scopeId) {
                 </td>
             `;
             
+            if (apiMode) {
+                const icon = itemRow.querySelector('.status-icon');
+                icon.classList.add('editable');
+                icon.title = `${item.status || 'Pending'} (click to change)`;
+                icon.addEventListener('click', () => changeStatus(scopeId, item));
+            }
+            
             tbody.appendChild(itemRow);
         });
+        
+        if (page && (page.loading || page.total > page.items.length)) {
+            tbody.appendChild(createMoreItemsRow(scopeId, category, page));
+        }
     });
     
     updateCounts(allCount, pendingCount, yesCount, noCount);
 }
 
+// API mode: move an item to the next status (Pending -> Yes -> No) and save it through server.py
+async function changeStatus(scopeId, item) {
+    const status = NEXT_STATUS[item.status] || 'Yes';
+    try {
+        const response = await fetch(`api/items/${encodeURIComponent(scopeId)}/${encodeURIComponent(item.itemNumber)}/status`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ status })
+        });
+        if (!response.ok) {
+            throw new Error(`Failed to save the status of item ${item.itemNumber}`);
+        }
+    } catch (error) {
+        console.error('Error saving status:', error);
+        alert(`Could not save the status of item ${item.itemNumber}.`);
+        return;
+    }
+    await refreshScope(scopeId);
+}
+
+// API mode: "Loading..." while a page is in flight, otherwise a row that fetches the next page
+function createMoreItemsRow(scopeId, category, page) {
+    const row = document.createElement('tr');
+    row.className = 'bid-item-row';
+    if (page.loading) {
+        row.innerHTML = '<td class="checkbox-col"></td><td colspan="5" class="empty-state">Loading...</td>';
+    } else {
+        const remaining = page.total - page.items.length;
+        row.innerHTML = `<td class="checkbox-col"></td><td colspan="5" class="empty-state"><a href="#">Show ${Math.min(remaining, PAGE_SIZE)} more (${remaining} not shown)</a></td>`;
+        row.querySelector('a').addEventListener('click', (e) => {
+            e.preventDefault();
+            loadItemPage(scopeId, category, currentFilter, true);
+            renderBidItems(scopeId);
+        });
+    }
+    return row;
+}
+
+// Search box in the bid items toolbar; results come from server.py's /search
+function toggleSearch() {
+    const input = document.getElementById('bidItemSearch');
+    const button = document.querySelector('.view-controls .search-icon');
+    const open = input.style.display === 'none';
+    input.style.display = open ? '' : 'none';
+    button.classList.toggle('active', open);
+    if (open) {
+        input.focus();
+        if (input.value.trim()) runSearch(input.value);
+    } else {
+        closeSearch();
+    }
+}
+
+function closeSearch() {
+    const input = document.getElementById('bidItemSearch');
+    input.value = '';
+    input.style.display = 'none';
+    document.querySelector('.view-controls .search-icon')?.classList.remove('active');
+    searchRequest++;
+    renderBidItems(currentScope);
+}
+
+async function runSearch(query) {
+    const request = ++searchRequest;
+    if (query.trim().length < 2) {
+        renderBidItems(currentScope);
+        return;
+    }
+    
+    let result = null;
+    let message = 'Search is available when the UI is served by server.py';
+    try {
+        const response = await fetch(`search?q=${encodeURIComponent(query)}&limit=${SEARCH_RESULTS}`);
+        if (response.ok) {
+            result = await response.json();
+        } else if (response.status === 404) {
+            message = 'No search index found. Please run generate_data.py first.';
+        }
+    } catch (error) {
+        console.error('Error searching:', error);
+    }
+    
+    // A newer search (or closing the box) supersedes this one
+    if (request !== searchRequest) return;
+    renderSearchResults(result, message);
+}
+
+function renderSearchResults(result, message) {
+    const tbody = document.getElementById('bidItemsBody');
+    tbody.innerHTML = '';
+    
+    if (!result) {
+        tbody.innerHTML = `<tr><td colspan="6" class="empty-state">${message}</td></tr>`;
+        return;
+    }
+    if (result.results.length === 0) {
+        // The query is user input echoed by the server: set it as text, never as markup
+        tbody.innerHTML = '<tr><td colspan="6" class="empty-state"></td></tr>';
+        tbody.querySelector('.empty-state').textContent = `No bid items match "${result.query}"`;
+        return;
+    }
+    
+    const summary = document.createElement('tr');
+    summary.className = 'category-row expanded';
+    const shown = result.results.length < result.total ? `top ${result.results.length} of ` : '';
+    summary.innerHTML = `
+        <td class="checkbox-col"></td>
+        <td colspan="5">
+            <div class="category-header">
+                <span class="category-name">Search results: ${shown}${result.total} items</span>
+            </div>
+        </td>
+    `;
+    tbody.appendChild(summary);
+    
+    result.results.forEach(match => {
+        const row = document.createElement('tr');
+        row.className = 'bid-item-row search-result-row';
+        row.innerHTML = `
+            <td class="checkbox-col"></td>
+            <td class="number-col">
+                <span class="item-number"></span>
+            </td>
+            <td class="description-col">
+                <span class="status-icon">${getStatusIcon(match.status)}</span>
+                <span class="item-description"></span>
+            </td>
+            <td colspan="2" class="search-result-location"></td>
+            <td class="action-col">
+                <span class="action-arrow">›</span>
+            </td>
+        `;
+        row.querySelector('.item-number').textContent = match.itemNumber;
+        row.querySelector('.item-description').textContent = match.description;
+        row.querySelector('.search-result-location').textContent =
+            `${scopeNames[match.scope] || match.scope} › ${match.package}`;
+        row.addEventListener('click', () => openSearchResult(match));
+        tbody.appendChild(row);
+    });
+}
+
+// Show a search result in its scope with its package expanded
+async function openSearchResult(match) {
+    closeSearch();
+    await selectScope(match.scope);
+    if (currentScope !== match.scope) return;
+    expandedCategories.add(match.package);
+    renderBidItems(match.scope);
+}
+
 // Toggle category accordion
 function toggleCategory(category) {
     if (expandedCategories.has(category)) {
@@ -466,8 +896,20 @@ document.addEventListener('DOMContentLoaded', () => {
     // Select all categories checkbox
     document.getElementById('selectAllCategories')?.addEventListener('change', toggleSelectAllCategories);
     
+    // Bid item search
+    document.querySelector('.view-controls .search-icon')?.addEventListener('click', toggleSearch);
+    document.getElementById('bidItemSearch')?.addEventListener('input', (e) => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(() => runSearch(e.target.value), 150);
+    });
+    document.getElementById('bidItemSearch')?.addEventListener('keydown', (e) => {
+        if (e.key === 'Escape') closeSearch();
+    });
+    
     // Load data
+    loadProjects();
     loadData();
+    watchDataChanges();
 });
 
 // Fix scope selection - handled in renderScopes now
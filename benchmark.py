@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Benchmark the generation and export pipelines on synthetic datasets.
+
+For every dataset size a synthetic project (see synthetic_data.py) is written
+to a scratch directory and each stage is run in a fresh Python process, so
+peak RSS belongs to that stage alone. Wall time, peak RSS and output size are
+appended to benchmark_results.json, and each stage is compared with the last
+recorded run of the same stage and size; slowdowns or growth beyond the
+threshold are reported as regressions.
+
+    python benchmark.py --sizes 1k,10k,100k
+    python benchmark.py --sizes 1M --stages generate_data,generate_data_40th
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from synthetic_data import write_synthetic_dataset
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_FILE = 'benchmark_results.json'
+
+SIZE_PRESETS = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+DEFAULT_SIZES = '1k,10k'
+DEFAULT_THRESHOLD = 0.25
+
+# Differences smaller than these are noise, whatever the ratio
+MIN_DELTAS = {
+    'wall_time': 0.05,
+    'peak_rss': 5 * 1024 * 1024,
+    'output_bytes': 1024
+}
+
+# name: (module, function, working directory, output files relative to the project root)
+STAGES = {
+    'generate_data': ('generate_data', 'generate_data', '.', ['data.json']),
+    'generate_data_40th': ('generate_data_40th', 'process_40th_data', '.', ['data.json']),
+    'create_excel': ('create_excel', 'create_excel', 'Data', ['Data/Bid_Items_By_Category.xlsx']),
+    'create_package_mapping_excel': ('create_package_mapping_excel', 'create_package_mapping_excel', '.',
+                                     ['Package_Group_to_Spec_Mapping.xlsx']),
+    'create_grps_excel': ('export_grps_excel', 'create_grps_excel', '.', ['Data/GRPS_Scope_Items_Mapping.xlsx']),
+    'build_all': ('build_all', 'build_all', '.', ['data.json', 'Data/Bid_Items_By_Category.xlsx',
+                                                 'Package_Group_to_Spec_Mapping.xlsx',
+                                                 'Data/GRPS_Scope_Items_Mapping.xlsx', 'grps_index.json'])
+}
+
+# Files from an earlier stage or run that would let a stage skip work
+STALE_FILES = ['data.manifest.json', 'data.json', 'Data/.cache']
+
+def parse_size(text):
+    """'10k' or '10000' -> 10000"""
+    text = text.strip().lower()
+    if text in SIZE_PRESETS:
+        return SIZE_PRESETS[text]
+    try:
+        return int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"unknown size '{text}' (use 1k, 10k, 100k, 1M or a number)")
+
+def peak_rss_bytes():
+    """Peak resident set size of this process; ru_maxrss is KB on Linux and bytes on macOS"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def run_stage(name):
+    """Run one stage in this process and print its measurements as JSON (used by the child process)"""
+    module_name, function_name, _, _ = STAGES[name]
+    sys.path.insert(0, BASE_DIR)
+
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    import_time = time.perf_counter() - start
+
+    # Already loaded by the stage module; imported here so it is not counted outside import_time
+    import instrumentation
+
+    # Keep the stage's progress output out of the report
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), instrumentation.Session(name) as session:
+        result = getattr(module, function_name)()
+    wall_time = time.perf_counter() - start
+
+    print(json.dumps({
+        'wall_time': wall_time,
+        'import_time': import_time,
+        'peak_rss': peak_rss_bytes(),
+        'ok': result is not False,
+        'stages': session.trace['stages'],
+        'counters': session.trace['counters']
+    }))
+
+def clear_stale_files(root):
+    for relative in STALE_FILES:
+        path = os.path.join(root, relative)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+def output_size(root, outputs):
+    return sum(os.path.getsize(os.path.join(root, path)) for path in outputs
+               if os.path.exists(os.path.join(root, path)))
+
+def measure_stage(name, root, timeout=None):
+    """Run a stage in a fresh interpreter against the project in root and return its measurements"""
+    _, _, cwd, outputs = STAGES[name]
+    clear_stale_files(root)
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [BASE_DIR, os.environ.get('PYTHONPATH')])))
+    process = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--run-stage', name],
+        cwd=os.path.join(root, cwd), env=env, capture_output=True, text=True, timeout=timeout
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"{name} failed:\n{process.stderr.strip()}")
+
+    measurement = json.loads(process.stdout.strip().splitlines()[-1])
+    if not measurement.pop('ok'):
+        raise RuntimeError(f"{name} reported a failure")
+    measurement['output_bytes'] = output_size(root, outputs)
+    return measurement
+
+def load_results(results_file):
+    if not os.path.exists(results_file):
+        return {'runs': []}
+    with open(results_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_results(results_file, results):
+    temp_file = results_file + '.tmp'
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    os.replace(temp_file, results_file)
+
+def previous_measurements(results):
+    """Latest recorded measurement for each (stage, items)"""
+    previous = {}
+    for run in results['runs']:
+        for measurement in run['results']:
+            previous[(measurement['stage'], measurement['items'])] = measurement
+    return previous
+
+def find_regressions(measurement, previous, threshold):
+    """Metrics of measurement that grew more than threshold (and the noise floor) over previous"""
+    regressions = []
+    if previous is None:
+        return regressions
+    for metric, min_delta in MIN_DELTAS.items():
+        old, new = previous.get(metric), measurement.get(metric)
+        if old is None or new is None:
+            continue
+        if new - old > min_delta and new > old * (1 + threshold):
+            regressions.append(f"{metric} {format_metric(metric, old)} -> {format_metric(metric, new)}")
+    return regressions
+
+def format_metric(metric, value):
+    if metric == 'wall_time':
+        return f"{value:.2f}s"
+    if metric == 'peak_rss':
+        return f"{value / (1024 * 1024):.0f}MB"
+    return f"{value / 1024:,.0f}KB"
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmark(sizes, stages, results_file=RESULTS_FILE, threshold=DEFAULT_THRESHOLD,
+                  workdir=None, seed=0, timeout=None):
+    """Benchmark stages at every size, append the run to results_file and return the regressions"""
+    results = load_results(results_file)
+    previous = previous_measurements(results)
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'results': []
+    }
+    regressions = []
+
+    print(f"{'stage':<30} {'items':>9} {'time':>9} {'import':>8} {'peak RSS':>9} {'output':>11}")
+    scratch = workdir or tempfile.mkdtemp(prefix='bid-items-bench-')
+    try:
+        for items in sizes:
+            root = os.path.join(scratch, f'items_{items}')
+            if os.path.exists(root):
+                shutil.rmtree(root)
+            start = time.perf_counter()
+            write_synthetic_dataset(root, items, seed)
+            print(f"{'(synthetic dataset)':<30} {items:>9,} {time.perf_counter() - start:>8.2f}s")
+
+            for name in stages:
+                measurement = measure_stage(name, root, timeout)
+                measurement = {'stage': name, 'items': items, **measurement}
+                run['results'].append(measurement)
+
+                flagged = find_regressions(measurement, previous.get((name, items)), threshold)
+                regressions.extend(f"{name} @ {items:,}: {text}" for text in flagged)
+                print(f"{name:<30} {items:>9,} {measurement['wall_time']:>8.2f}s "
+                      f"{measurement['import_time']:>7.2f}s "
+                      f"{format_metric('peak_rss', measurement['peak_rss']):>9} "
+                      f"{format_metric('output_bytes', measurement['output_bytes']):>11}"
+                      + ('  REGRESSION' if flagged else ''))
+    finally:
+        if workdir is None:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    results['runs'].append(run)
+    save_results(results_file, results)
+    print(f"\nResults appended to {results_file}")
+
+    if regressions:
+        print(f"\nRegressions against the previous run (threshold {threshold:.0%}):")
+        for text in regressions:
+            print(f"  - {text}")
+    elif previous:
+        print("No regressions against the previous run.")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the generation and export pipelines on synthetic data')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f'comma-separated total bid item counts: 1k, 10k, 100k, 1M or numbers (default: {DEFAULT_SIZES})')
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help='comma-separated stages to run (default: all)')
+    parser.add_argument('--results', default=RESULTS_FILE,
+                        help=f'JSON file runs are appended to and compared against (default: {RESULTS_FILE})')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'relative growth flagged as a regression (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--workdir',
+                        help='keep the synthetic projects and outputs in this directory instead of a temporary one')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for the synthetic data (default: 0)')
+    parser.add_argument('--timeout', type=float, help='seconds before a single stage is abandoned')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='exit with status 1 when a regression is found')
+    parser.add_argument('--run-stage', choices=list(STAGES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        run_stage(args.run_stage)
+        sys.exit(0)
+
+    stages = [name.strip() for name in args.stages.split(',') if name.strip()]
+    unknown = [name for name in stages if name not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+    try:
+        sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    regressions = run_benchmark(sizes, stages, args.results, args.threshold,
+                                args.workdir and os.path.abspath(args.workdir), args.seed, args.timeout)
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
@@ -0,0 +1,169 @@
+import os
+import threading
+
+from aggregates import STATUS_FILTERS, empty_counts, is_document_reference, status_filter
+from json_writer import read_data_json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def check_page_args(status, offset, limit):
+    """Raise ValueError for an unknown status filter or an offset/limit out of range"""
+    if status not in STATUS_FILTERS:
+        raise ValueError(f"status must be one of {', '.join(STATUS_FILTERS)}")
+    if offset < 0:
+        raise ValueError("offset must not be negative")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+class BidItemIndex:
+    """Queryable index of one data.json: scopes, their packages and each package's items.
+
+    Built once from read_data_json(), so every layout (pretty, compact,
+    sharded, normalized) is indexed the same way. Each package keeps its items
+    in file order, without the "All Document References" rows the UI hides,
+    plus one list per status filter, so counting and paging never scan items.
+    set_status() changes an item in place and rebuilds only its package's lists.
+    """
+
+    def __init__(self, output_data, version=None):
+        self.version = version
+        self.scopes = output_data['scopes']
+        self.aggregates = output_data['aggregates']
+        self.bid_items = output_data['bidItems']
+        self.packages = {}
+        # {scope id: {item number: (package, item)}} of the listed items, for set_status()
+        self.locations = {}
+        for scope_id, groups in self.bid_items.items():
+            packages = self.packages[scope_id] = {}
+            locations = self.locations[scope_id] = {}
+            for name, items in groups.items():
+                by_status = packages[name] = self._by_status(items)
+                for item in by_status['all']:
+                    locations[item['itemNumber']] = (name, item)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _by_status(items):
+        """{status filter: items} of a package, without document reference rows"""
+        by_status = {key: [] for key in STATUS_FILTERS}
+        for item in items:
+            if is_document_reference(item):
+                continue
+            by_status['all'].append(item)
+            key = status_filter(item.get('status'))
+            if key is not None:
+                by_status[key].append(item)
+        return by_status
+
+    def has_item(self, scope_id, item_number):
+        return item_number in self.locations.get(scope_id, {})
+
+    def set_status(self, scope_id, item_number, status):
+        """Change a listed item's status along with its package's lists and counts; False for an unknown item"""
+        with self.lock:
+            location = self.locations.get(scope_id, {}).get(item_number)
+            if location is None:
+                return False
+            package, item = location
+            item['status'] = status
+            # Readers holding the old lists or aggregates keep a consistent view
+            by_status = self.packages[scope_id][package] = self._by_status(self.bid_items[scope_id][package])
+            aggregate = self.aggregates.get(scope_id)
+            if aggregate is not None:
+                groups = {**aggregate['groups'], package: self._counts(by_status)}
+                totals = empty_counts()
+                for counts in groups.values():
+                    for key in STATUS_FILTERS:
+                        totals[key] += counts[key]
+                self.aggregates[scope_id] = {**totals, 'groups': groups}
+        return True
+
+    def _counts(self, by_status):
+        return {key: len(items) for key, items in by_status.items()}
+
+    def scope_list(self):
+        """Scopes with their total {all, pending, yes, no} counts"""
+        scopes = []
+        for scope in self.scopes:
+            totals = dict.fromkeys(STATUS_FILTERS, 0)
+            for by_status in self.packages.get(scope['id'], {}).values():
+                for key, items in by_status.items():
+                    totals[key] += len(items)
+            scopes.append({**scope, 'counts': totals})
+        return scopes
+
+    def package_list(self, scope_id):
+        """Packages of a scope in file order with their counts, or None for an unknown scope"""
+        packages = self.packages.get(scope_id)
+        if packages is None:
+            return None
+        return [{'name': name, **self._counts(by_status)} for name, by_status in packages.items()]
+
+    def items(self, scope_id, package=None, status='all', offset=0, limit=DEFAULT_PAGE_SIZE):
+        """One page of a scope's items, optionally from one package and status filter.
+
+        Returns {total, offset, limit, items} with each item's package added,
+        or None for an unknown scope or package; raises ValueError for an
+        invalid status, offset or limit.
+        """
+        check_page_args(status, offset, limit)
+        packages = self.packages.get(scope_id)
+        if packages is None:
+            return None
+        if package is not None:
+            if package not in packages:
+                return None
+            packages = {package: packages[package]}
+
+        total = 0
+        page = []
+        for name, by_status in packages.items():
+            items = by_status[status]
+            # Skip whole packages that end before the requested page
+            start = max(offset - total, 0)
+            total += len(items)
+            for item in items[start:start + limit - len(page)]:
+                page.append({**item, 'package': name})
+        return {'total': total, 'offset': offset, 'limit': limit, 'items': page}
+
+    def scope_data(self, scope_id):
+        """{scope, aggregates, bidItems} of one scope with references expanded, or None for an unknown scope"""
+        scope = next((s for s in self.scopes if s.get('id') == scope_id), None)
+        if scope is None:
+            return None
+        return {
+            'scope': scope,
+            'aggregates': self.aggregates.get(scope_id),
+            'bidItems': self.bid_items.get(scope_id, {})
+        }
+
+class BidItemIndexCache:
+    """The BidItemIndex of data.json, rebuilt when the file's size/mtime change.
+
+    on_load, when set, is called with every newly built index before it is
+    handed out (status_journal.py re-applies pending status changes with it).
+    """
+
+    def __init__(self, data_file='data.json'):
+        self.data_file = data_file
+        self.lock = threading.Lock()
+        self.stamp = None
+        self.index = None
+        self.on_load = None
+
+    def get(self):
+        stat = os.stat(self.data_file)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        with self.lock:
+            if stamp != self.stamp:
+                index = BidItemIndex(read_data_json(self.data_file), version=f'{stamp[0]}-{stamp[1]}')
+                if self.on_load is not None:
+                    self.on_load(index)
+                self.index, self.stamp = index, stamp
+            return self.index
+
+    def clear(self):
+        """Drop the loaded index; the next get() builds it again"""
+        with self.lock:
+            self.index, self.stamp = None, None
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Build data.json, grps_index.json and all three workbooks in one process.
+
+Each discipline's CSV, category and package files, *_package.txt spec map and
+grps_* JSON files are loaded once into a shared ProjectModel (see
+project_model.py) and every output is built from it, instead of running
+generate_data.py, create_excel.py, create_package_mapping_excel.py,
+export_grps_excel.py and grps_index.py as separate processes that each import
+pandas/openpyxl and reread the same inputs.
+
+    python build_all.py
+    python build_all.py --outputs data,grps --data-source 40th --compact
+    python build_all.py --project hotel-3
+"""
+
+import argparse
+import os
+import time
+
+import instrumentation
+import project_registry
+from create_excel import category_sheet_frame
+from create_package_mapping_excel import write_package_mapping_workbook
+from excel_format import new_table_workbook, write_dataframe_sheet
+from export_grps_excel import build_grps_workbook_from
+from generate_data import group_package_scope
+from generate_data_40th import group_40th_items
+from grps_index import GRPS_INDEX_FILE, save_grps_index
+from incremental import MANIFEST_FILE
+from instrumentation import count, stage
+from json_writer import DataJsonWriter, ScopeWriters
+from parallel import iter_timed
+from project_model import ProjectModel
+from search_index import SEARCH_INDEX_FILE, SearchIndexWriter
+
+OUTPUTS = ('data', 'categories', 'packages', 'grps', 'grps-index')
+DATA_SOURCES = ('packages', '40th')
+
+# Model inputs each output reads; with jobs > 1 they are loaded before the outputs are handed to workers
+OUTPUT_INPUTS = {
+    'data': ('bid_items', 'package_mapping'),
+    'data-40th': ('items_40th',),
+    'categories': ('bid_items', 'categories'),
+    'packages': ('package_specs',),
+    'grps': ('grps_index',),
+    'grps-index': ('grps_index',)
+}
+
+def build_data_json(model, output_file='data.json', data_source='packages', compact=False, sharded=False,
+                    normalized=False, sqlite_file=None):
+    """data.json as generate_data.py (package groups) or generate_data_40th.py (40th_*.json) writes it,
+    with search_index.json next to it, plus the SQLite database when sqlite_file is set"""
+    writer = DataJsonWriter(output_file, compact=compact, sharded=sharded, normalized=normalized)
+    database = None
+    if sqlite_file:
+        from sqlite_store import BidItemDatabaseWriter
+        database = BidItemDatabaseWriter(sqlite_file)
+    outputs = ScopeWriters({
+        'write_json': writer,
+        'write_sqlite': database,
+        'write_search_index': SearchIndexWriter(os.path.join(os.path.dirname(output_file), SEARCH_INDEX_FILE))
+    })
+    for discipline in model:
+        with stage('build_scope'):
+            if data_source == '40th':
+                items = discipline.items_40th
+                if items is None:
+                    print(f"Warning: {discipline.files['file_40th']} not found, skipping {discipline.name}")
+                    continue
+                scope = {'code': discipline.code, 'name': discipline.name, 'id': discipline.key}
+                result = scope, group_40th_items(discipline.name, items)
+            else:
+                result = group_package_scope(discipline.name, discipline.code, discipline.key,
+                                             discipline.bid_items, discipline.package_mapping)
+                if result is not None:
+                    result = result[:2]
+        if result is None:
+            continue
+        outputs.write_scope(*result)
+    written = outputs.close()
+    count('items_written', sum(total_items for _, total_items in writer.counts.values()))
+
+    # The incremental generators' manifest describes a data.json that no longer exists
+    manifest_file = os.path.join(os.path.dirname(output_file), MANIFEST_FILE)
+    if os.path.exists(manifest_file):
+        os.remove(manifest_file)
+    return written[0]
+
+def build_category_workbook(model, excel_file):
+    """Bid_Items_By_Category.xlsx, as create_excel.py writes it"""
+    wb = new_table_workbook()
+    for discipline in model:
+        with stage('prepare_rows'):
+            df = category_sheet_frame(discipline.bid_items, discipline.categories)
+        with stage('write_sheet'):
+            write_dataframe_sheet(wb, discipline.name, df)
+    with stage('save'):
+        wb.save(excel_file)
+    return excel_file
+
+def build_package_mapping_workbook(model, excel_file):
+    """Package_Group_to_Spec_Mapping.xlsx, as create_package_mapping_excel.py writes it"""
+    sheets = []
+    for discipline in model:
+        if discipline.package_specs is None:
+            print(f"Warning: {discipline.data_file('package_specs')} not found, skipping {discipline.name}")
+            continue
+        sheets.append((discipline.name, discipline.package_specs))
+    write_package_mapping_workbook(sheets, excel_file)
+    return excel_file
+
+def build_grps_workbook(model, excel_file):
+    """GRPS_Scope_Items_Mapping.xlsx, as export_grps_excel.py writes it"""
+    sheets = []
+    for discipline in model:
+        index = discipline.grps_index
+        if index is None:
+            print(f"Warning: no GRPS scope items for {discipline.key}, skipping")
+            continue
+        sheets.append((discipline.key, index['scopeItems'], index['contractItems']))
+    wb = build_grps_workbook_from(sheets)
+    with stage('save'):
+        wb.save(excel_file)
+    return excel_file
+
+def build_grps_index_file(model, output_file):
+    """grps_index.json, as grps_index.py writes it"""
+    index = {discipline.key: discipline.grps_index for discipline in model if discipline.grps_index is not None}
+    with stage('write_json'):
+        save_grps_index(index, output_file, model.data_dir)
+    return output_file
+
+def build_output(model, output, options):
+    """Build one output from the model and return the file written"""
+    data_dir = model.data_dir
+    output_dir = options['output_dir']
+    with stage(output):
+        if output == 'data':
+            return build_data_json(model, os.path.normpath(os.path.join(output_dir, 'data.json')),
+                                   options['data_source'], options['compact'], options['sharded'],
+                                   options['normalized'], options['sqlite_file'])
+        if output == 'categories':
+            return build_category_workbook(model, os.path.join(data_dir, 'Bid_Items_By_Category.xlsx'))
+        if output == 'packages':
+            return build_package_mapping_workbook(
+                model, os.path.normpath(os.path.join(output_dir, 'Package_Group_to_Spec_Mapping.xlsx')))
+        if output == 'grps':
+            return build_grps_workbook(model, os.path.join(data_dir, 'GRPS_Scope_Items_Mapping.xlsx'))
+        return build_grps_index_file(model, os.path.normpath(os.path.join(output_dir, GRPS_INDEX_FILE)))
+
+def load_inputs(model, outputs, data_source='packages'):
+    """Load every model input the outputs need, so worker processes receive them already parsed"""
+    with stage('load_inputs'):
+        for output in outputs:
+            key = 'data-40th' if output == 'data' and data_source == '40th' else output
+            for discipline in model:
+                for name in OUTPUT_INPUTS[key]:
+                    getattr(discipline, name)
+
+def build_all(outputs=OUTPUTS, data_dir='Data', data_source='packages', compact=False, sharded=False,
+              normalized=False, jobs=1, sqlite_file=None, root='.', output_dir='.'):
+    """Build the selected outputs from one shared ProjectModel and return the files written.
+    
+    The outputs are independent, so jobs > 1 builds them in a process pool;
+    the model is loaded once here and shipped to the workers. The 40th_*.json
+    files are read from root; data.json, its search index, grps_index.json and
+    Package_Group_to_Spec_Mapping.xlsx are written to output_dir, the other
+    workbooks to data_dir.
+    """
+    model = ProjectModel(data_dir, root)
+    os.makedirs(output_dir, exist_ok=True)
+    options = {'data_source': data_source, 'compact': compact, 'sharded': sharded, 'normalized': normalized,
+               'sqlite_file': sqlite_file, 'output_dir': output_dir}
+    outputs = [output for output in OUTPUTS if output in outputs]
+
+    start_time = time.perf_counter()
+    if jobs > 1 and len(outputs) > 1:
+        load_inputs(model, outputs, data_source)
+
+    written = []
+    tasks = [(output, (model, output, options)) for output in outputs]
+    for _, path, elapsed in iter_timed(build_output, tasks, jobs):
+        written.append(path)
+        print(f"  {path}: {elapsed:.3f}s")
+    print(f"Built {len(written)} outputs in {time.perf_counter() - start_time:.3f}s (jobs: {jobs})")
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build data.json, grps_index.json and all Excel workbooks in one pass')
+    parser.add_argument('--outputs', default=','.join(OUTPUTS),
+                        help=f"comma-separated outputs to build (default: {','.join(OUTPUTS)})")
+    parser.add_argument('--data-dir', help="directory with the CSV/TXT/JSON inputs (default: Data, or the "
+                                           "--project's Data directory)")
+    parser.add_argument('--data-source', choices=DATA_SOURCES,
+                        help='build data.json from the package grouping CSVs (generate_data.py) '
+                             "or from 40th_*.json (generate_data_40th.py) (default: the project's source, else packages)")
+    parser.add_argument('--compact', action='store_true',
+                        help='write data.json without indentation or whitespace')
+    parser.add_argument('--sharded', action='store_true',
+                        help='write one file per scope in data_scopes/ and a small scopes index in data.json')
+    parser.add_argument('--normalized', action='store_true',
+                        help='store drawing/spec references as IDs into shared tables instead of repeating the strings')
+    parser.add_argument('--sqlite', nargs='?', const='bid_items.db', metavar='FILE',
+                        help='with data.json, also write the bid items to a SQLite database (default file: bid_items.db)')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='number of worker processes used to build outputs in parallel (default: 1)')
+    project_registry.add_arguments(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    project = project_registry.project_from_args(parser, args, args.data_source)
+
+    outputs = [output.strip() for output in args.outputs.split(',') if output.strip()]
+    unknown = [output for output in outputs if output not in OUTPUTS]
+    if unknown:
+        parser.error(f"unknown output(s): {', '.join(unknown)} (choose from {', '.join(OUTPUTS)})")
+
+    with instrumentation.session_from_args('build_all', args):
+        build_all(outputs, args.data_dir or project.data_dir, project.source, args.compact, args.sharded,
+                  args.normalized, args.jobs, args.sqlite and project.output_path(args.sqlite), project.root,
+                  project.output_dir)
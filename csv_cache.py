@@ -0,0 +1,186 @@
+import json
+import os
+import sys
+import time
+
+# pandas is imported where a DataFrame is built, so importing this module stays cheap
+from incremental import fingerprint_file
+from instrumentation import count
+
+CACHE_DIR_NAME = '.cache'
+CACHE_INDEX = 'index.json'
+# Bump when the cleanup below changes so old cache files are not reused
+CACHE_VERSION = 1
+
+def _cache_format():
+    """Parquet when pyarrow is installed, otherwise pickle"""
+    try:
+        import pyarrow  # noqa: F401
+        return 'parquet'
+    except ImportError:
+        return 'pkl'
+
+def parse_bid_items_csv(csv_file):
+    """Parse and clean an exported *_BidItems.csv file.
+
+    Skips the "Project Name" and blank rows, strips spaces/quotes from the
+    headers, strips the leading tab the export puts in every cell and adds a
+    clean 'Item #' column from the first column ("\\t1" -> "1").
+    """
+    import pandas as pd
+
+    # Skip first two rows (Project Name and empty row)
+    df = pd.read_csv(csv_file, skiprows=2, encoding='utf-8')
+    # Clean column names (remove leading/trailing spaces and quotes)
+    df.columns = df.columns.str.strip().str.strip('"')
+
+    # Every exported cell starts with a tab
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.StringDtype):
+            df[column] = df[column].str.strip()
+        elif df[column].dtype == object:
+            df[column] = df[column].map(lambda value: value.strip() if isinstance(value, str) else value)
+
+    # Extract item number
+    df['Item #'] = df.iloc[:, 0].astype(str).str.strip().str.strip('"').str.strip()
+    return df
+
+class BidItemsCsvCache:
+    """Cleaned bid item DataFrames stored next to their CSV in a binary format.
+
+    Entries are keyed by the CSV's content hash, so an edited CSV is parsed
+    again and an unchanged one is loaded straight from the cache file.
+    """
+
+    def __init__(self, csv_file):
+        self.csv_file = csv_file
+        self.cache_dir = os.path.join(os.path.dirname(csv_file) or '.', CACHE_DIR_NAME)
+        self.index_file = os.path.join(self.cache_dir, CACHE_INDEX)
+        self.name = os.path.basename(csv_file)
+
+    def _load_index(self):
+        if not os.path.exists(self.index_file):
+            return {}
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return {}
+
+    def _save_index(self, index):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Parallel generator workers may write the index at the same time
+        temp_file = f'{self.index_file}.{os.getpid()}.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(temp_file, self.index_file)
+
+    def load(self):
+        """Return (DataFrame, cache hit)"""
+        index = self._load_index()
+        entry = index.get(self.name, {})
+        fingerprint = fingerprint_file(self.csv_file, entry.get('fingerprint'))
+
+        cache_file = entry.get('cache_file')
+        if (entry.get('version') == CACHE_VERSION and entry.get('fingerprint', {}).get('sha256') == fingerprint['sha256']
+                and cache_file and os.path.exists(os.path.join(self.cache_dir, cache_file))):
+            try:
+                return self._read(os.path.join(self.cache_dir, cache_file)), True
+            except Exception as e:
+                print(f"Warning: Could not read cache for {self.csv_file}, reparsing: {e}")
+
+        df = parse_bid_items_csv(self.csv_file)
+
+        cache_format = _cache_format()
+        new_cache_file = f"{self.name}.{fingerprint['sha256'][:16]}.{cache_format}"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._write(df, os.path.join(self.cache_dir, new_cache_file), cache_format)
+            if cache_file and cache_file != new_cache_file and os.path.exists(os.path.join(self.cache_dir, cache_file)):
+                os.remove(os.path.join(self.cache_dir, cache_file))
+            # Re-read the index in case another CSV's entry was written meanwhile
+            index = self._load_index()
+            index[self.name] = {
+                'version': CACHE_VERSION,
+                'fingerprint': fingerprint,
+                'cache_file': new_cache_file
+            }
+            self._save_index(index)
+        except OSError as e:
+            print(f"Warning: Could not write cache for {self.csv_file}: {e}")
+
+        return df, False
+
+    def clear(self):
+        """Remove this CSV's cache file and index entry"""
+        index = self._load_index()
+        entry = index.pop(self.name, None)
+        if entry and entry.get('cache_file'):
+            path = os.path.join(self.cache_dir, entry['cache_file'])
+            if os.path.exists(path):
+                os.remove(path)
+        if entry:
+            self._save_index(index)
+
+    @staticmethod
+    def _read(path):
+        import pandas as pd
+
+        if path.endswith('.parquet'):
+            return pd.read_parquet(path)
+        return pd.read_pickle(path)
+
+    @staticmethod
+    def _write(df, path, cache_format):
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        if cache_format == 'parquet':
+            df.to_parquet(temp_path, index=False)
+        else:
+            df.to_pickle(temp_path)
+        os.replace(temp_path, path)
+
+def read_bid_items_csv(csv_file, use_cache=True, verbose=True):
+    """Return the cleaned DataFrame for a *_BidItems.csv, empty if the file is missing"""
+    if not os.path.exists(csv_file):
+        import pandas as pd
+        return pd.DataFrame()
+
+    start = time.perf_counter()
+    if use_cache:
+        df, hit = BidItemsCsvCache(csv_file).load()
+    else:
+        df, hit = parse_bid_items_csv(csv_file), False
+    count('csv_cache_hits' if hit else 'csv_parsed')
+
+    if verbose:
+        source = 'cache' if hit else 'parsed CSV'
+        print(f"  Read {os.path.basename(csv_file)} from {source} in {time.perf_counter() - start:.3f}s")
+    return df
+
+def report_cold_warm(csv_files):
+    """Time a cold load (cache cleared) and a warm load of each CSV"""
+    print(f"{'CSV file':<45} {'cold':>9} {'warm':>9} {'speedup':>8}  format: {_cache_format()}")
+    for csv_file in csv_files:
+        if not os.path.exists(csv_file):
+            print(f"{os.path.basename(csv_file):<45} missing")
+            continue
+        cache = BidItemsCsvCache(csv_file)
+        cache.clear()
+
+        start = time.perf_counter()
+        cache.load()
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cache.load()
+        warm = time.perf_counter() - start
+
+        print(f"{os.path.basename(csv_file):<45} {cold:>8.3f}s {warm:>8.3f}s {cold / warm:>7.1f}x")
+
+if __name__ == '__main__':
+    files = sys.argv[1:] or [
+        'Data/26 00 00 - Electrical_BidItems.csv',
+        'Data/23 00 00 - Mechanical_BidItems.csv',
+        'Data/22 00 00 - Plumbing_BidItems.csv'
+    ]
+    report_cold_warm(files)
@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+import traceback
+
+from disciplines import DISCIPLINE_FILES
+from incremental import MANIFEST_FILE
+from json_writer import data_json_format
+
+WATCH_SOURCES = ('auto', 'packages', '40th')
+POLL_INTERVAL = 1.0
+
+# One rebuild of data.json at a time (the watcher and status write-back both rebuild it)
+REBUILD_LOCK = threading.Lock()
+
+def detect_source(manifest_file=MANIFEST_FILE):
+    """Generator the current data.json was built by, per data.manifest.json ('packages' when unknown)"""
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            generator = json.load(f).get('generator')
+    except (OSError, json.JSONDecodeError):
+        return 'packages'
+    return '40th' if generator == 'generate_data_40th' else 'packages'
+
+def watched_files(source, data_dir='Data', root='.'):
+    """{path: scope id} of the files data.json is built from, plus the *_package.txt spec maps (scope None)"""
+    files = {}
+    for scope_id, discipline in DISCIPLINE_FILES.items():
+        if source == '40th':
+            files[os.path.normpath(os.path.join(root, discipline['file_40th']))] = scope_id
+        else:
+            files[os.path.join(data_dir, discipline['csv'])] = scope_id
+            files[os.path.join(data_dir, discipline['package_mapping'])] = scope_id
+        files[os.path.join(data_dir, discipline['package_specs'])] = None
+    return files
+
+def rebuild_data_json(source, output_file='data.json', sqlite_file=None, root='.'):
+    """Rebuild data.json incrementally with source's generator from the inputs in root, keeping its current layout"""
+    options = data_json_format(output_file) if os.path.exists(output_file) else {}
+    options.update(sqlite_file=sqlite_file, root=root, output_dir=os.path.dirname(output_file) or '.')
+    with REBUILD_LOCK:
+        if source == '40th':
+            from generate_data_40th import process_40th_data
+            process_40th_data(incremental=True, **options)
+        else:
+            from generate_data import generate_data
+            generate_data(incremental=True, **options)
+
+def file_stamp(path):
+    """(size, mtime) of path, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+class DataWatcher:
+    """Poll the inputs of data.json and rebuild it in the background when they change.
+
+    The watched files are stat()ed every interval seconds, and a change is only
+    acted on once their stamps hold still for one more poll, so a file that is
+    still being saved is not read half-way. The generator then runs
+    incrementally in this process (see incremental.py): only the scopes whose
+    inputs changed are rebuilt, the others are copied from the current
+    data.json, and the output keeps the layout data.json already has. After
+    each rebuild on_change(scope_ids, packages_changed) is called with the
+    rebuilt scopes; packages_changed reports edits to the *_package.txt spec
+    maps, which the UI reads directly. With sqlite_file the SQLite database
+    (see sqlite_store.py) is rewritten along with data.json.
+
+    The inputs are read from root (see project_registry.py); relative paths
+    are relative to the working directory.
+    """
+
+    def __init__(self, on_change, source='auto', interval=POLL_INTERVAL, output_file='data.json', sqlite_file=None,
+                 root='.'):
+        self.on_change = on_change
+        self.sqlite_file = sqlite_file
+        manifest_file = os.path.join(os.path.dirname(output_file), MANIFEST_FILE)
+        self.source = detect_source(manifest_file) if source == 'auto' else source
+        self.interval = interval
+        self.output_file = output_file
+        self.root = root
+        self.files = watched_files(self.source, os.path.normpath(os.path.join(root, 'Data')), root)
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def _stamps(self):
+        return {path: file_stamp(path) for path in self.files}
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='data-watcher', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def _run(self):
+        stamps = self._stamps()
+        pending = None
+        while not self.stopped.wait(self.interval):
+            current = self._stamps()
+            if current == stamps:
+                pending = None
+                continue
+            if current != pending:
+                # Changed since the last poll: wait for the files to settle
+                pending = current
+                continue
+            changed = [path for path in current if current[path] != stamps[path]]
+            stamps, pending = current, None
+            self._handle_change(changed)
+
+    def _handle_change(self, changed):
+        scope_ids = [scope_id for scope_id in DISCIPLINE_FILES
+                     if any(self.files[path] == scope_id for path in changed)]
+        packages_changed = any(self.files[path] is None for path in changed)
+        if scope_ids:
+            print(f"Watch: {', '.join(changed)} changed, rebuilding {', '.join(scope_ids)}")
+            try:
+                self.rebuild()
+            except Exception:
+                print(f"Watch: rebuilding {self.output_file} failed; it is retried on the next change")
+                traceback.print_exc()
+                scope_ids = []
+        if scope_ids or packages_changed:
+            self.on_change(scope_ids, packages_changed)
+
+    def rebuild(self):
+        """Rebuild data.json incrementally with the watched source's generator"""
+        rebuild_data_json(self.source, self.output_file, self.sqlite_file, self.root)
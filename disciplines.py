@@ -0,0 +1,30 @@
+# Input files of each discipline: data directory files, except the 40th file in the project root
+DISCIPLINE_FILES = {
+    'electrical': {
+        'name': 'Electrical',
+        'code': '26 00 00',
+        'csv': '26 00 00 - Electrical_BidItems.csv',
+        'categories': 'electrical.txt',
+        'package_mapping': 'elec_package_bid items.txt',
+        'package_specs': 'elec_package.txt',
+        'file_40th': '40th_E.json'
+    },
+    'mechanical': {
+        'name': 'Mechanical',
+        'code': '23 00 00',
+        'csv': '23 00 00 - Mechanical_BidItems.csv',
+        'categories': 'mechanical.txt',
+        'package_mapping': 'mech_package_bid items.txt',
+        'package_specs': 'mech_package.txt',
+        'file_40th': '40th_M.json'
+    },
+    'plumbing': {
+        'name': 'Plumbing',
+        'code': '22 00 00',
+        'csv': '22 00 00 - Plumbing_BidItems.csv',
+        'categories': 'plumbing.txt',
+        'package_mapping': 'plumb_package_bid items.txt',
+        'package_specs': 'plumbing_package.txt',
+        'file_40th': '40th_P.json'
+    }
+}
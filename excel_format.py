@@ -0,0 +1,100 @@
+from copy import copy
+
+# openpyxl is imported inside the functions that build workbooks, so modules
+# that only import this one (build_all.py, the exporters) load it on first use
+from instrumentation import count, stage
+
+MAX_COLUMN_WIDTH = 100
+HEADER_ROW_HEIGHT = 30
+
+HEADER_STYLE = 'table_header'
+BODY_STYLE = 'table_body'
+
+def table_styles():
+    """Named styles for the header and data cells of a DataFrame sheet"""
+    from openpyxl.styles import Font, PatternFill, Alignment, NamedStyle
+    from openpyxl.styles.fonts import DEFAULT_FONT
+
+    header = NamedStyle(
+        name=HEADER_STYLE,
+        fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+        font=Font(bold=True, color="FFFFFF", size=11),
+        alignment=Alignment(horizontal="center", vertical="center", wrap_text=True)
+    )
+    body = NamedStyle(
+        name=BODY_STYLE,
+        font=DEFAULT_FONT,
+        alignment=Alignment(vertical="top", wrap_text=True)
+    )
+    return header, body
+
+def column_widths(df, longest_line=False):
+    """Column widths from the DataFrame: the longest header or value plus 2, capped at 100.
+
+    Lengths are measured with vectorized string operations. With longest_line
+    only the longest line of a multiline value counts. Empty cells are ignored.
+    """
+    widths = []
+    for position, column in enumerate(df.columns):
+        values = df.iloc[:, position].dropna().map(str)
+        if longest_line:
+            values = values[values != ''].str.split('\n').explode()
+        lengths = values.str.len()
+        max_length = max(len(str(column)), int(lengths.max()) if len(lengths) else 0)
+        widths.append(min(max_length + 2, MAX_COLUMN_WIDTH))
+    return widths
+
+def new_table_workbook():
+    """Write-only workbook with the table styles registered"""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    for style in table_styles():
+        wb.add_named_style(style)
+    return wb
+
+class CellFactory:
+    """Creates write-only cells that share one named style.
+
+    The style is resolved once on a template cell; each new cell only copies
+    the template's style ids, which is much cheaper than assigning the style
+    by name for every cell.
+    """
+
+    def __init__(self, ws, style):
+        from openpyxl.cell import WriteOnlyCell
+
+        self.ws = ws
+        self.cell_class = WriteOnlyCell
+        template = WriteOnlyCell(ws)
+        template.style = style
+        self.style_array = template._style
+
+    def __call__(self, value):
+        cell = self.cell_class(self.ws, value=value)
+        cell._style = copy(self.style_array)
+        return cell
+
+def write_dataframe_sheet(wb, sheet_name, df, longest_line=False):
+    """Stream df into a new sheet of a new_table_workbook(): styled header, sized columns, wrapped rows"""
+    from openpyxl.utils import get_column_letter
+
+    ws = wb.create_sheet(title=sheet_name)
+
+    # Layout must be set before the first row is written
+    with stage('column_widths'):
+        for index, width in enumerate(column_widths(df, longest_line), start=1):
+            ws.column_dimensions[get_column_letter(index)].width = width
+    ws.row_dimensions[1].height = HEADER_ROW_HEIGHT
+
+    with stage('write_rows'):
+        header_cell = CellFactory(ws, HEADER_STYLE)
+        ws.append([header_cell(str(column)) for column in df.columns])
+
+        # Plain Python values, with missing values as empty cells
+        body_cell = CellFactory(ws, BODY_STYLE)
+        values = df.astype(object).where(df.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            ws.append([body_cell(value) for value in row])
+    count('rows_written', len(df))
+    return ws
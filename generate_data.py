@@ -1,7 +1,24 @@
-import pandas as pd
+import argparse
 import json
 import os
 import re
+import sys
+import time
+
+import csv_cache
+import json_recovery
+import reference_classifier
+from csv_cache import read_bid_items_csv
+from disciplines import DISCIPLINE_FILES
+import instrumentation
+import project_registry
+from incremental import MANIFEST_FILE, BuildManifest, load_previous_output, splice_scope
+from instrumentation import count, stage
+from json_recovery import JsonRecoveryParser
+from json_writer import DataJsonWriter, ScopeWriters
+from parallel import iter_timed
+from reference_classifier import classifier
+from search_index import SEARCH_INDEX_FILE, SearchIndexWriter
 
 def read_categories(txt_file):
     """Read categories from txt file and return a dictionary mapping item number to category"""
@@ -21,18 +38,13 @@ def read_categories(txt_file):
     return categories
 
 def read_csv_data(csv_file):
-    """Read CSV file and return DataFrame"""
-    if not os.path.exists(csv_file):
-        return pd.DataFrame()
-    
-    # Skip first two rows (Project Name and empty row)
-    df = pd.read_csv(csv_file, skiprows=2, encoding='utf-8')
-    # Clean column names (remove leading/trailing spaces and quotes)
-    df.columns = df.columns.str.strip().str.strip('"')
-    return df
+    """Read CSV file and return the cleaned DataFrame (cached by file hash, see csv_cache.py)"""
+    return read_bid_items_csv(csv_file)
 
 def parse_drawing_references(ref_string):
     """Parse drawing reference string into categorized links"""
+    import pandas as pd
+    
     if pd.isna(ref_string) or ref_string == '' or str(ref_string).strip() == '':
         return []
     
@@ -47,24 +59,7 @@ def parse_drawing_references(ref_string):
     categories = {}
     
     for ref in refs:
-        # Determine category based on content
-        ref_lower = ref.lower()
-        if 'civil' in ref_lower or (ref.startswith('C') and not ref.startswith('C5')):
-            cat = 'Civil'
-        elif 'architectural' in ref_lower or ref.startswith('A') or ref.startswith('NO. A'):
-            cat = 'Architectural'
-        elif 'mechanical' in ref_lower or ref.startswith('M') or ref.startswith('NO. M'):
-            cat = 'Mechanical'
-        elif 'electrical' in ref_lower or ref.startswith('E') or ref.startswith('NO. E'):
-            cat = 'Electrical'
-        elif 'plumbing' in ref_lower or ref.startswith('P') or ref.startswith('NO. P'):
-            cat = 'Plumbing'
-        elif 'landscape' in ref_lower or ref.startswith('L'):
-            cat = 'Landscape'
-        elif 'general' in ref_lower or ref.startswith('G') or ref.startswith('NO. S') or ref.startswith('S'):
-            cat = 'General'
-        else:
-            cat = 'General'
+        cat = classifier.drawing_category(ref)
         
         if cat not in categories:
             categories[cat] = []
@@ -83,6 +78,8 @@ def parse_drawing_references(ref_string):
 
 def parse_spec_references(ref_string):
     """Parse specification reference string into categorized links"""
+    import pandas as pd
+    
     if pd.isna(ref_string) or ref_string == '' or str(ref_string).strip() == '':
         return []
     
@@ -97,28 +94,8 @@ def parse_spec_references(ref_string):
     categories = {}
     
     for ref in refs:
-        # Extract division number (e.g., "26 05 19 - ..." -> "Div 26 - Electrical")
-        if ' - ' in ref:
-            parts = ref.split(' - ')
-            div_code = parts[0].strip()
-            div_num = div_code.split()[0] if div_code.split() else '26'
-            
-            if div_num.startswith('26'):
-                cat = 'Div 26 - Electrical'
-            elif div_num.startswith('23'):
-                cat = 'Div 23 - Mechanical'
-            elif div_num.startswith('22'):
-                cat = 'Div 22 - Plumbing'
-            else:
-                cat = f'Div {div_num}'
-        elif ref.startswith('26'):
-            cat = 'Div 26 - Electrical'
-        elif ref.startswith('23'):
-            cat = 'Div 23 - Mechanical'
-        elif ref.startswith('22'):
-            cat = 'Div 22 - Plumbing'
-        else:
-            cat = 'Div 26 - Electrical'
+        # Division category (e.g., "26 05 19 - ..." -> "Div 26 - Electrical")
+        cat = classifier.spec_category(ref)
         
         if cat not in categories:
             categories[cat] = []
@@ -136,72 +113,224 @@ def parse_spec_references(ref_string):
     return result
 
 def read_package_mapping(package_file, scope_type):
-    """Read package mapping file and return dictionary mapping item number to package"""
+    """Read package mapping file and return dictionary mapping item number to package.
+    
+    The file is read in one pass with JsonRecoveryParser, so a truncated or
+    partly damaged file still yields every complete entry; the number of
+    entries that had to be dropped is reported.
+    """
     package_mapping = {}
     if not os.path.exists(package_file):
         return package_mapping
     
-    try:
-        with open(package_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-            # Try to fix incomplete JSON by finding the last complete entry
-            if scope_type in ['mechanical', 'plumbing']:
-                # Find the last complete object in the array
-                last_complete = content.rfind('}')
-                if last_complete > 0:
-                    # Check if we need to close the array and object
-                    if content[last_complete+1:].strip() and not content[last_complete+1:].strip().startswith(']'):
-                        # Try to complete the JSON
-                        content = content[:last_complete+1] + '\n  ]\n}'
-            
-            data = json.loads(content)
-    except json.JSONDecodeError as e:
-        print(f"Warning: Error parsing {package_file}: {e}")
-        # Try to extract what we can
-        try:
-            # For electrical format, try to parse line by line
-            if scope_type == 'electrical':
-                with open(package_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    # Try to extract key-value pairs manually
-                    import re
-                    pattern = r'"(\d+)":\s*"([^"]+)"'
-                    matches = re.findall(pattern, content)
-                    for item_num, package in matches:
-                        package_mapping[item_num.strip()] = package.strip()
+    with open(package_file, 'r', encoding='utf-8') as f:
+        parser = JsonRecoveryParser(f.read())
+    
+    invalid = 0
+    for key, index, value in parser.entries():
+        if scope_type == 'electrical':
+            # Format: {"1": "package 10: others", ...}
+            if index is None and isinstance(value, str):
+                package_mapping[key.strip()] = value.strip()
             else:
-                # For mechanical/plumbing, try to extract complete entries
-                with open(package_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    for line in lines:
-                        if '"item_number"' in line:
-                            # Try to extract item number and group/category
-                            item_match = re.search(r'"item_number":\s*"(\d+)"', line)
-                            if item_match:
-                                item_num = item_match.group(1)
-                                # Look for group or category in nearby lines
-                                # This is a simplified approach
-                                pass
-        except Exception as e2:
-            print(f"Warning: Could not recover data from {package_file}: {e2}")
-        return package_mapping
+                invalid += 1
+        elif scope_type in ['mechanical', 'plumbing']:
+            # Format: {"bid_items": [{"item_number": "1", "description": "...", "group": "..."}, ...]}
+            if key != 'bid_items':
+                continue
+            if not isinstance(value, dict):
+                invalid += 1
+                continue
+            item_num = str(value.get('item_number', '')).strip()
+            package = value.get('group' if scope_type == 'mechanical' else 'category', '')
+            package = package.strip() if isinstance(package, str) else ''
+            if item_num and package:
+                package_mapping[item_num] = package
+            else:
+                invalid += 1
     
-    if scope_type == 'electrical':
-        # Format: {"1": "package 10: others", ...}
-        for item_num, package in data.items():
-            package_mapping[item_num.strip()] = package.strip()
-    elif scope_type in ['mechanical', 'plumbing']:
-        # Format: {"bid_items": [{"item_number": "1", "description": "...", "group": "..."}, ...]}
-        if 'bid_items' in data:
-            for item in data['bid_items']:
-                item_num = str(item.get('item_number', '')).strip()
-                package = item.get('group' if scope_type == 'mechanical' else 'category', '').strip()
-                if item_num and package:
-                    package_mapping[item_num] = package
+    if parser.truncated or parser.dropped or invalid:
+        print(f"Warning: {package_file} is {'truncated' if parser.truncated else 'damaged'}: "
+              f"recovered {len(package_mapping)} mappings, dropped {parser.dropped + invalid} incomplete entries")
     
     return package_mapping
 
-def generate_data():
+def build_bid_items_rowwise(df, group_column):
+    """Build bid items grouped by group_column one row at a time (reference path for --verify)"""
+    grouped = df.groupby(group_column)
+    bid_items_by_group = {}
+    
+    for group, group_df in grouped:
+        if group not in bid_items_by_group:
+            bid_items_by_group[group] = []
+        
+        for _, row in group_df.iterrows():
+            item = {
+                'itemNumber': str(row.get('Item #', '')).strip().strip('"').strip(),
+                'description': str(row.get('Bid Item Description', '')).strip().strip('"').strip(),
+                'status': str(row.get('Status', 'Pending')).strip().strip('"').strip() or 'Pending',
+                'drawingRefs': parse_drawing_references(row.get('Drawing Reference', '')),
+                'specRefs': parse_spec_references(row.get('Specification Reference', ''))
+            }
+            bid_items_by_group[group].append(item)
+    
+    return bid_items_by_group
+
+def clean_text_column(df, column, default=''):
+    """Return column as stripped strings, the same way str(value).strip().strip('"').strip() does per row"""
+    import pandas as pd
+    
+    if column not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    return df[column].map(str).str.strip().str.strip('"').str.strip()
+
+def explode_references(df, column):
+    """Split a comma separated reference column into one row per reference.
+    
+    Returns a DataFrame with 'row' (position in df) and 'ref' columns, in the
+    original row/reference order, with blank references dropped.
+    """
+    import pandas as pd
+    
+    if column not in df.columns:
+        return pd.DataFrame({'row': pd.Series(dtype='int64'), 'ref': pd.Series(dtype=object)})
+    
+    values = df[column].reset_index(drop=True)
+    values = values[values.notna()].map(str).str.strip()
+    values = values[values != '']
+    
+    refs = values.str.split(',').explode().str.strip()
+    refs = refs[refs.notna() & (refs != '')]
+    return pd.DataFrame({'row': refs.index.astype('int64'), 'ref': refs.values})
+
+def categorize_series(refs, categorize):
+    """Categorize a Series of references, running each distinct reference through categorize once"""
+    unique = refs.unique()
+    return refs.map(dict(zip(unique, map(categorize, unique))))
+
+def group_references(refs, categorize, row_count):
+    """Group exploded references into the per-row [{category, count, items}] structure.
+    
+    categorize is one of the shared classifier's cached lookups (see reference_classifier.py).
+    """
+    grouped_refs = [[] for _ in range(row_count)]
+    if refs.empty:
+        return grouped_refs
+    
+    refs = refs.assign(category=categorize_series(refs['ref'], categorize))
+    grouped = refs.groupby(['row', 'category'], sort=True)['ref'].agg(list)
+    for (row, category), items in grouped.items():
+        grouped_refs[row].append({
+            'category': category,
+            'count': len(items),
+            'items': items
+        })
+    return grouped_refs
+
+def build_bid_items_columnar(df, group_column):
+    """Build bid items grouped by group_column using whole-column pandas operations"""
+    df = df.reset_index(drop=True)
+    
+    with stage('clean_columns'):
+        item_numbers = clean_text_column(df, 'Item #').tolist()
+        descriptions = clean_text_column(df, 'Bid Item Description').tolist()
+        statuses = clean_text_column(df, 'Status', 'Pending').replace('', 'Pending').tolist()
+    
+    with stage('parse_drawing_refs'):
+        refs = explode_references(df, 'Drawing Reference')
+        count('drawing_refs', len(refs))
+        drawing_refs = group_references(refs, classifier.drawing_category, len(df))
+    
+    with stage('parse_spec_refs'):
+        refs = explode_references(df, 'Specification Reference')
+        count('spec_refs', len(refs))
+        spec_refs = group_references(refs, classifier.spec_category, len(df))
+    
+    with stage('group_items'):
+        bid_items_by_group = {}
+        for group, group_df in df.groupby(group_column):
+            bid_items_by_group[group] = [
+                {
+                    'itemNumber': item_numbers[i],
+                    'description': descriptions[i],
+                    'status': statuses[i],
+                    'drawingRefs': drawing_refs[i],
+                    'specRefs': spec_refs[i]
+                }
+                for i in group_df.index
+            ]
+    
+    return bid_items_by_group
+
+def build_package_scope(scope_name, files, verify=False):
+    """Build one package grouping scope.
+    
+    Returns (scope info, bid items by package, matches) or None when the CSV
+    has no rows. matches is False only when verify finds the columnar and
+    row-by-row output differ.
+    """
+    # Read package mapping
+    with stage('read_package_mapping'):
+        package_mapping = read_package_mapping(files['package_file'], files['scope_type'])
+    
+    # Read CSV data
+    with stage('read_csv'):
+        df = read_csv_data(files['csv'])
+    count('rows', len(df))
+    
+    return group_package_scope(scope_name, files['code'], files['scope_type'], df, package_mapping, verify)
+
+def group_package_scope(scope_name, code, scope_type, df, package_mapping, verify=False):
+    """Group an already loaded bid items DataFrame by package; same result as build_package_scope.
+    
+    df is not modified, so it can be shared with other outputs.
+    """
+    if df.empty:
+        return None
+    
+    # Add package column and remove "Package X: " prefix for electrical
+    df = df.assign(Package=df['Item #'].map(package_mapping).fillna('Others'))
+    if scope_type == 'electrical':
+        # Remove "Package 1: ", "Package 2: ", etc. prefixes
+        df['Package'] = df['Package'].str.replace(r'^Package\s+\d+:\s*', '', regex=True, case=False)
+    
+    # Create scope ID
+    scope_id = scope_name.lower().replace(' ', '-')
+    
+    scope = {
+        'code': code,
+        'name': scope_name,
+        'id': scope_id
+    }
+    
+    # Group by package
+    with stage('build_bid_items'):
+        bid_items_by_package = build_bid_items_columnar(df, 'Package')
+    matches = True
+    if verify:
+        with stage('verify_rowwise'):
+            rowwise = build_bid_items_rowwise(df, 'Package')
+            matches = json.dumps(rowwise) == json.dumps(bid_items_by_package)
+    
+    return scope, bid_items_by_package, matches
+
+def generate_data(verify=False, incremental=False, jobs=1, compact=False, sharded=False, normalized=False,
+                  sqlite_file=None, root='.', output_dir='.'):
+    """Generate data.json from the package grouping CSV/TXT files.
+    
+    With verify=True every scope is also built with the row-by-row reference
+    path and the two results are compared. With incremental=True scopes whose
+    CSV and package mapping are unchanged since the last run (per
+    data.manifest.json) are copied from the previous data.json. jobs > 1
+    builds the scopes in a process pool; the output is the same as a serial run.
+    compact, sharded and normalized select the DataJsonWriter output format;
+    sqlite_file also writes the scopes to that SQLite database (see sqlite_store.py).
+    The full-text search index search_index.json (see search_index.py) is
+    always rebuilt alongside data.json.
+    
+    The inputs are read from root's Data/ directory and data.json, its
+    manifest and search index are written to output_dir (see project_registry.py).
+    """
     scope_files = {
         'Electrical by masterformat': {
             'code': '26 00 00',
@@ -220,31 +349,19 @@ def generate_data():
         }
     }
     
+    data_dir = os.path.normpath(os.path.join(root, 'Data'))
+    output_file = os.path.normpath(os.path.join(output_dir, 'data.json'))
     package_grouping_files = {
-        'Electrical': {
-            'code': '26 00 00',
-            'package_file': 'Data/elec_package_bid items.txt',
-            'csv': 'Data/26 00 00 - Electrical_BidItems.csv',
-            'scope_type': 'electrical'
-        },
-        'Mechanical': {
-            'code': '23 00 00',
-            'package_file': 'Data/mech_package_bid items.txt',
-            'csv': 'Data/23 00 00 - Mechanical_BidItems.csv',
-            'scope_type': 'mechanical'
-        },
-        'Plumbing': {
-            'code': '22 00 00',
-            'package_file': 'Data/plumb_package_bid items.txt',
-            'csv': 'Data/22 00 00 - Plumbing_BidItems.csv',
-            'scope_type': 'plumbing'
+        files['name']: {
+            'code': files['code'],
+            'package_file': os.path.join(data_dir, files['package_mapping']),
+            'csv': os.path.join(data_dir, files['csv']),
+            'scope_type': scope_type
         }
+        for scope_type, files in DISCIPLINE_FILES.items()
     }
     
-    output_data = {
-        'scopes': [],
-        'bidItems': {}
-    }
+    mismatches = []
     
     # Process masterformat scopes (COMMENTED OUT - not shown in UI)
     # for scope_name, files in scope_files.items():
@@ -345,68 +462,131 @@ def generate_data():
     #     output_data['bidItems']['plumbing-by-spec'] = bid_items_by_spec
     
     # Process package grouping scopes
+    start_time = time.perf_counter()
+    manifest = BuildManifest('generate_data', [__file__, reference_classifier.__file__, csv_cache.__file__,
+                                              json_recovery.__file__],
+                             os.path.normpath(os.path.join(output_dir, MANIFEST_FILE)))
+    with stage('load_previous_output'):
+        previous_output = load_previous_output(output_file) if incremental and not verify else None
+    scope_results = {}
+    task_inputs = {}
+    tasks = []
+    
     for scope_name, files in package_grouping_files.items():
-        print(f"Processing {scope_name}...")
-        
-        # Read package mapping
-        package_mapping = read_package_mapping(files['package_file'], files['scope_type'])
-        
-        # Read CSV data
-        df = read_csv_data(files['csv'])
-        
-        if df.empty:
-            continue
-        
-        # Extract item number
-        df['Item #'] = df.iloc[:, 0].astype(str).str.strip().str.strip('"').str.strip()
-        
-        # Add package column and remove "Package X: " prefix for electrical
-        df['Package'] = df['Item #'].map(package_mapping).fillna('Others')
-        if files['scope_type'] == 'electrical':
-            # Remove "Package 1: ", "Package 2: ", etc. prefixes
-            df['Package'] = df['Package'].str.replace(r'^Package\s+\d+:\s*', '', regex=True, case=False)
-        
-        # Create scope ID
         scope_id = scope_name.lower().replace(' ', '-')
+        with stage('fingerprint_inputs'):
+            inputs = manifest.fingerprint_inputs(scope_id, [files['csv'], files['package_file']])
         
-        # Add scope info
-        output_data['scopes'].append({
-            'code': files['code'],
-            'name': scope_name,
-            'id': scope_id
-        })
+        # Splice scopes whose inputs are unchanged from the previous data.json
+        if previous_output is not None and manifest.is_unchanged(scope_id, inputs):
+            if not manifest.was_present(scope_id):
+                print(f"Skipping {scope_name} (inputs unchanged, no bid items)")
+                manifest.record(scope_id, inputs, False)
+                continue
+            spliced = splice_scope(previous_output, scope_id, output_file)
+            if spliced is not None:
+                print(f"Reusing {scope_name} (inputs unchanged)")
+                scope_results[scope_name] = spliced
+                manifest.record(scope_id, inputs, True)
+                continue
         
-        # Group by package
-        grouped = df.groupby('Package')
-        bid_items_by_package = {}
+        print(f"Processing {scope_name}...")
+        task_inputs[scope_name] = (scope_id, inputs)
+        tasks.append((scope_name, (scope_name, files, verify)))
+    
+    # Disciplines are independent, so they can be built in parallel. Scopes are
+    # written in the configured order as they finish, so output does not depend
+    # on job count and finished scopes are not kept in memory.
+    os.makedirs(output_dir, exist_ok=True)
+    writer = DataJsonWriter(output_file, compact=compact, sharded=sharded, normalized=normalized)
+    database = None
+    if sqlite_file:
+        from sqlite_store import BidItemDatabaseWriter
+        database = BidItemDatabaseWriter(sqlite_file)
+    outputs = ScopeWriters({
+        'write_json': writer,
+        'write_sqlite': database,
+        'write_search_index': SearchIndexWriter(os.path.normpath(os.path.join(output_dir, SEARCH_INDEX_FILE)))
+    })
+    results = iter_timed(build_package_scope, tasks, jobs)
+    for scope_name in package_grouping_files:
+        if scope_name in scope_results:
+            scope_result = scope_results.pop(scope_name)
+            outputs.write_scope(*scope_result)
+            continue
+        if scope_name not in task_inputs:
+            continue
         
-        for package, group_df in grouped:
-            if package not in bid_items_by_package:
-                bid_items_by_package[package] = []
-            
-            for _, row in group_df.iterrows():
-                item = {
-                    'itemNumber': str(row.get('Item #', '')).strip().strip('"').strip(),
-                    'description': str(row.get('Bid Item Description', '')).strip().strip('"').strip(),
-                    'status': str(row.get('Status', 'Pending')).strip().strip('"').strip() or 'Pending',
-                    'drawingRefs': parse_drawing_references(row.get('Drawing Reference', '')),
-                    'specRefs': parse_spec_references(row.get('Specification Reference', ''))
-                }
-                bid_items_by_package[package].append(item)
+        with stage('build_scope'):
+            _, result, elapsed = next(results)
+        print(f"  {scope_name}: {elapsed:.3f}s")
+        scope_id, inputs = task_inputs[scope_name]
+        manifest.record(scope_id, inputs, result is not None)
+        if result is None:
+            continue
         
-        output_data['bidItems'][scope_id] = bid_items_by_package
-    
-    # Write to JSON file
-    with open('data.json', 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
-    
-    print(f"\nData file 'data.json' created successfully!")
-    print(f"Scopes: {len(output_data['scopes'])}")
-    for scope in output_data['scopes']:
-        if scope['id'] in output_data['bidItems']:
-            categories = len(output_data['bidItems'][scope['id']])
-            total_items = sum(len(items) for items in output_data['bidItems'][scope['id']].values())
-            print(f"  - {scope['name']}: {categories} groups, {total_items} items")
+        scope, bid_items_by_package, matches = result
+        if not matches:
+            mismatches.append(scope_name)
+        outputs.write_scope(scope, bid_items_by_package)
+    
+    written = outputs.close()
+    manifest.save()
+    count('items_written', sum(total_items for _, total_items in writer.counts.values()))
+    
+    print(f"\nData file '{output_file}' created successfully!")
+    if sharded:
+        print(f"Scope files: {', '.join(written[1:1 + len(writer.scope_files)])}")
+    if database is not None:
+        print(f"SQLite database: {sqlite_file}")
+    print(f"Search index: {written[-1]}")
+    if previous_output is not None:
+        print(f"Rebuilt {len(tasks)} of {len(package_grouping_files)} scopes")
+    print(f"Scopes: {len(writer.scopes)}")
+    for scope in writer.scopes:
+        categories, total_items = writer.counts[scope['id']]
+        print(f"  - {scope['name']}: {categories} groups, {total_items} items")
+    print(f"Total time: {time.perf_counter() - start_time:.3f}s (jobs: {jobs})")
+    
+    cache_stats = classifier.format_cache_stats()
+    if cache_stats:
+        print("\nReference classifier cache:")
+        for line in cache_stats:
+            print(line)
+    
+    if verify:
+        if mismatches:
+            print(f"\nVerify FAILED: columnar and row-by-row output differ for {', '.join(mismatches)}")
+        else:
+            print("\nVerify OK: columnar and row-by-row output are identical")
+    
+    return not mismatches
 
 if __name__ == "__main__":
-    generate_data()
+    parser = argparse.ArgumentParser(description='Generate data.json from the bid item CSV and package files')
+    parser.add_argument('--verify', action='store_true',
+                        help='also build with the row-by-row path and check both give identical output')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only rebuild scopes whose input files changed since the last run')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='number of worker processes used to build scopes in parallel (default: 1)')
+    parser.add_argument('--compact', action='store_true',
+                        help='write JSON without indentation or whitespace')
+    parser.add_argument('--sharded', action='store_true',
+                        help='write one file per scope in data_scopes/ and a small scopes index in data.json')
+    parser.add_argument('--normalized', action='store_true',
+                        help='store drawing/spec references as IDs into shared tables instead of repeating the strings')
+    parser.add_argument('--sqlite', nargs='?', const='bid_items.db', metavar='FILE',
+                        help='also write the bid items to a SQLite database (default file: bid_items.db)')
+    project_registry.add_arguments(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    project = project_registry.project_from_args(parser, args, 'packages')
+    
+    with instrumentation.session_from_args('generate_data', args):
+        ok = generate_data(verify=args.verify, incremental=args.incremental, jobs=args.jobs,
+                           compact=args.compact, sharded=args.sharded, normalized=args.normalized,
+                           sqlite_file=args.sqlite and project.output_path(args.sqlite), root=project.root,
+                           output_dir=project.output_dir)
+    if not ok:
+        sys.exit(1)
@@ -1,136 +1,247 @@
+import argparse
 import json
 import os
+import time
 
-def process_40th_data():
-    """Process 40th PL MEP data files and generate data.json"""
+import instrumentation
+import project_registry
+import reference_classifier
+from disciplines import DISCIPLINE_FILES
+from incremental import MANIFEST_FILE, BuildManifest, load_previous_output, splice_scope
+from instrumentation import count, stage
+from json_writer import DataJsonWriter, ScopeWriters
+from parallel import iter_timed
+from reference_classifier import classifier
+from search_index import SEARCH_INDEX_FILE, SearchIndexWriter
+
+def build_40th_scope(scope_name, config):
+    """Read one discipline's 40th_*.json file and group its bid items by category.
+    
+    Returns (scope info, bid items by category, raw bid item count).
+    """
+    file_path = config['file']
+    
+    # Read JSON file
+    with stage('read_json'):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            bid_items_raw = json.load(f)
+    count('rows', len(bid_items_raw))
+    
+    with stage('group_items'):
+        categories = group_40th_items(scope_name, bid_items_raw)
+    
+    scope = {
+        'code': config['code'],
+        'name': scope_name,
+        'id': config['id']
+    }
+    
+    return scope, categories, len(bid_items_raw)
+
+def group_40th_items(scope_name, bid_items_raw):
+    """Group raw 40th bid items by their "grouping text" (category)"""
+    categories = {}
+    drawing_refs = 0
+    spec_refs = 0
+    
+    for item in bid_items_raw:
+        # Get category from "grouping text", default to "Uncategorized"
+        category = item.get('grouping text', 'Uncategorized')
+        if not category or category.strip() == '':
+            category = 'Uncategorized'
+        
+        # Initialize category if not exists
+        if category not in categories:
+            categories[category] = []
+        
+        # Build bid item object
+        bid_item = {
+            'itemNumber': str(item.get('id', '')),
+            'description': item.get('bid item', ''),
+            'status': item.get('status') or 'Pending',  # Set by status write-back (see status_journal.py)
+            'drawingRefs': [],
+            'specRefs': []
+        }
+        
+        # Add sheet information to drawingRefs
+        sheet_number = item.get('sheet number', '')
+        sheet_name = item.get('sheet name', '')
+        if sheet_number and sheet_name:
+            drawing_category = classifier.sheet_category(sheet_number)
+            
+            bid_item['drawingRefs'].append({
+                'category': drawing_category,
+                'count': 1,
+                'items': [f"{sheet_number} - {sheet_name}"]
+            })
+            drawing_refs += 1
+        
+        # Add spec information to specRefs
+        spec_code = item.get('spec code', '')
+        spec_name = item.get('spec name', '')
+        if spec_code or spec_name:
+            spec_category = 'General'
+            if scope_name == 'Electrical':
+                spec_category = 'Div 26 - Electrical'
+            elif scope_name == 'Mechanical':
+                spec_category = 'Div 23 - Mechanical'
+            elif scope_name == 'Plumbing':
+                spec_category = 'Div 22 - Plumbing'
+            
+            spec_display = f"{spec_code} - {spec_name}".strip(' - ')
+            if spec_display:
+                bid_item['specRefs'].append({
+                    'category': spec_category,
+                    'count': 1,
+                    'items': [spec_display]
+                })
+                spec_refs += 1
+        
+        categories[category].append(bid_item)
+    
+    count('drawing_refs', drawing_refs)
+    count('spec_refs', spec_refs)
+    return categories
+
+def process_40th_data(incremental=False, jobs=1, compact=False, sharded=False, normalized=False, sqlite_file=None,
+                      root='.', output_dir='.'):
+    """Process 40th PL MEP data files and generate data.json
+    
+    With incremental=True disciplines whose 40th_*.json is unchanged since the
+    last run (per data.manifest.json) are copied from the previous data.json.
+    jobs > 1 builds the disciplines in a process pool; the output is the same
+    as a serial run. compact, sharded and normalized select the DataJsonWriter
+    output format; sqlite_file also writes the scopes to that SQLite database
+    (see sqlite_store.py). The full-text search index search_index.json (see
+    search_index.py) is always rebuilt alongside data.json.
+    
+    The 40th_*.json files are read from root and data.json, its manifest and
+    search index are written to output_dir (see project_registry.py).
+    """
     
     # File mappings
     mep_files = {
-        'Electrical': {
-            'file': '40th_E.json',
-            'code': '26 00 00',
-            'id': 'electrical'
-        },
-        'Mechanical': {
-            'file': '40th_M.json',
-            'code': '23 00 00',
-            'id': 'mechanical'
-        },
-        'Plumbing': {
-            'file': '40th_P.json',
-            'code': '22 00 00',
-            'id': 'plumbing'
+        files['name']: {
+            'file': os.path.normpath(os.path.join(root, files['file_40th'])),
+            'code': files['code'],
+            'id': scope_id
         }
-    }
-    
-    output_data = {
-        'scopes': [],
-        'bidItems': {}
+        for scope_id, files in DISCIPLINE_FILES.items()
     }
     
     # Process each MEP discipline
+    start_time = time.perf_counter()
+    output_file = os.path.normpath(os.path.join(output_dir, 'data.json'))
+    manifest = BuildManifest('generate_data_40th', [__file__, reference_classifier.__file__],
+                             os.path.normpath(os.path.join(output_dir, MANIFEST_FILE)))
+    with stage('load_previous_output'):
+        previous_output = load_previous_output(output_file) if incremental else None
+    scope_results = {}
+    task_inputs = {}
+    tasks = []
+    
     for scope_name, config in mep_files.items():
         file_path = config['file']
+        scope_id = config['id']
         
         if not os.path.exists(file_path):
             print(f"Warning: {file_path} not found, skipping {scope_name}")
             continue
         
-        # Read JSON file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            bid_items_raw = json.load(f)
+        with stage('fingerprint_inputs'):
+            inputs = manifest.fingerprint_inputs(scope_id, [file_path])
         
-        # Group bid items by "grouping text" (category)
-        categories = {}
+        # Splice disciplines whose JSON file is unchanged from the previous data.json
+        if previous_output is not None and manifest.is_unchanged(scope_id, inputs):
+            spliced = splice_scope(previous_output, scope_id, output_file)
+            if spliced is not None:
+                print(f"Reusing {scope_name} (inputs unchanged)")
+                scope_results[scope_name] = spliced
+                manifest.record(scope_id, inputs, True)
+                continue
         
-        for item in bid_items_raw:
-            # Get category from "grouping text", default to "Uncategorized"
-            category = item.get('grouping text', 'Uncategorized')
-            if not category or category.strip() == '':
-                category = 'Uncategorized'
-            
-            # Initialize category if not exists
-            if category not in categories:
-                categories[category] = []
-            
-            # Build bid item object
-            bid_item = {
-                'itemNumber': str(item.get('id', '')),
-                'description': item.get('bid item', ''),
-                'status': 'Pending',  # Default status
-                'drawingRefs': [],
-                'specRefs': []
-            }
-            
-            # Add sheet information to drawingRefs
-            sheet_number = item.get('sheet number', '')
-            sheet_name = item.get('sheet name', '')
-            if sheet_number and sheet_name:
-                # Determine category for drawing reference
-                # You can customize this logic based on sheet number patterns
-                drawing_category = 'General'
-                if sheet_number.startswith('E'):
-                    drawing_category = 'Electrical'
-                elif sheet_number.startswith('M'):
-                    drawing_category = 'Mechanical'
-                elif sheet_number.startswith('P'):
-                    drawing_category = 'Plumbing'
-                elif sheet_number.startswith('D'):
-                    drawing_category = 'Demolition'
-                elif sheet_number.startswith('CIV'):
-                    drawing_category = 'Civil'
-                
-                bid_item['drawingRefs'].append({
-                    'category': drawing_category,
-                    'count': 1,
-                    'items': [f"{sheet_number} - {sheet_name}"]
-                })
-            
-            # Add spec information to specRefs
-            spec_code = item.get('spec code', '')
-            spec_name = item.get('spec name', '')
-            if spec_code or spec_name:
-                spec_category = 'General'
-                if scope_name == 'Electrical':
-                    spec_category = 'Div 26 - Electrical'
-                elif scope_name == 'Mechanical':
-                    spec_category = 'Div 23 - Mechanical'
-                elif scope_name == 'Plumbing':
-                    spec_category = 'Div 22 - Plumbing'
-                
-                spec_display = f"{spec_code} - {spec_name}".strip(' - ')
-                if spec_display:
-                    bid_item['specRefs'].append({
-                        'category': spec_category,
-                        'count': 1,
-                        'items': [spec_display]
-                    })
-            
-            categories[category].append(bid_item)
+        task_inputs[scope_name] = (scope_id, inputs)
+        tasks.append((scope_name, (scope_name, config)))
+    
+    # Disciplines are independent, so they can be built in parallel. Scopes are
+    # written in the configured order as they finish, so output does not depend
+    # on job count and finished scopes are not kept in memory.
+    os.makedirs(output_dir, exist_ok=True)
+    writer = DataJsonWriter(output_file, compact=compact, sharded=sharded, normalized=normalized)
+    database = None
+    if sqlite_file:
+        from sqlite_store import BidItemDatabaseWriter
+        database = BidItemDatabaseWriter(sqlite_file)
+    outputs = ScopeWriters({
+        'write_json': writer,
+        'write_sqlite': database,
+        'write_search_index': SearchIndexWriter(os.path.normpath(os.path.join(output_dir, SEARCH_INDEX_FILE)))
+    })
+    results = iter_timed(build_40th_scope, tasks, jobs)
+    for scope_name in mep_files:
+        if scope_name in scope_results:
+            scope_result = scope_results.pop(scope_name)
+            outputs.write_scope(*scope_result)
+            continue
+        if scope_name not in task_inputs:
+            continue
         
-        # Add scope to output
-        output_data['scopes'].append({
-            'code': config['code'],
-            'name': scope_name,
-            'id': config['id']
-        })
+        with stage('build_scope'):
+            _, (scope, categories, raw_count), elapsed = next(results)
+        scope_id, inputs = task_inputs[scope_name]
+        manifest.record(scope_id, inputs, True)
         
-        # Add bid items grouped by category
-        output_data['bidItems'][config['id']] = categories
+        # Add scope and its bid items grouped by category to output
+        outputs.write_scope(scope, categories)
         
-        print(f"Processed {scope_name}: {len(bid_items_raw)} bid items in {len(categories)} categories")
+        print(f"Processed {scope_name}: {raw_count} bid items in {len(categories)} categories ({elapsed:.3f}s)")
     
     # Write output file
-    with open('data.json', 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
-    
-    print(f"\nData file 'data.json' created successfully!")
-    print(f"Total scopes: {len(output_data['scopes'])}")
-    for scope in output_data['scopes']:
-        scope_id = scope['id']
-        total_items = sum(len(items) for items in output_data['bidItems'][scope_id].values())
+    written = outputs.close()
+    manifest.save()
+    count('items_written', sum(total_items for _, total_items in writer.counts.values()))
+    
+    print(f"\nData file '{output_file}' created successfully!")
+    if sharded:
+        print(f"Scope files: {', '.join(written[1:1 + len(writer.scope_files)])}")
+    if database is not None:
+        print(f"SQLite database: {sqlite_file}")
+    print(f"Search index: {written[-1]}")
+    if previous_output is not None:
+        print(f"Rebuilt {len(tasks)} of {len(mep_files)} scopes")
+    print(f"Total scopes: {len(writer.scopes)}")
+    for scope in writer.scopes:
+        _, total_items = writer.counts[scope['id']]
         print(f"  - {scope['name']}: {total_items} bid items")
+    print(f"Total time: {time.perf_counter() - start_time:.3f}s (jobs: {jobs})")
+    
+    cache_stats = classifier.format_cache_stats()
+    if cache_stats:
+        print("\nReference classifier cache:")
+        for line in cache_stats:
+            print(line)
 
 if __name__ == '__main__':
-    process_40th_data()
+    parser = argparse.ArgumentParser(description='Generate data.json from the 40th_*.json MEP files')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only rebuild disciplines whose input file changed since the last run')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='number of worker processes used to build disciplines in parallel (default: 1)')
+    parser.add_argument('--compact', action='store_true',
+                        help='write JSON without indentation or whitespace')
+    parser.add_argument('--sharded', action='store_true',
+                        help='write one file per scope in data_scopes/ and a small scopes index in data.json')
+    parser.add_argument('--normalized', action='store_true',
+                        help='store drawing/spec references as IDs into shared tables instead of repeating the strings')
+    parser.add_argument('--sqlite', nargs='?', const='bid_items.db', metavar='FILE',
+                        help='also write the bid items to a SQLite database (default file: bid_items.db)')
+    project_registry.add_arguments(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    project = project_registry.project_from_args(parser, args, '40th')
+    
+    with instrumentation.session_from_args('generate_data_40th', args):
+        process_40th_data(incremental=args.incremental, jobs=args.jobs, compact=args.compact, sharded=args.sharded,
+                          normalized=args.normalized, sqlite_file=args.sqlite and project.output_path(args.sqlite),
+                          root=project.root, output_dir=project.output_dir)
 
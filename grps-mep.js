@@ -2,18 +2,15 @@
 let grpsData = {
     electrical: {
         bidItems: null,
-        contractItems: null,
-        scopeItems: null
+        index: null
     },
     mechanical: {
         bidItems: null,
-        contractItems: null,
-        scopeItems: null
+        index: null
     },
     plumbing: {
         bidItems: null,
-        contractItems: null,
-        scopeItems: null
+        index: null
     }
 };
 
@@ -48,42 +45,107 @@ function buildContractItemsMap(contractItemsRaw, discipline) {
     return idMap;
 }
 
+// "E101 - Title" display form of a sheet/spec reference
+function formatReference(reference) {
+    if (Array.isArray(reference)) return reference.join(' - ');
+    return reference ? String(reference) : '';
+}
+
+function formattedReferences(item, key) {
+    return (item && item[key] ? item[key] : []).map(formatReference).filter(Boolean);
+}
+
+// Normalize a discipline into contract items id -> {description, sheets, specs}
+// and scope items with their aggregated sheets/specs (same as grps_index.py).
+// Only used when the precomputed grps_index.json is not available.
+function buildGrpsDisciplineIndex(scopeItems, contractItemsRaw, bidItems, discipline) {
+    const descriptions = buildContractItemsMap(contractItemsRaw, discipline);
+    
+    // Mechanical contract items carry their own sheets/specs; the others use the bid item with the same ID
+    const sources = Object.values((discipline === 'mechanical' ? contractItemsRaw : bidItems) || {})
+        .filter(source => source && typeof source === 'object' && 'id' in source);
+    if (discipline === 'mechanical') {
+        // Sorted by ID (non-integer IDs as 0, ties in file order), the order grps_index.py uses
+        const sortKey = source => Number.isInteger(source.id) ? source.id : 0;
+        sources.sort((a, b) => sortKey(a) - sortKey(b));
+    }
+    const references = {};
+    sources.forEach(source => {
+        if (!(String(source.id) in references)) {
+            references[String(source.id)] = source;
+        }
+    });
+    
+    const contractItems = {};
+    const ids = [...Object.keys(descriptions), ...Object.keys(references).filter(id => !(id in descriptions))];
+    ids.forEach(id => {
+        contractItems[id] = {
+            description: id in descriptions ? descriptions[id] : null,
+            sheets: formattedReferences(references[id], 'sheets'),
+            specs: formattedReferences(references[id], 'specs')
+        };
+    });
+    
+    const scopeIndex = {};
+    for (const [name, item] of Object.entries(scopeItems || {})) {
+        const combinedFrom = item.combined_from || [];
+        const sheets = new Set();
+        const specs = new Set();
+        combinedFrom.forEach(id => {
+            const entry = contractItems[String(id)];
+            if (!entry) return;
+            entry.sheets.forEach(sheet => sheets.add(sheet));
+            entry.specs.forEach(spec => specs.add(spec));
+        });
+        scopeIndex[name] = {
+            scope_item_id: item.scope_item_id || '',
+            combined_from: combinedFrom,
+            sheets: Array.from(sheets),
+            specs: Array.from(specs)
+        };
+    }
+    
+    return { contractItems, scopeItems: scopeIndex };
+}
+
+// Fetch a GRPS JSON file, removing a markdown code block if present
+async function fetchGrpsJson(url) {
+    const response = await fetch(url);
+    if (!response.ok) throw new Error(`${url}: ${response.status}`);
+    let cleaned = (await response.text()).trim();
+    if (cleaned.startsWith('```json')) cleaned = cleaned.slice(7);
+    if (cleaned.startsWith('```')) cleaned = cleaned.slice(3);
+    if (cleaned.endsWith('```')) cleaned = cleaned.slice(0, -3);
+    return JSON.parse(cleaned.trim());
+}
+
 // Load GRPS data
 async function loadGrpsData() {
     const disciplines = ['electrical', 'mechanical', 'plumbing'];
     
+    // Precomputed by grps_index.py (server.py rebuilds it when the inputs change); built here from the raw files when missing
+    let grpsIndex = null;
+    try {
+        grpsIndex = (await fetchGrpsJson('grps_index.json')).disciplines || null;
+    } catch (error) {
+        console.warn('grps_index.json not available, indexing GRPS data in the browser');
+    }
+    
     for (const discipline of disciplines) {
         try {
-            const [bidItems, contractItemsRaw, scopeItems] = await Promise.all([
-                fetch(`Data/grps_${discipline}_bid_items.json`).then(async r => {
-                    const text = await r.text();
-                    // Remove markdown code block if present
-                    let cleaned = text.trim();
-                    if (cleaned.startsWith('```json')) cleaned = cleaned.slice(7);
-                    if (cleaned.startsWith('```')) cleaned = cleaned.slice(3);
-                    if (cleaned.endsWith('```')) cleaned = cleaned.slice(0, -3);
-                    return JSON.parse(cleaned.trim());
-                }),
-                fetch(`Data/grps_${discipline}_contract_items.json`).then(async r => {
-                    const text = await r.text();
-                    // Remove markdown code block if present
-                    let cleaned = text.trim();
-                    if (cleaned.startsWith('```json')) cleaned = cleaned.slice(7);
-                    if (cleaned.startsWith('```')) cleaned = cleaned.slice(3);
-                    if (cleaned.endsWith('```')) cleaned = cleaned.slice(0, -3);
-                    return JSON.parse(cleaned.trim());
-                }),
-                fetch(`Data/grps_${discipline}_scope_items.json`).then(r => r.json())
-            ]);
-            
-            // Build contract items map based on discipline structure
-            const contractItems = buildContractItemsMap(contractItemsRaw, discipline);
+            const bidItems = await fetchGrpsJson(`Data/grps_${discipline}_bid_items.json`);
+            let index = grpsIndex ? grpsIndex[discipline] : null;
+            if (!index) {
+                const [contractItemsRaw, scopeItems] = await Promise.all([
+                    fetchGrpsJson(`Data/grps_${discipline}_contract_items.json`),
+                    fetchGrpsJson(`Data/grps_${discipline}_scope_items.json`)
+                ]);
+                index = buildGrpsDisciplineIndex(scopeItems, contractItemsRaw, bidItems, discipline);
+            }
             
             grpsData[discipline] = {
                 bidItems,
-                contractItems,
-                contractItemsRaw, // Keep raw for contract items view
-                scopeItems
+                index
             };
         } catch (error) {
             console.error(`Error loading ${discipline} GRPS data:`, error);
@@ -107,15 +169,9 @@ function renderGrpsMep() {
     if (currentGrpsType === 'bid-items') {
         html = renderBidItemsTable(data.bidItems);
     } else if (currentGrpsType === 'contract-items') {
-        html = renderContractItemsTable(data.contractItemsRaw, currentGrpsScope, data.bidItems);
+        html = renderContractItemsTable(data.index);
     } else if (currentGrpsType === 'scope-items') {
-        html = renderScopeItemsTable(
-            data.scopeItems, 
-            data.contractItems, 
-            data.contractItemsRaw, 
-            currentGrpsScope, 
-            data.bidItems
-        );
+        html = renderScopeItemsTable(data.index);
     }
     
     content.innerHTML = html;
@@ -147,9 +203,10 @@ function renderBidItemsTable(bidItems) {
     return html;
 }
 
-// Render contract items table
-function renderContractItemsTable(contractItemsRaw, discipline, bidItems) {
-    if (!contractItemsRaw || Object.keys(contractItemsRaw).length === 0) {
+// Render contract items table from the discipline index
+function renderContractItemsTable(index) {
+    const contractItems = index ? index.contractItems : null;
+    if (!contractItems || Object.keys(contractItems).length === 0) {
         return '<div class="empty-state">No contract items found</div>';
     }
     
@@ -157,83 +214,16 @@ function renderContractItemsTable(contractItemsRaw, discipline, bidItems) {
     html += '<th>ID</th><th>Description</th><th>Sheets</th><th>Specs</th>';
     html += '</tr></thead><tbody>';
     
-    // Helper to get sheets and specs from bid items by ID
-    function getSheetsAndSpecs(id, bidItems) {
-        if (!bidItems) return { sheets: '-', specs: '-' };
-        
-        // Find bid item with matching ID
-        for (const [desc, item] of Object.entries(bidItems)) {
-            if (item.id === parseInt(id) || item.id === id) {
-                const sheets = item.sheets ? item.sheets.map(s => Array.isArray(s) ? s.join(' - ') : s).join(', ') : '-';
-                const specs = item.specs ? item.specs.map(s => Array.isArray(s) ? s.join(' - ') : s).join(', ') : '-';
-                return { sheets, specs };
-            }
-        }
-        return { sheets: '-', specs: '-' };
-    }
-    
-    if (discipline === 'electrical') {
-        // Electrical: {"1": "description", ...} - need to get sheets/specs from bid items
-        for (const [id, description] of Object.entries(contractItemsRaw)) {
-            const { sheets, specs } = getSheetsAndSpecs(id, bidItems);
-            html += `<tr>`;
-            html += `<td>${id}</td>`;
-            html += `<td>${description}</td>`;
-            html += `<td>${sheets}</td>`;
-            html += `<td>${specs}</td>`;
-            html += `</tr>`;
-        }
-    } else if (discipline === 'mechanical') {
-        // Mechanical: {"description": {"id": 1, "sheets": [...], "specs": [...]}}
-        const sortedItems = Object.entries(contractItemsRaw)
-            .map(([desc, data]) => ({ 
-                id: data?.id || 0, 
-                desc,
-                sheets: data?.sheets || [],
-                specs: data?.specs || []
-            }))
-            .sort((a, b) => a.id - b.id);
-        
-        for (const item of sortedItems) {
-            const sheets = item.sheets.length > 0 
-                ? item.sheets.map(s => Array.isArray(s) ? s.join(' - ') : s).join(', ')
-                : '-';
-            const specs = item.specs.length > 0
-                ? item.specs.map(s => Array.isArray(s) ? s.join(' - ') : s).join(', ')
-                : '-';
-            
-            html += `<tr>`;
-            html += `<td>${item.id}</td>`;
-            html += `<td>${item.desc}</td>`;
-            html += `<td>${sheets}</td>`;
-            html += `<td>${specs}</td>`;
-            html += `</tr>`;
-        }
-    } else if (discipline === 'plumbing') {
-        // Plumbing: {"short desc": "full desc"} - need to get sheets/specs from bid items
-        // For plumbing, contract item position (1-indexed) should match bid item ID
-        const itemsList = Object.entries(contractItemsRaw);
-        itemsList.forEach(([shortDesc, fullDesc], idx) => {
-            const contractItemId = idx + 1;
-            // Try to find bid item with matching ID
-            let sheets = '-';
-            let specs = '-';
-            if (bidItems) {
-                for (const [bidDesc, bidItem] of Object.entries(bidItems)) {
-                    if (bidItem.id === contractItemId) {
-                        sheets = bidItem.sheets ? bidItem.sheets.map(s => Array.isArray(s) ? s.join(' - ') : s).join(', ') : '-';
-                        specs = bidItem.specs ? bidItem.specs.map(s => Array.isArray(s) ? s.join(' - ') : s).join(', ') : '-';
-                        break;
-                    }
-                }
-            }
-            html += `<tr>`;
-            html += `<td>${contractItemId}</td>`;
-            html += `<td>${fullDesc}</td>`;
-            html += `<td>${sheets}</td>`;
-            html += `<td>${specs}</td>`;
-            html += `</tr>`;
-        });
+    // IDs are numeric, so the object is already in ID order
+    for (const [id, item] of Object.entries(contractItems)) {
+        // IDs only known from the bid items are not contract items
+        if (item.description === null) continue;
+        html += `<tr>`;
+        html += `<td>${id}</td>`;
+        html += `<td>${item.description}</td>`;
+        html += `<td>${item.sheets.join(', ') || '-'}</td>`;
+        html += `<td>${item.specs.join(', ') || '-'}</td>`;
+        html += `</tr>`;
     }
     
     html += '</tbody></table>';
@@ -241,79 +231,12 @@ function renderContractItemsTable(contractItemsRaw, discipline, bidItems) {
 }
 
 // Render scope items table with derived contract items
-function renderScopeItemsTable(scopeItems, contractItems, contractItemsRaw, discipline, bidItems) {
+function renderScopeItemsTable(index) {
+    const scopeItems = index ? index.scopeItems : null;
     if (!scopeItems || Object.keys(scopeItems).length === 0) {
         return '<div class="empty-state">No scope items found</div>';
     }
-    
-    // Helper to get sheets and specs for a contract item
-    function getContractItemSheetsAndSpecs(contractId, discipline) {
-        const idStr = String(contractId);
-        
-        if (discipline === 'electrical') {
-            // Get from bid items by ID
-            if (bidItems) {
-                for (const [desc, item] of Object.entries(bidItems)) {
-                    if (item.id === parseInt(contractId) || item.id === contractId) {
-                        return {
-                            sheets: item.sheets || [],
-                            specs: item.specs || []
-                        };
-                    }
-                }
-            }
-        } else if (discipline === 'mechanical') {
-            // Get from contract items raw (they have sheets/specs)
-            if (contractItemsRaw) {
-                for (const [desc, data] of Object.entries(contractItemsRaw)) {
-                    if (data && data.id === parseInt(contractId)) {
-                        return {
-                            sheets: data.sheets || [],
-                            specs: data.specs || []
-                        };
-                    }
-                }
-            }
-        } else if (discipline === 'plumbing') {
-            // Get from bid items by ID (contract item position should match bid item ID)
-            if (bidItems) {
-                const targetId = parseInt(contractId);
-                for (const [desc, item] of Object.entries(bidItems)) {
-                    if (item.id === targetId) {
-                        return {
-                            sheets: item.sheets || [],
-                            specs: item.specs || []
-                        };
-                    }
-                }
-            }
-        }
-        
-        return { sheets: [], specs: [] };
-    }
-    
-    // Collect all sheets and specs from derived contract items
-    function getScopeItemSheetsAndSpecs(derivedFrom) {
-        const allSheets = new Set();
-        const allSpecs = new Set();
-        
-        derivedFrom.forEach(contractId => {
-            const { sheets, specs } = getContractItemSheetsAndSpecs(contractId, discipline);
-            sheets.forEach(s => {
-                const sheetStr = Array.isArray(s) ? s.join(' - ') : s;
-                if (sheetStr) allSheets.add(sheetStr);
-            });
-            specs.forEach(s => {
-                const specStr = Array.isArray(s) ? s.join(' - ') : s;
-                if (specStr) allSpecs.add(specStr);
-            });
-        });
-        
-        return {
-            sheets: Array.from(allSheets).join(', ') || '-',
-            specs: Array.from(allSpecs).join(', ') || '-'
-        };
-    }
+    const contractItems = index.contractItems;
     
     let html = '<table class="grps-table"><thead><tr>';
     html += '<th>Scope Item ID</th><th>Scope Item Name</th><th>Derived From Contract Items</th><th>Sheets</th><th>Specs</th>';
@@ -322,21 +245,19 @@ function renderScopeItemsTable(scopeItems, contractItems, contractItemsRaw, disc
     for (const [name, item] of Object.entries(scopeItems)) {
         const derivedFrom = item.combined_from || [];
         const contractItemList = derivedFrom.map(id => {
-            const idStr = String(id);
-            const contractDesc = contractItems && contractItems[idStr] ? contractItems[idStr] : `Contract Item ${id}`;
+            const entry = contractItems[String(id)];
+            const contractDesc = entry && entry.description ? entry.description : `Contract Item ${id}`;
             // Escape quotes for HTML attribute
             const escapedDesc = contractDesc.replace(/"/g, '&quot;').replace(/'/g, '&#39;');
             return `<span class="contract-item-badge" data-tooltip="${escapedDesc}">${id}</span>`;
         }).join(' ');
         
-        const { sheets, specs } = getScopeItemSheetsAndSpecs(derivedFrom);
-        
         html += `<tr>`;
         html += `<td>${item.scope_item_id || '-'}</td>`;
         html += `<td>${name}</td>`;
         html += `<td class="derived-items">${contractItemList || '-'}</td>`;
-        html += `<td>${sheets}</td>`;
-        html += `<td>${specs}</td>`;
+        html += `<td>${item.sheets.join(', ') || '-'}</td>`;
+        html += `<td>${item.specs.join(', ') || '-'}</td>`;
         html += `</tr>`;
     }
     
@@ -486,7 +407,7 @@ document.addEventListener('DOMContentLoaded', () => {
 // Export to Excel
 async function exportGrpsToExcel() {
     try {
-        const response = await fetch('/export-grps-excel');
+        const response = await fetch('export-grps-excel');
         if (response.ok) {
             const blob = await response.blob();
             const url = window.URL.createObjectURL(blob);
@@ -0,0 +1,256 @@
+import argparse
+import json
+import os
+import threading
+
+from incremental import fingerprint_file
+
+DISCIPLINES = ['electrical', 'mechanical', 'plumbing']
+GRPS_INDEX_FILE = 'grps_index.json'
+GRPS_INDEX_VERSION = 2
+
+def load_json_file(filename):
+    """Load JSON file and return data"""
+    if not os.path.exists(filename):
+        return None
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            content = f.read().strip()
+            if not content:
+                return None
+            # Remove markdown code block markers if present
+            if content.startswith('```json'):
+                content = content[7:]  # Remove ```json
+            if content.startswith('```'):
+                content = content[3:]  # Remove ```
+            if content.endswith('```'):
+                content = content[:-3]  # Remove closing ```
+            content = content.strip()
+            return json.loads(content)
+    except (json.JSONDecodeError, Exception) as e:
+        print(f"Warning: Error loading {filename}: {e}")
+        return None
+
+def grps_file(data_dir, discipline, kind):
+    """Path of a GRPS input file; kind is 'bid_items', 'contract_items' or 'scope_items'"""
+    return os.path.join(data_dir, f'grps_{discipline}_{kind}.json')
+
+def grps_input_files(data_dir='Data'):
+    """Return the JSON files the GRPS index and export are built from"""
+    files = []
+    for discipline in DISCIPLINES:
+        for kind in ('scope_items', 'contract_items', 'bid_items'):
+            files.append(grps_file(data_dir, discipline, kind))
+    return files
+
+def build_contract_items_map(contract_items, discipline):
+    """Build a map of contract item ID to description based on discipline structure"""
+    if not contract_items:
+        return {}
+
+    id_map = {}
+
+    if discipline == 'electrical':
+        # Electrical: {"1": "description", "2": "description", ...}
+        id_map = {str(k): v for k, v in contract_items.items()}
+    elif discipline == 'mechanical':
+        # Mechanical: {"description": {"id": 1, ...}}
+        for desc, item_data in contract_items.items():
+            if isinstance(item_data, dict) and 'id' in item_data:
+                item_id = str(item_data['id'])
+                id_map[item_id] = desc  # Use the key (description) as the value
+    elif discipline == 'plumbing':
+        # Plumbing: {"short desc": "full desc"} - need to index by position
+        # Since scope items reference numeric IDs, we'll create a 1-indexed map
+        items_list = list(contract_items.items())
+        for idx, (short_desc, full_desc) in enumerate(items_list, start=1):
+            id_map[str(idx)] = full_desc  # Use full description
+
+    return id_map
+
+def format_reference(reference):
+    """["E101", "Title"] -> "E101 - Title" as shown in the UI"""
+    if isinstance(reference, list):
+        return ' - '.join(str(part) for part in reference)
+    return str(reference) if reference else ''
+
+def _formatted_references(item, key):
+    references = [format_reference(reference) for reference in (item.get(key) or [])]
+    return [reference for reference in references if reference]
+
+def build_contract_index(contract_items_raw, bid_items, discipline):
+    """Normalize a discipline's contract items into id -> {description, sheets, specs}.
+
+    Mechanical contract items carry their own sheets/specs; electrical and
+    plumbing contract items take them from the bid item with the same ID.
+    IDs known only from the bid items get a None description.
+    """
+    descriptions = build_contract_items_map(contract_items_raw, discipline)
+
+    references = {}
+    if discipline == 'mechanical':
+        # Sorted by ID, the order the UI lists mechanical contract items in
+        sources = [data for data in (contract_items_raw or {}).values() if isinstance(data, dict) and 'id' in data]
+        sources.sort(key=lambda data: data['id'] if isinstance(data['id'], int) else 0)
+    else:
+        sources = [item for item in (bid_items or {}).values() if isinstance(item, dict) and 'id' in item]
+    for source in sources:
+        # The first item with an ID wins, as in the original linear scans
+        references.setdefault(str(source['id']), source)
+
+    index = {}
+    for item_id in list(descriptions) + [item_id for item_id in references if item_id not in descriptions]:
+        source = references.get(item_id, {})
+        index[item_id] = {
+            'description': descriptions.get(item_id),
+            'sheets': _formatted_references(source, 'sheets'),
+            'specs': _formatted_references(source, 'specs')
+        }
+    return index
+
+def aggregate_references(contract_ids, contract_index):
+    """Deduplicated sheets and specs of the given contract items, in first-seen order"""
+    sheets = {}
+    specs = {}
+    for contract_id in contract_ids:
+        entry = contract_index.get(str(contract_id))
+        if entry is None:
+            continue
+        sheets.update(dict.fromkeys(entry['sheets']))
+        specs.update(dict.fromkeys(entry['specs']))
+    return list(sheets), list(specs)
+
+def build_discipline_index(scope_items, contract_items_raw, bid_items, discipline):
+    """Contract item table plus every scope item with its aggregated sheets/specs"""
+    contract_index = build_contract_index(contract_items_raw, bid_items, discipline)
+
+    scope_index = {}
+    for name, scope_data in (scope_items or {}).items():
+        combined_from = scope_data.get('combined_from', [])
+        sheets, specs = aggregate_references(combined_from, contract_index)
+        scope_index[name] = {
+            'scope_item_id': scope_data.get('scope_item_id', ''),
+            'combined_from': combined_from,
+            'sheets': sheets,
+            'specs': specs
+        }
+
+    return {
+        'contractItems': contract_index,
+        'scopeItems': scope_index
+    }
+
+def load_discipline_index(data_dir, discipline):
+    """Load a discipline's GRPS files and index them; None when it has no scope items"""
+    scope_items = load_json_file(grps_file(data_dir, discipline, 'scope_items'))
+    if not scope_items:
+        return None
+    contract_items_raw = load_json_file(grps_file(data_dir, discipline, 'contract_items'))
+    bid_items = load_json_file(grps_file(data_dir, discipline, 'bid_items'))
+    return build_discipline_index(scope_items, contract_items_raw, bid_items, discipline)
+
+def build_grps_index(data_dir='Data'):
+    """Index all MEP disciplines, skipping those without scope items"""
+    index = {}
+    for discipline in DISCIPLINES:
+        discipline_index = load_discipline_index(data_dir, discipline)
+        if discipline_index is not None:
+            index[discipline] = discipline_index
+    return index
+
+def input_fingerprints(data_dir='Data', previous=None):
+    """{file name: fingerprint} of the GRPS inputs, reusing the hashes in previous for files whose size/mtime match"""
+    previous = previous or {}
+    fingerprints = {}
+    for path in grps_input_files(data_dir):
+        name = os.path.basename(path)
+        fingerprints[name] = fingerprint_file(path, previous.get(name))
+    return fingerprints
+
+def same_inputs(recorded, current):
+    """Whether two input_fingerprints() results describe the same file contents"""
+    def hashes(fingerprints):
+        return {name: fingerprint and fingerprint['sha256'] for name, fingerprint in fingerprints.items()}
+    return hashes(recorded) == hashes(current)
+
+def read_recorded_inputs(output_file=GRPS_INDEX_FILE):
+    """The input fingerprints grps_index.json was built from, or None when it is missing or from an older version"""
+    try:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            index_file = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(index_file, dict) or index_file.get('version') != GRPS_INDEX_VERSION:
+        return None
+    return index_file.get('inputs')
+
+def write_grps_index(data_dir='Data', output_file=GRPS_INDEX_FILE):
+    return save_grps_index(build_grps_index(data_dir), output_file, data_dir)
+
+def save_grps_index(index, output_file=GRPS_INDEX_FILE, data_dir='Data', inputs=None):
+    """Write {version, inputs, disciplines} compactly, replacing output_file atomically.
+
+    inputs are the fingerprints of the grps_*.json files in data_dir the
+    index was built from (computed here when None), so a stale index can be
+    recognized (see GrpsIndexFile).
+    """
+    if inputs is None:
+        inputs = input_fingerprints(data_dir)
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    temp_file = output_file + '.tmp'
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump({'version': GRPS_INDEX_VERSION, 'inputs': inputs, 'disciplines': index}, f,
+                  ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_file, output_file)
+
+    for discipline, discipline_index in index.items():
+        print(f"{discipline}: {len(discipline_index['contractItems'])} contract items, "
+              f"{len(discipline_index['scopeItems'])} scope items")
+    print(f"Wrote {output_file}")
+    return output_file
+
+class GrpsIndexFile:
+    """Keep grps_index.json in step with the grps_*.json files it is built from.
+
+    refresh() fingerprints the inputs (rehashing only files whose size/mtime
+    changed) and rebuilds the file when they differ from the fingerprints it
+    records, or when it is missing. The recorded fingerprints are only read
+    again when grps_index.json itself changes.
+    """
+
+    def __init__(self, data_dir='Data', output_file=GRPS_INDEX_FILE):
+        self.data_dir = data_dir
+        self.output_file = output_file
+        self.lock = threading.Lock()
+        self.stamp = None
+        self.recorded = None
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.output_file)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def refresh(self):
+        """Rebuild grps_index.json if it is missing or stale; returns True when it was rebuilt"""
+        with self.lock:
+            stamp = self._stamp()
+            if stamp != self.stamp:
+                self.recorded = read_recorded_inputs(self.output_file) if stamp else None
+                self.stamp = stamp
+            current = input_fingerprints(self.data_dir, self.recorded)
+            if self.recorded is not None and same_inputs(self.recorded, current):
+                self.recorded = current
+                return False
+            save_grps_index(build_grps_index(self.data_dir), self.output_file, self.data_dir, current)
+            self.stamp, self.recorded = self._stamp(), current
+            return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Precompute the GRPS contract item / scope item index for the UI')
+    parser.add_argument('--data-dir', default='Data', help='directory with the grps_*.json files (default: Data)')
+    parser.add_argument('--output', default=GRPS_INDEX_FILE, help=f'output file (default: {GRPS_INDEX_FILE})')
+    args = parser.parse_args()
+
+    write_grps_index(args.data_dir, args.output)
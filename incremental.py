@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+
+import aggregates
+import disciplines
+import interned_refs
+import json_writer
+from json_writer import load_scope_bid_items
+
+MANIFEST_FILE = 'data.manifest.json'
+MANIFEST_VERSION = 1
+# Modules shaping the data.json bytes of every generator, spliced scopes included
+OUTPUT_CODE_FILES = [json_writer.__file__, aggregates.__file__, interned_refs.__file__, disciplines.__file__,
+                     __file__]
+
+def fingerprint_file(path, previous=None):
+    """Return {size, mtime, sha256} for path, or None if it does not exist.
+
+    When the size and mtime match the previous fingerprint the recorded hash is
+    reused, so unchanged inputs are not read again.
+    """
+    if not os.path.exists(path):
+        return None
+
+    stat = os.stat(path)
+    if previous and previous.get('size') == stat.st_size and previous.get('mtime') == stat.st_mtime_ns:
+        return dict(previous)
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+
+    return {
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'sha256': digest.hexdigest()
+    }
+
+def load_previous_output(output_file):
+    """Load a previously generated data.json, or None if it is missing or unreadable"""
+    if not os.path.exists(output_file):
+        return None
+    try:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"Warning: Could not read previous {output_file}, rebuilding everything: {e}")
+        return None
+
+class BuildManifest:
+    """Per-scope record of the input fingerprints a generated output was built from"""
+
+    def __init__(self, generator, code_files, manifest_file=MANIFEST_FILE):
+        self.generator = generator
+        self.manifest_file = manifest_file
+        self.previous = self._load()
+        self.scopes = {}
+
+        # Any change to the generator code (or to OUTPUT_CODE_FILES) invalidates every scope
+        previous_code = self.previous.get('code', {}) if self.previous else {}
+        self.code = {path: fingerprint_file(path, previous_code.get(path))
+                     for path in [*code_files, *OUTPUT_CODE_FILES]}
+        self.code_changed = not self.previous or previous_code != self.code
+
+    def _load(self):
+        if not os.path.exists(self.manifest_file):
+            return None
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return None
+        if manifest.get('version') != MANIFEST_VERSION or manifest.get('generator') != self.generator:
+            return None
+        return manifest
+
+    def fingerprint_inputs(self, scope_id, input_files):
+        """Fingerprint the inputs of a scope, reusing hashes recorded for unchanged files"""
+        previous_inputs = {}
+        if self.previous:
+            previous_inputs = self.previous.get('scopes', {}).get(scope_id, {}).get('inputs', {})
+        return {path: fingerprint_file(path, previous_inputs.get(path)) for path in input_files}
+
+    def is_unchanged(self, scope_id, inputs):
+        """True when the scope was built before from exactly these inputs"""
+        if self.code_changed:
+            return False
+        previous_scope = self.previous.get('scopes', {}).get(scope_id)
+        return previous_scope is not None and previous_scope.get('inputs') == inputs
+
+    def was_present(self, scope_id):
+        """Whether the previous build emitted the scope (empty inputs are skipped)"""
+        return self.previous['scopes'][scope_id].get('present', False)
+
+    def record(self, scope_id, inputs, present):
+        self.scopes[scope_id] = {
+            'inputs': inputs,
+            'present': present
+        }
+
+    def save(self):
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'generator': self.generator,
+            'code': self.code,
+            'scopes': self.scopes
+        }
+        with open(self.manifest_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+def splice_scope(previous_output, scope_id, output_file='data.json'):
+    """Return (scope info, bid items) for scope_id from a previous output, or None"""
+    if not previous_output:
+        return None
+    bid_items = load_scope_bid_items(previous_output, scope_id, output_file)
+    scope = next((s for s in previous_output.get('scopes', []) if s.get('id') == scope_id), None)
+    if scope is None or bid_items is None:
+        return None
+    return scope, bid_items
@@ -0,0 +1,243 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+PROFILE_FUNCTIONS = 25
+PROFILE_ALLOCATIONS = 10
+
+class Recorder:
+    """Stage timers and counters for one run.
+
+    Stages nest: a stage started inside another is recorded as "outer/inner".
+    Each stage path keeps its number of calls and total seconds, in the order
+    the stages first started. Timing a stage costs two perf_counter() calls, so
+    the timers stay in place when nobody is looking at them.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        stack = self._stack()
+        stack.append(name)
+        path = '/'.join(stack)
+        with self.lock:
+            self.stages.setdefault(path, [0, 0.0])
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            self.add_stage(path, 1, elapsed)
+
+    def add_stage(self, path, calls, seconds):
+        with self.lock:
+            totals = self.stages.setdefault(path, [0, 0.0])
+            totals[0] += calls
+            totals[1] += seconds
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        """Picklable copy of the stages and counters"""
+        with self.lock:
+            return {
+                'stages': {path: list(totals) for path, totals in self.stages.items()},
+                'counters': dict(self.counters)
+            }
+
+    def merge(self, snapshot):
+        """Add another recorder's snapshot (e.g. from a worker process) under the current stage"""
+        prefix = '/'.join(self._stack())
+        for path, (calls, seconds) in snapshot['stages'].items():
+            self.add_stage(f'{prefix}/{path}' if prefix else path, calls, seconds)
+        for name, n in snapshot['counters'].items():
+            self.count(name, n)
+
+    def ordered_stages(self):
+        """(path, calls, seconds) with every stage directly after its parent"""
+        with self.lock:
+            stages = list(self.stages.items())
+        order = {path: index for index, (path, _) in enumerate(stages)}
+
+        def tree_key(item):
+            parts = item[0].split('/')
+            return tuple(order.get('/'.join(parts[:depth]), -1) for depth in range(1, len(parts) + 1))
+
+        return [(path, calls, seconds) for path, (calls, seconds) in sorted(stages, key=tree_key)]
+
+_recorder = Recorder()
+
+def stage(name):
+    """Time a block as a stage of the current run: with stage('read_csv'): ..."""
+    return _recorder.stage(name)
+
+def count(name, n=1):
+    """Add n to a run counter (rows read, references parsed, ...)"""
+    _recorder.count(name, n)
+
+def recorder():
+    return _recorder
+
+@contextlib.contextmanager
+def capture():
+    """Record into a fresh Recorder for the duration of the block (used by pool workers)"""
+    global _recorder
+    previous = _recorder
+    _recorder = Recorder()
+    try:
+        yield _recorder
+    finally:
+        _recorder = previous
+
+class Session:
+    """One instrumented run: resets the recorder, optionally profiles, then reports.
+
+    profile=True also runs cProfile and tracemalloc for the whole run (this
+    slows it down, so stage times are only comparable between runs with the
+    same setting). Work done in pool workers (--jobs) shows up in the stage
+    timings and counters but not in the profile; worker stages add up across
+    processes, so their share of the wall time can exceed 100%. summary=True
+    prints the stage table; trace_file receives the same data as JSON.
+    """
+
+    def __init__(self, name, profile=False, summary=False, trace_file=None):
+        self.name = name
+        self.profile = profile
+        self.summary = summary or profile
+        self.trace_file = trace_file
+        self.profiler = None
+        self.trace = None
+
+    def __enter__(self):
+        global _recorder
+        _recorder = Recorder()
+        self.started = datetime.now().isoformat(timespec='seconds')
+        if self.profile:
+            # Profiling modules are only loaded for --profile
+            import cProfile
+            import tracemalloc
+
+            tracemalloc.start()
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall_time = time.perf_counter() - self.start
+        profile = None
+        if self.profiler is not None:
+            import tracemalloc
+
+            self.profiler.disable()
+            profile = self._profile_data()
+            tracemalloc.stop()
+
+        self.trace = build_trace(self.name, self.started, wall_time, _recorder, profile)
+        if exc_type is None:
+            if self.summary:
+                print_summary(self.trace)
+            if self.trace_file:
+                write_trace(self.trace_file, self.trace)
+        return False
+
+    def _profile_data(self):
+        import pstats
+        import tracemalloc
+
+        stats = pstats.Stats(self.profiler)
+        functions = []
+        for (file_name, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            functions.append({
+                'function': f"{os.path.basename(file_name)}:{line}({function})",
+                'calls': calls,
+                'tottime': tottime,
+                'cumtime': cumtime
+            })
+        functions.sort(key=lambda entry: entry['cumtime'], reverse=True)
+
+        _, peak = tracemalloc.get_traced_memory()
+        allocations = [
+            {'location': str(statistic.traceback), 'bytes': statistic.size, 'count': statistic.count}
+            for statistic in tracemalloc.take_snapshot().statistics('lineno')[:PROFILE_ALLOCATIONS]
+        ]
+        return {
+            'functions': functions[:PROFILE_FUNCTIONS],
+            'peak_traced_bytes': peak,
+            'allocations': allocations
+        }
+
+def build_trace(name, started, wall_time, recorder, profile=None):
+    """Machine-readable trace of a run"""
+    trace = {
+        'name': name,
+        'started': started,
+        'wall_time': wall_time,
+        'stages': [
+            {'stage': path, 'calls': calls, 'seconds': seconds}
+            for path, calls, seconds in recorder.ordered_stages()
+        ],
+        'counters': recorder.snapshot()['counters']
+    }
+    if profile is not None:
+        trace['profile'] = profile
+    return trace
+
+def print_summary(trace):
+    """Per-stage table: nested stages are indented under their parent"""
+    wall_time = trace['wall_time']
+    print(f"\nStage timings for {trace['name']} ({wall_time:.3f}s total):")
+    print(f"  {'stage':<40} {'calls':>6} {'seconds':>9} {'share':>7}")
+    for entry in trace['stages']:
+        depth = entry['stage'].count('/')
+        label = '  ' * depth + entry['stage'].rsplit('/', 1)[-1]
+        share = entry['seconds'] / wall_time if wall_time else 0
+        print(f"  {label:<40} {entry['calls']:>6} {entry['seconds']:>9.3f} {share:>7.1%}")
+
+    if trace['counters']:
+        print("Counters:")
+        for name, value in trace['counters'].items():
+            print(f"  {name:<40} {value:>12,}")
+
+    profile = trace.get('profile')
+    if profile:
+        print(f"Peak traced memory: {profile['peak_traced_bytes'] / (1024 * 1024):.1f} MB")
+        print("Top functions by cumulative time:")
+        print(f"  {'function':<60} {'calls':>9} {'tottime':>9} {'cumtime':>9}")
+        for entry in profile['functions']:
+            print(f"  {entry['function'][:60]:<60} {entry['calls']:>9} {entry['tottime']:>9.3f} {entry['cumtime']:>9.3f}")
+
+def write_trace(trace_file, trace):
+    with open(trace_file, 'w', encoding='utf-8') as f:
+        json.dump(trace, f, indent=2)
+    print(f"Trace written to {trace_file}")
+
+def add_arguments(parser):
+    """Add --timings, --profile and --trace to a script's argument parser"""
+    group = parser.add_argument_group('instrumentation')
+    group.add_argument('--timings', action='store_true',
+                       help='print how long each stage took, plus row/reference counters')
+    group.add_argument('--profile', action='store_true',
+                       help='also capture cProfile and tracemalloc data (slower; implies --timings)')
+    group.add_argument('--trace', metavar='FILE',
+                       help='write the stage timings, counters and profile to FILE as JSON')
+
+def session_from_args(name, args):
+    return Session(name, profile=args.profile, summary=args.timings, trace_file=args.trace)
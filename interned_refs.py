@@ -0,0 +1,88 @@
+import os
+import sys
+import tempfile
+
+# Reference lists in the normalized format, with the table their item IDs point into
+REFERENCE_KEYS = {
+    'drawingRefs': 'sheets',
+    'specRefs': 'specs'
+}
+
+class ReferenceInterner:
+    """Replace the reference strings of bid items with IDs into shared tables.
+
+    A reference group {"category": "Civil", "count": 2, "items": ["C101 - ...",
+    "C102 - ..."]} becomes [category id, sheet id, sheet id]; the count is the
+    number of items, so it is not stored. Category names go into the
+    "categories" table, drawing references into "sheets" and specification
+    references into "specs".
+    """
+
+    def __init__(self):
+        self.tables = {'categories': [], 'sheets': [], 'specs': []}
+        self.ids = {name: {} for name in self.tables}
+
+    def _id(self, table, value):
+        ids = self.ids[table]
+        if value not in ids:
+            ids[value] = len(self.tables[table])
+            self.tables[table].append(value)
+        return ids[value]
+
+    def intern_item(self, item):
+        """Return a copy of item with its references replaced by table IDs"""
+        interned = dict(item)
+        for key, table in REFERENCE_KEYS.items():
+            if key in item:
+                interned[key] = [
+                    [self._id('categories', ref['category'])] + [self._id(table, value) for value in ref['items']]
+                    for ref in item[key]
+                ]
+        return interned
+
+    def intern_items(self, items):
+        return [self.intern_item(item) for item in items]
+
+def expand_item(item, tables):
+    """Inverse of ReferenceInterner.intern_item"""
+    expanded = dict(item)
+    for key, table in REFERENCE_KEYS.items():
+        if key in item:
+            values = tables[table]
+            expanded[key] = [
+                {
+                    'category': tables['categories'][ref[0]],
+                    'count': len(ref) - 1,
+                    'items': [values[value_id] for value_id in ref[1:]]
+                }
+                for ref in item[key]
+            ]
+    return expanded
+
+def expand_bid_items(groups, tables):
+    """Expand one scope's {group: [items]} back to the usual shape; tables None means not normalized"""
+    if tables is None:
+        return groups
+    return {group: [expand_item(item, tables) for item in items] for group, items in groups.items()}
+
+def report_sizes(data_file='data.json'):
+    """Print the size of data_file written plain and normalized, pretty and compact"""
+    from json_writer import DataJsonWriter, read_data_json
+
+    data = read_data_json(data_file)
+    print(f"{'format':<22} {'bytes':>10} {'vs plain':>9}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        sizes = {}
+        for compact in (False, True):
+            for normalized in (False, True):
+                output_file = os.path.join(temp_dir, 'data.json')
+                with DataJsonWriter(output_file, compact=compact, normalized=normalized) as writer:
+                    for scope in data['scopes']:
+                        writer.write_scope(scope, data['bidItems'][scope['id']])
+                size = os.path.getsize(output_file)
+                plain = sizes.setdefault(compact, size)
+                label = ('compact' if compact else 'pretty') + (', normalized' if normalized else '')
+                print(f"{label:<22} {size:>10,} {size / plain:>8.0%}")
+
+if __name__ == '__main__':
+    report_sizes(sys.argv[1] if len(sys.argv) > 1 else 'data.json')
@@ -0,0 +1,137 @@
+import json
+
+# Includes the byte order mark some exported files start with
+_WHITESPACE = ' \t\n\r\ufeff'
+
+class JsonRecoveryParser:
+    """Recover the complete entries of a possibly truncated or damaged JSON object.
+
+    Walks the top-level object once, decoding one value at a time with
+    json.JSONDecoder.raw_decode. Array values are entered and decoded one
+    element at a time, so everything before a truncation point is kept. A
+    damaged entry is skipped by resuming at the next entry boundary after the
+    error, which keeps the work linear in the size of the text.
+
+    entries() yields (key, None, value) for plain top-level members and
+    (key, index, element) for each element of a top-level array. Once it is
+    exhausted, recovered counts the entries yielded, dropped the damaged or
+    cut-off entries that were skipped and truncated whether the text ended
+    before the top-level object was closed.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.decoder = json.JSONDecoder()
+        self.recovered = 0
+        self.dropped = 0
+        self.truncated = False
+
+    def _skip_whitespace(self, pos):
+        text = self.text
+        while pos < len(text) and text[pos] in _WHITESPACE:
+            pos += 1
+        return pos
+
+    def _decode(self, pos):
+        """Decode one value at pos; returns (ok, value, end or error position)"""
+        try:
+            value, end = self.decoder.raw_decode(self.text, pos)
+            return True, value, end
+        except json.JSONDecodeError as e:
+            return False, None, max(e.pos, pos + 1)
+
+    def _drop(self, error_pos):
+        """Count a skipped entry, noting when it was cut off by the end of the text"""
+        self.dropped += 1
+        if self._skip_whitespace(error_pos) >= len(self.text):
+            self.truncated = True
+
+    def _resync(self, pos, boundaries):
+        """Position to resume at after a damaged entry, or None at the end of the text.
+
+        Resumes just after a ',' (object members) or at a '{' or ']' (array
+        elements), whichever boundary comes first.
+        """
+        found = [p for p in (self.text.find(b, pos) for b in boundaries) if p >= 0]
+        if not found:
+            self.truncated = True
+            return None
+        next_pos = min(found)
+        return next_pos + 1 if self.text[next_pos] == ',' else next_pos
+
+    def entries(self):
+        text = self.text
+        pos = self._skip_whitespace(0)
+        if pos >= len(text) or text[pos] != '{':
+            self.truncated = pos >= len(text)
+            return
+        pos += 1
+
+        while True:
+            pos = self._skip_whitespace(pos)
+            if pos >= len(text):
+                self.truncated = True
+                return
+            if text[pos] == '}':
+                return
+            if text[pos] == ',':
+                pos += 1
+                continue
+
+            # Member key and ':'
+            ok, key, end = self._decode(pos)
+            colon = self._skip_whitespace(end)
+            if not ok or not isinstance(key, str) or colon >= len(text) or text[colon] != ':':
+                self._drop(end)
+                pos = self._resync(end, ',')
+                if pos is None:
+                    return
+                continue
+            pos = self._skip_whitespace(colon + 1)
+
+            # Arrays are decoded element by element so a cut-off array keeps its complete elements
+            if pos < len(text) and text[pos] == '[':
+                pos = yield from self._array_entries(key, pos + 1)
+                if pos is None:
+                    return
+                continue
+
+            ok, value, end = self._decode(pos)
+            if not ok:
+                self._drop(end)
+                pos = self._resync(end, ',')
+                if pos is None:
+                    return
+                continue
+
+            self.recovered += 1
+            yield key, None, value
+            pos = end
+
+    def _array_entries(self, key, pos):
+        """Yield the elements of the array starting at pos; returns the position after it"""
+        text = self.text
+        index = 0
+        while True:
+            pos = self._skip_whitespace(pos)
+            if pos >= len(text):
+                self.truncated = True
+                return None
+            if text[pos] == ']':
+                return pos + 1
+            if text[pos] == ',':
+                pos += 1
+                continue
+
+            ok, element, end = self._decode(pos)
+            if not ok:
+                self._drop(end)
+                pos = self._resync(end, '{]')
+                if pos is None:
+                    return None
+                continue
+
+            self.recovered += 1
+            yield key, index, element
+            index += 1
+            pos = end
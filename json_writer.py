@@ -0,0 +1,237 @@
+import json
+import os
+import tempfile
+
+from aggregates import ScopeAggregator
+from instrumentation import stage
+from interned_refs import ReferenceInterner, expand_bid_items
+
+SHARD_DIR = 'data_scopes'
+
+class DataJsonWriter:
+    """Stream data.json one package group at a time.
+
+    Scopes are written with write_scope() as soon as they are built, so the
+    whole document never has to be held in memory. The bidItems section is
+    spooled to a temporary file and joined with the scopes list on close(),
+    which keeps the usual {"scopes": [...], "bidItems": {...}} layout. Pretty
+    output is byte-identical to json.dump(..., indent=2, ensure_ascii=False).
+
+    While the groups are written their status counts are collected (see
+    aggregates.py) and emitted as an "aggregates" section after "scopes":
+    {scope id: {all, pending, yes, no, groups: {group: {all, pending, yes, no}}}}.
+
+    compact=True drops indentation and whitespace. sharded=True writes each
+    scope's bid items to its own file in shard_dir and makes output_file a
+    small index of scopes and their file paths, so the UI can fetch a single
+    scope. Like output_file, every shard is written to a .tmp file and moved
+    into place complete, and close() deletes the shards no scope refers to
+    (all of them when the output is no longer sharded).
+
+    normalized=True replaces the reference strings of every item with IDs into
+    shared tables written as "refTables" (see interned_refs.py);
+    read_data_json() expands it back.
+    """
+
+    def __init__(self, output_file='data.json', compact=False, sharded=False, shard_dir=SHARD_DIR, normalized=False):
+        self.output_file = output_file
+        self.compact = compact
+        self.sharded = sharded
+        self.interner = ReferenceInterner() if normalized else None
+        self.shard_dir = os.path.join(os.path.dirname(output_file), shard_dir)
+        self.shard_url_dir = shard_dir
+        self.scopes = []
+        self.counts = {}
+        self.aggregates = {}
+        self.scope_files = {}
+        self._body = None if sharded else tempfile.TemporaryFile('w+', encoding='utf-8')
+        if sharded:
+            os.makedirs(self.shard_dir, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._body is not None:
+            self._body.close()
+        return False
+
+    def _dumps(self, obj, level):
+        """Serialize obj as it would appear nested level indents deep"""
+        if self.compact:
+            return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+        text = json.dumps(obj, indent=2, ensure_ascii=False)
+        return text.replace('\n', '\n' + '  ' * level)
+
+    def _write_groups(self, f, groups, level, aggregator):
+        """Write a {group name: [items]} object, one group at a time"""
+        newline = '' if self.compact else '\n'
+        indent = '' if self.compact else '  ' * (level + 1)
+        colon = ':' if self.compact else ': '
+
+        group_count = 0
+        item_count = 0
+        for name, items in (groups.items() if isinstance(groups, dict) else groups):
+            aggregator.add_group(name, items)
+            item_count += len(items)
+            if self.interner is not None:
+                items = self.interner.intern_items(items)
+            f.write(('{' if group_count == 0 else ',') + newline + indent)
+            f.write(self._dumps(name, level + 1) + colon + self._dumps(items, level + 1))
+            group_count += 1
+
+        if group_count == 0:
+            f.write('{}')
+        else:
+            f.write(newline + ('' if self.compact else '  ' * level) + '}')
+        return group_count, item_count
+
+    def write_scope(self, scope, groups):
+        """Write one scope's bid items; groups is a dict or an iterable of (group, items)"""
+        scope_id = scope['id']
+        self.scopes.append(scope)
+        aggregator = ScopeAggregator()
+
+        if self.sharded:
+            file_name = f'{scope_id}.json'
+            shard_file = os.path.join(self.shard_dir, file_name)
+            with open(shard_file + '.tmp', 'w', encoding='utf-8') as f:
+                self.counts[scope_id] = self._write_groups(f, groups, 0, aggregator)
+            os.replace(shard_file + '.tmp', shard_file)
+            self.scope_files[scope_id] = f'{self.shard_url_dir}/{file_name}'
+            self.aggregates[scope_id] = aggregator.to_dict()
+            return
+
+        f = self._body
+        if self.compact:
+            f.write(('' if len(self.scopes) == 1 else ',') + self._dumps(scope_id, 0) + ':')
+        else:
+            f.write(('' if len(self.scopes) == 1 else ',') + '\n    ' + self._dumps(scope_id, 0) + ': ')
+        self.counts[scope_id] = self._write_groups(f, groups, 2, aggregator)
+        self.aggregates[scope_id] = aggregator.to_dict()
+
+    def close(self):
+        """Write the output file and return the paths written"""
+        if self.compact:
+            separator, colon = ',', ':'
+        else:
+            separator, colon = ',\n  ', ': '
+
+        temp_file = self.output_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.write('{' if self.compact else '{\n  ')
+            f.write('"scopes"' + colon + self._dumps(self.scopes, 1) + separator)
+            f.write('"aggregates"' + colon + self._dumps(self.aggregates, 1) + separator)
+            if self.interner is not None:
+                f.write('"refTables"' + colon + self._dumps(self.interner.tables, 1) + separator)
+
+            if self.sharded:
+                f.write('"scopeFiles"' + colon + self._dumps(self.scope_files, 1))
+            else:
+                f.write('"bidItems"' + colon)
+                if not self.scopes:
+                    f.write('{}')
+                else:
+                    f.write('{')
+                    self._body.seek(0)
+                    for chunk in iter(lambda: self._body.read(1024 * 1024), ''):
+                        f.write(chunk)
+                    f.write('}' if self.compact else '\n  }')
+                self._body.close()
+
+            f.write('}' if self.compact else '\n}')
+        os.replace(temp_file, self.output_file)
+
+        written = [self.output_file]
+        if self.sharded:
+            written.extend(os.path.join(self.shard_dir, os.path.basename(path)) for path in self.scope_files.values())
+        self._remove_stale_shards()
+        return written
+
+    def _remove_stale_shards(self):
+        """Delete shard files (and leftover .tmp files) that the data.json just written does not refer to"""
+        if not os.path.isdir(self.shard_dir):
+            return
+        current = {os.path.basename(path) for path in self.scope_files.values()}
+        for name in os.listdir(self.shard_dir):
+            if name.endswith(('.json', '.json.tmp')) and name not in current:
+                os.remove(os.path.join(self.shard_dir, name))
+        if not self.sharded and not os.listdir(self.shard_dir):
+            os.rmdir(self.shard_dir)
+
+class ScopeWriters:
+    """Pass each built scope to every output writer, timing each as its own stage.
+
+    writers maps a stage name to a writer with write_scope(scope, groups) and
+    close() (DataJsonWriter, the SQLite and search index writers); None
+    entries are skipped. close() returns the written paths of all of them.
+    """
+
+    def __init__(self, writers):
+        self.writers = {name: writer for name, writer in writers.items() if writer is not None}
+
+    def write_scope(self, scope, groups):
+        if not isinstance(groups, dict):
+            # Every writer iterates the groups
+            groups = dict(groups)
+        for name, writer in self.writers.items():
+            with stage(name):
+                writer.write_scope(scope, groups)
+
+    def close(self):
+        written = []
+        for name, writer in self.writers.items():
+            with stage(name):
+                paths = writer.close()
+            written.extend(paths if isinstance(paths, list) else [paths])
+        return written
+
+def load_scope_bid_items(output_data, scope_id, output_file='data.json'):
+    """Return a scope's bid items from data.json, following scopeFiles for sharded output.
+
+    Normalized references are expanded, so the result always has the usual shape.
+    """
+    tables = output_data.get('refTables')
+    if 'bidItems' in output_data:
+        groups = output_data['bidItems'].get(scope_id)
+        return expand_bid_items(groups, tables) if groups is not None else None
+
+    scope_file = output_data.get('scopeFiles', {}).get(scope_id)
+    if not scope_file:
+        return None
+    path = os.path.join(os.path.dirname(output_file), scope_file)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return expand_bid_items(json.load(f), tables)
+
+def read_data_json(output_file='data.json'):
+    """Read any data.json layout (pretty, compact, sharded, normalized) as {scopes, aggregates, bidItems}"""
+    with open(output_file, 'r', encoding='utf-8') as f:
+        output_data = json.load(f)
+
+    bid_items = {}
+    for scope in output_data.get('scopes', []):
+        groups = load_scope_bid_items(output_data, scope['id'], output_file)
+        if groups is not None:
+            bid_items[scope['id']] = groups
+
+    return {
+        'scopes': output_data.get('scopes', []),
+        'aggregates': output_data.get('aggregates', {}),
+        'bidItems': bid_items
+    }
+
+def data_json_format(output_file='data.json'):
+    """DataJsonWriter options (compact, sharded, normalized) an existing data.json was written with"""
+    with open(output_file, 'r', encoding='utf-8') as f:
+        compact = f.read(2) != '{\n'
+        f.seek(0)
+        output_data = json.load(f)
+    return {
+        'compact': compact,
+        'sharded': 'scopeFiles' in output_data,
+        'normalized': 'refTables' in output_data
+    }
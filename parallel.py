@@ -0,0 +1,41 @@
+import time
+
+import instrumentation
+
+def timed_call(func, args):
+    """Run func(*args) and return (result, elapsed seconds)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def timed_worker_call(func, args):
+    """timed_call in a pool worker, also returning the stages and counters it recorded"""
+    with instrumentation.capture() as recorder:
+        result, elapsed = timed_call(func, args)
+    return result, elapsed, recorder.snapshot()
+
+def iter_timed(func, tasks, jobs=1):
+    """Run func over tasks, serially or in a process pool of up to jobs workers.
+
+    tasks is a list of (key, args) pairs. Yields (key, result, elapsed) in task
+    order regardless of which worker finished first, so callers can write each
+    result out as soon as it is ready while keeping a fixed output order.
+    Serial runs compute each task only when it is requested. Stages and
+    counters recorded by pool workers are merged into this process's
+    instrumentation as each result is collected.
+    """
+    if jobs <= 1 or len(tasks) <= 1:
+        for key, args in tasks:
+            result, elapsed = timed_call(func, args)
+            yield key, result, elapsed
+        return
+
+    # Loaded only when a pool is actually needed
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        futures = [(key, pool.submit(timed_worker_call, func, args)) for key, args in tasks]
+        for key, future in futures:
+            result, elapsed, recorded = future.result()
+            instrumentation.recorder().merge(recorded)
+            yield key, result, elapsed
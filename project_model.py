@@ -0,0 +1,91 @@
+import json
+import os
+from functools import cached_property
+
+from csv_cache import read_bid_items_csv
+from disciplines import DISCIPLINE_FILES
+from generate_data import read_categories, read_package_mapping
+from grps_index import build_discipline_index, grps_file, load_json_file
+from instrumentation import count, stage
+
+class DisciplineModel:
+    """One discipline's inputs, each read and parsed at most once and shared by every output.
+
+    Inputs are loaded on first use, so building a subset of the outputs only
+    reads the files those outputs need. Consumers must not modify the loaded
+    objects (the DataFrame included); the output builders work on copies.
+    """
+
+    def __init__(self, key, files, data_dir='Data', root='.'):
+        self.key = key
+        self.name = files['name']
+        self.code = files['code']
+        self.files = files
+        self.data_dir = data_dir
+        self.root = root
+
+    def data_file(self, kind):
+        return os.path.join(self.data_dir, self.files[kind])
+
+    @cached_property
+    def bid_items(self):
+        """Cleaned *_BidItems.csv DataFrame (empty when the CSV is missing)"""
+        with stage('read_csv'):
+            df = read_bid_items_csv(self.data_file('csv'))
+        count('rows', len(df))
+        return df
+
+    @cached_property
+    def categories(self):
+        """Item number -> category from the category .txt file"""
+        with stage('read_categories'):
+            return read_categories(self.data_file('categories'))
+
+    @cached_property
+    def package_mapping(self):
+        """Item number -> package group from the package bid items file"""
+        with stage('read_package_mapping'):
+            return read_package_mapping(self.data_file('package_mapping'), self.key)
+
+    @cached_property
+    def package_specs(self):
+        """Package group -> specs from the *_package.txt file, or None when it is missing"""
+        path = self.data_file('package_specs')
+        if not os.path.exists(path):
+            return None
+        with stage('read_package_specs'):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+    @cached_property
+    def items_40th(self):
+        """Raw bid items of the 40th_*.json file, or None when it is missing"""
+        path = os.path.join(self.root, self.files['file_40th'])
+        if not os.path.exists(path):
+            return None
+        with stage('read_40th_json'):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+    @cached_property
+    def grps_index(self):
+        """{contractItems, scopeItems} built from the grps_* files (see grps_index.py), or None without scope items"""
+        with stage('load_grps_json'):
+            scope_items = load_json_file(grps_file(self.data_dir, self.key, 'scope_items'))
+            if not scope_items:
+                return None
+            contract_items_raw = load_json_file(grps_file(self.data_dir, self.key, 'contract_items'))
+            bid_items = load_json_file(grps_file(self.data_dir, self.key, 'bid_items'))
+        with stage('build_grps_index'):
+            return build_discipline_index(scope_items, contract_items_raw, bid_items, self.key)
+
+class ProjectModel:
+    """All disciplines of a project, in output order"""
+
+    def __init__(self, data_dir='Data', root='.'):
+        self.data_dir = data_dir
+        self.root = root
+        self.disciplines = [DisciplineModel(key, files, data_dir, root) for key, files in DISCIPLINE_FILES.items()]
+
+    def __iter__(self):
+        return iter(self.disciplines)
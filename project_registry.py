@@ -0,0 +1,181 @@
+import json
+import os
+import re
+
+from incremental import MANIFEST_FILE
+from search_index import SEARCH_INDEX_FILE
+
+REGISTRY_FILE = 'projects.json'
+PROJECT_SOURCES = ('packages', '40th')
+# Project IDs appear in URLs (/projects/<id>/)
+PROJECT_ID_PATTERN = re.compile(r'[a-z0-9][a-z0-9_-]*')
+
+class ProjectError(Exception):
+    """Raised for a malformed projects.json or an unknown project"""
+
+class Project:
+    """One project of the workspace: where its inputs live and where its generated files go.
+
+    root holds the generator inputs: the Data/ directory (CSVs, package files,
+    *_package.txt spec maps) and, for the 40th source, the 40th_*.json files.
+    output_dir receives data.json, data_scopes/, data.manifest.json,
+    search_index.json, the SQLite database and the status journal. Two
+    projects may share a root but never an output_dir.
+    """
+
+    def __init__(self, project_id, name, source, root='.', output_dir='.'):
+        self.id = project_id
+        self.name = name
+        self.source = source
+        self.root = root
+        self.output_dir = output_dir
+
+    @property
+    def data_dir(self):
+        return self.input_path('Data')
+
+    def input_path(self, name):
+        return os.path.normpath(os.path.join(self.root, name))
+
+    def output_path(self, name):
+        return os.path.normpath(os.path.join(self.output_dir, name))
+
+    @property
+    def data_file(self):
+        return self.output_path('data.json')
+
+    @property
+    def manifest_file(self):
+        return self.output_path(MANIFEST_FILE)
+
+    @property
+    def search_index_file(self):
+        return self.output_path(SEARCH_INDEX_FILE)
+
+    def to_json(self):
+        return {'id': self.id, 'name': self.name, 'source': self.source}
+
+class ProjectRegistry:
+    """The projects listed in projects.json, in file order, and the one served at /.
+
+    projects.json looks like
+
+        {"default": "40th",
+         "projects": [{"id": "40th", "name": "40th Street", "source": "40th"},
+                      {"id": "hotel-3", "name": "Hotel 3", "source": "packages",
+                       "root": ".", "output": "projects/hotel-3"}]}
+
+    root and output default to the registry's directory and are relative to
+    it. Without projects.json the working directory is a single project,
+    "default", built by whichever generator last wrote data.manifest.json.
+    """
+
+    def __init__(self, projects, default_id):
+        self.projects = projects
+        self.default_id = default_id
+
+    def __iter__(self):
+        return iter(self.projects.values())
+
+    def __len__(self):
+        return len(self.projects)
+
+    def get(self, project_id=None):
+        """The project with this ID (the default one for None); ProjectError when unknown"""
+        project = self.projects.get(self.default_id if project_id is None else project_id)
+        if project is None:
+            raise ProjectError(f"unknown project: {project_id} (choose from {', '.join(self.projects)})")
+        return project
+
+    @property
+    def default(self):
+        return self.projects[self.default_id]
+
+def load_projects(registry_file=REGISTRY_FILE):
+    """Read projects.json into a ProjectRegistry, raising ProjectError when it is malformed"""
+    # Relative to the working directory, so paths match what the generators record when run from the project root
+    base_dir = os.path.relpath(os.path.dirname(os.path.abspath(registry_file)))
+    if not os.path.exists(registry_file):
+        from data_watcher import detect_source
+
+        project = Project('default', 'Default', detect_source(os.path.join(base_dir, MANIFEST_FILE)),
+                          base_dir, base_dir)
+        return ProjectRegistry({project.id: project}, project.id)
+
+    try:
+        with open(registry_file, 'r', encoding='utf-8') as f:
+            registry = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ProjectError(f"Could not read {registry_file}: {e}") from e
+
+    projects = {}
+    output_dirs = {}
+    for entry in registry.get('projects', []):
+        project_id = entry.get('id', '')
+        if not PROJECT_ID_PATTERN.fullmatch(project_id):
+            raise ProjectError(f"{registry_file}: invalid project id {project_id!r} "
+                               "(lowercase letters, digits, - and _)")
+        if project_id in projects:
+            raise ProjectError(f"{registry_file}: duplicate project id {project_id}")
+        source = entry.get('source', 'packages')
+        if source not in PROJECT_SOURCES:
+            raise ProjectError(f"{registry_file}: project {project_id} has unknown source {source!r} "
+                               f"(choose from {', '.join(PROJECT_SOURCES)})")
+        root = os.path.normpath(os.path.join(base_dir, entry.get('root', '.')))
+        output_dir = os.path.normpath(os.path.join(base_dir, entry.get('output', '.')))
+        if output_dir in output_dirs:
+            raise ProjectError(f"{registry_file}: projects {output_dirs[output_dir]} and {project_id} "
+                               f"both write to {output_dir}")
+        output_dirs[output_dir] = project_id
+        projects[project_id] = Project(project_id, entry.get('name', project_id), source, root, output_dir)
+
+    if not projects:
+        raise ProjectError(f"{registry_file}: no projects")
+    default_id = registry.get('default', next(iter(projects)))
+    if default_id not in projects:
+        raise ProjectError(f"{registry_file}: default project {default_id} is not listed")
+    return ProjectRegistry(projects, default_id)
+
+def add_arguments(parser):
+    """Add --project to a generator's argument parser"""
+    parser.add_argument('--project', metavar='ID',
+                        help=f'build a project listed in {REGISTRY_FILE}: read its inputs from its root and write '
+                             'data.json, the search index and the --sqlite database to its output directory '
+                             '(default: the project of this source whose output, or else whose inputs, are the '
+                             'working directory)')
+
+def project_from_args(parser, args, source=None):
+    """The Project named by --project, else the working directory's project of this source, else an unnamed one.
+
+    Without --project the project writing to the working directory is built.
+    When that project comes from another source, the one project of this
+    source reading its inputs from the working directory is built instead, so
+    a plain run still works from the repository root but never overwrites
+    another source's output. Exits with a usage error when the project is
+    unknown, built from another source, or cannot be chosen unambiguously.
+    """
+    try:
+        registry = load_projects() if args.project or os.path.exists(REGISTRY_FILE) else None
+        project = registry.get(args.project) if args.project else None
+    except ProjectError as e:
+        parser.error(str(e))
+    if project is not None:
+        if source is not None and project.source != source:
+            parser.error(f"project {project.id} has source {project.source}, this builds {source} projects")
+        return project
+
+    here = os.path.abspath('.')
+    project = next((project for project in registry or () if os.path.abspath(project.output_dir) == here), None)
+    if project is None:
+        return Project(None, None, source or 'packages')
+    if source is None or project.source == source:
+        return project
+
+    candidates = [candidate for candidate in registry
+                  if candidate.source == source and os.path.abspath(candidate.root) == here]
+    if len(candidates) != 1:
+        parser.error(f"the working directory holds the output of project {project.id} ({project.source} source); "
+                     f"choose a {source} project with --project")
+    print(f"Building project {candidates[0].id} into {candidates[0].output_dir} "
+          f"(the working directory holds project {project.id})")
+    return candidates[0]
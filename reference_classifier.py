@@ -0,0 +1,150 @@
+from functools import lru_cache
+
+# Marks the end of a prefix in the trie; a None value blocks a shorter prefix (e.g. "C5" under "C")
+_END = object()
+
+# Drawing categories in priority order: (category, keywords in lowercased ref, ref prefixes)
+DRAWING_RULES = [
+    ('Civil', ('civil',), ('C',)),
+    ('Architectural', ('architectural',), ('A', 'NO. A')),
+    ('Mechanical', ('mechanical',), ('M', 'NO. M')),
+    ('Electrical', ('electrical',), ('E', 'NO. E')),
+    ('Plumbing', ('plumbing',), ('P', 'NO. P')),
+    ('Landscape', ('landscape',), ('L',)),
+    ('General', ('general',), ('G', 'NO. S', 'S')),
+]
+
+# "C5..." sheets are not civil unless the name says so
+DRAWING_BLOCKED_PREFIXES = ('C5',)
+
+# Sheet number prefixes used by the 40th street JSON files
+SHEET_PREFIXES = {
+    'E': 'Electrical',
+    'M': 'Mechanical',
+    'P': 'Plumbing',
+    'D': 'Demolition',
+    'CIV': 'Civil',
+}
+
+# Spec division prefixes
+SPEC_PREFIXES = {
+    '26': 'Div 26 - Electrical',
+    '23': 'Div 23 - Mechanical',
+    '22': 'Div 22 - Plumbing',
+}
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+class PrefixTable:
+    """Precompiled prefix trie returning the value of the longest matching prefix"""
+
+    def __init__(self, entries):
+        self.root = {}
+        for prefix, value in entries.items():
+            node = self.root
+            for ch in prefix:
+                node = node.setdefault(ch, {})
+            node[_END] = value
+
+    def lookup(self, text, default=None):
+        """Return the value stored for the longest prefix of text, or default"""
+        node = self.root
+        result = default
+        for ch in text:
+            node = node.get(ch)
+            if node is None:
+                break
+            if _END in node:
+                value = node[_END]
+                result = default if value is None else value
+        return result
+
+
+class ReferenceClassifier:
+    """Categorize drawing, sheet and spec references with a bounded LRU cache per kind.
+
+    The same sheet and spec strings repeat across every row of a project, so
+    each raw ref string is only run through the rules once per cache lifetime.
+    """
+
+    def __init__(self, cache_size=DEFAULT_CACHE_SIZE):
+        self.cache_size = cache_size
+
+        # Prefixes -> rule index, so a prefix hit can be compared with keyword hits by priority
+        drawing_prefixes = {}
+        for index, (_, _, prefixes) in enumerate(DRAWING_RULES):
+            for prefix in prefixes:
+                drawing_prefixes[prefix] = index
+        for prefix in DRAWING_BLOCKED_PREFIXES:
+            drawing_prefixes[prefix] = None
+
+        self.drawing_table = PrefixTable(drawing_prefixes)
+        self.drawing_keywords = [(index, keywords) for index, (_, keywords, _) in enumerate(DRAWING_RULES)]
+        self.sheet_table = PrefixTable(SHEET_PREFIXES)
+        self.spec_table = PrefixTable(SPEC_PREFIXES)
+
+        self.drawing_category = lru_cache(maxsize=cache_size)(self._drawing_category)
+        self.sheet_category = lru_cache(maxsize=cache_size)(self._sheet_category)
+        self.spec_category = lru_cache(maxsize=cache_size)(self._spec_category)
+
+    def _drawing_category(self, ref):
+        """Category for a drawing reference such as "M-4 - Mechanical Roof Plan" """
+        best = self.drawing_table.lookup(ref, len(DRAWING_RULES))
+        ref_lower = ref.lower()
+        for index, keywords in self.drawing_keywords:
+            if index >= best:
+                break
+            if any(keyword in ref_lower for keyword in keywords):
+                best = index
+                break
+        if best == len(DRAWING_RULES):
+            return 'General'
+        return DRAWING_RULES[best][0]
+
+    def _sheet_category(self, sheet_number):
+        """Category for a bare sheet number such as "CIV500" """
+        return self.sheet_table.lookup(sheet_number, 'General')
+
+    def _spec_category(self, ref):
+        """Division category for a spec reference such as "26 05 19 - Conductors" """
+        if ' - ' in ref:
+            div_code = ref.split(' - ')[0].strip()
+            div_num = div_code.split()[0] if div_code.split() else '26'
+            return self.spec_table.lookup(div_num, f'Div {div_num}')
+        return self.spec_table.lookup(ref, 'Div 26 - Electrical')
+
+    def cache_info(self):
+        """Return {kind: {hits, misses, size, maxsize}} for each cached lookup"""
+        info = {}
+        for kind, func in (('drawing', self.drawing_category),
+                           ('sheet', self.sheet_category),
+                           ('spec', self.spec_category)):
+            stats = func.cache_info()
+            info[kind] = {
+                'hits': stats.hits,
+                'misses': stats.misses,
+                'size': stats.currsize,
+                'maxsize': stats.maxsize
+            }
+        return info
+
+    def cache_clear(self):
+        """Empty the caches and reset the hit/miss counters"""
+        self.drawing_category.cache_clear()
+        self.sheet_category.cache_clear()
+        self.spec_category.cache_clear()
+
+    def format_cache_stats(self):
+        """One line per kind that has been used, for the generator summaries"""
+        lines = []
+        for kind, stats in self.cache_info().items():
+            lookups = stats['hits'] + stats['misses']
+            if lookups:
+                hit_rate = 100.0 * stats['hits'] / lookups
+                lines.append(f"  - {kind}: {stats['hits']} hits, {stats['misses']} misses ({hit_rate:.1f}% hit rate)")
+        return lines
+
+
+# Shared instance used by generate_data.py and generate_data_40th.py
+classifier = ReferenceClassifier()
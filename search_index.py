@@ -0,0 +1,247 @@
+import bisect
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+from aggregates import is_document_reference
+
+SEARCH_INDEX_FILE = 'search_index.json'
+SEARCH_INDEX_VERSION = 1
+
+# Weight of a token by where it appears in an item
+FIELD_WEIGHTS = {
+    'description': 3,
+    'specRefs': 2,
+    'drawingRefs': 1
+}
+# Query tokens this long also match longer terms; prefix matches count less than exact ones
+MIN_PREFIX_LENGTH = 2
+PREFIX_FACTOR = 0.5
+DEFAULT_RESULTS = 20
+MAX_RESULTS = 200
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+def tokenize(text):
+    """'Fire Damper, FD-1' -> ['fire', 'damper', 'fd', '1']"""
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+class SearchIndexWriter:
+    """Build the inverted index of search_index.json while the generators write data.json.
+
+    Takes the same write_scope(scope, groups) calls as DataJsonWriter. Every
+    item the UI lists (document reference rows are left out) becomes a
+    document [scope id, package, item number, description, status]; each
+    token of its item number and description, spec references and drawing
+    references is posted once per document with the summed FIELD_WEIGHTS of
+    the fields it appears in.
+
+    The file holds the sorted "terms" and, concatenated in that order, their
+    postings as "docIds" and "weights"; term i owns positions offsets[i] to
+    offsets[i + 1]. Terms sharing a prefix are adjacent, so all postings of a
+    prefix are one contiguous slice.
+    """
+
+    def __init__(self, output_file=SEARCH_INDEX_FILE):
+        self.output_file = output_file
+        self.docs = []
+        self.postings = {}
+
+    def write_scope(self, scope, groups):
+        """Index one scope's items; groups is a dict or an iterable of (group, items)"""
+        scope_id = scope['id']
+        for package, items in (groups.items() if isinstance(groups, dict) else groups):
+            for item in items:
+                if is_document_reference(item):
+                    continue
+                self.add_item(scope_id, package, item)
+
+    def add_item(self, scope_id, package, item):
+        doc_id = len(self.docs)
+        self.docs.append([scope_id, package, item.get('itemNumber', ''), item.get('description', ''),
+                          item.get('status', '')])
+
+        weights = dict.fromkeys(tokenize(f"{item.get('itemNumber', '')} {item.get('description', '')}"),
+                                FIELD_WEIGHTS['description'])
+        for key in ('specRefs', 'drawingRefs'):
+            refs = item.get(key)
+            if not refs:
+                continue
+            weight = FIELD_WEIGHTS[key]
+            for token in set(tokenize(' '.join(value for ref in refs for value in ref['items']))):
+                weights[token] = weights.get(token, 0) + weight
+
+        for token, weight in weights.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = ([], [])
+            posting[0].append(doc_id)
+            posting[1].append(weight)
+
+    def close(self):
+        terms = sorted(self.postings)
+        offsets = [0]
+        doc_ids = []
+        weights = []
+        for term in terms:
+            docs, term_weights = self.postings[term]
+            doc_ids.extend(docs)
+            weights.extend(term_weights)
+            offsets.append(len(doc_ids))
+
+        temp_file = self.output_file + '.tmp'
+        # json.dumps() uses the C encoder; streaming with json.dump() is several times slower
+        text = json.dumps({
+            'version': SEARCH_INDEX_VERSION,
+            'docs': self.docs,
+            'terms': terms,
+            'offsets': offsets,
+            'docIds': doc_ids,
+            'weights': weights
+        }, separators=(',', ':'), ensure_ascii=False)
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_file, self.output_file)
+        return self.output_file
+
+class SearchIndex:
+    """Prefix search with ranking over a loaded search_index.json.
+
+    Every query token must match (AND). A token matches its exact term and,
+    from MIN_PREFIX_LENGTH characters on, every term it is a prefix of: a
+    binary search over the sorted terms finds their postings slice. A
+    document scores the sum over query tokens of weight x idf of the terms it
+    matched, with prefix matches scaled by PREFIX_FACTOR. Postings are numpy
+    arrays with each posting's weight x idf precomputed, so a query costs a
+    few vectorized passes over its own postings and never touches the rest.
+    """
+
+    def __init__(self, index_data, version=None):
+        # numpy is only needed once an index is loaded
+        import numpy as np
+
+        if index_data.get('version') != SEARCH_INDEX_VERSION:
+            raise ValueError(f"unsupported search index version {index_data.get('version')}")
+        self.np = np
+        self.version = version
+        self.docs = index_data['docs']
+        self.terms = index_data['terms']
+        self.offsets = np.array(index_data['offsets'], dtype=np.int64)
+        self.doc_ids = np.array(index_data['docIds'], dtype=np.int64)
+
+        doc_count = len(self.docs)
+        document_frequency = np.diff(self.offsets)
+        idf = np.log1p(doc_count / np.maximum(document_frequency, 1))
+        self.posting_scores = np.array(index_data['weights'], dtype=np.float64) * np.repeat(idf, document_frequency)
+
+        self.scope_ids = list(dict.fromkeys(doc[0] for doc in self.docs))
+        scope_numbers = {scope_id: number for number, scope_id in enumerate(self.scope_ids)}
+        self.doc_scopes = np.array([scope_numbers[doc[0]] for doc in self.docs], dtype=np.int32)
+
+    def _token_scores(self, token):
+        """Score of every document for one query token (0 where it does not match)"""
+        np = self.np
+        start = bisect.bisect_left(self.terms, token)
+        exact = start < len(self.terms) and self.terms[start] == token
+        if len(token) < MIN_PREFIX_LENGTH:
+            end = start + 1 if exact else start
+        else:
+            end = bisect.bisect_left(self.terms, token + '\uffff', start)
+
+        low, high = self.offsets[start], self.offsets[end]
+        scores = self.posting_scores[low:high] * PREFIX_FACTOR
+        if exact:
+            exact_end = self.offsets[start + 1]
+            scores[:exact_end - low] = self.posting_scores[low:exact_end]
+        return np.bincount(self.doc_ids[low:high], weights=scores, minlength=len(self.docs))
+
+    def search(self, query, scope=None, limit=DEFAULT_RESULTS):
+        """{total, results} for query, best first; results carry scope, package, itemNumber, description, status"""
+        np = self.np
+        if not 1 <= limit <= MAX_RESULTS:
+            raise ValueError(f"limit must be between 1 and {MAX_RESULTS}")
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self.docs:
+            return {'total': 0, 'results': []}
+
+        scores = np.zeros(len(self.docs))
+        matched = None
+        for token in tokens:
+            token_scores = self._token_scores(token)
+            scores += token_scores
+            hits = token_scores > 0
+            matched = hits if matched is None else matched & hits
+        if scope is not None:
+            if scope not in self.scope_ids:
+                return {'total': 0, 'results': []}
+            matched &= self.doc_scopes == self.scope_ids.index(scope)
+
+        candidates = np.flatnonzero(matched)
+        candidate_scores = scores[candidates]
+        if len(candidates) > limit:
+            # The limit best, taking the earliest documents among those tied at the cut-off score
+            cutoff = -np.partition(-candidate_scores, limit - 1)[limit - 1]
+            above = np.flatnonzero(candidate_scores > cutoff)
+            tied = np.flatnonzero(candidate_scores == cutoff)[:limit - len(above)]
+            best = np.concatenate((above, tied))
+            candidates, candidate_scores = candidates[best], candidate_scores[best]
+        # Best score first, ties in file order
+        order = np.lexsort((candidates, -candidate_scores))
+
+        results = []
+        for doc, score in zip(candidates[order].tolist(), candidate_scores[order].tolist()):
+            scope_id, package, item_number, description, status = self.docs[doc]
+            results.append({
+                'scope': scope_id,
+                'package': package,
+                'itemNumber': item_number,
+                'description': description,
+                'status': status,
+                'score': round(score, 3)
+            })
+        return {'total': int(matched.sum()), 'results': results}
+
+def load_search_index(index_file=SEARCH_INDEX_FILE):
+    with open(index_file, 'r', encoding='utf-8') as f:
+        return SearchIndex(json.load(f))
+
+class SearchIndexCache:
+    """The SearchIndex of search_index.json, reloaded when the file's size/mtime change"""
+
+    def __init__(self, index_file=SEARCH_INDEX_FILE):
+        self.index_file = index_file
+        self.lock = threading.Lock()
+        self.stamp = None
+        self.index = None
+
+    def get(self):
+        stat = os.stat(self.index_file)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        with self.lock:
+            if stamp != self.stamp:
+                index = load_search_index(self.index_file)
+                index.version = f'{stamp[0]}-{stamp[1]}'
+                self.index, self.stamp = index, stamp
+            return self.index
+
+    def clear(self):
+        """Drop the loaded index; the next get() loads it again"""
+        with self.lock:
+            self.index, self.stamp = None, None
+
+if __name__ == '__main__':
+    start = time.perf_counter()
+    search_index = load_search_index()
+    print(f"Loaded {SEARCH_INDEX_FILE}: {len(search_index.docs):,} items, {len(search_index.terms):,} terms "
+          f"in {time.perf_counter() - start:.3f}s")
+    for query in sys.argv[1:]:
+        start = time.perf_counter()
+        found = search_index.search(query, limit=5)
+        elapsed = time.perf_counter() - start
+        print(f"\n{query!r}: {found['total']:,} matches in {elapsed * 1000:.2f}ms")
+        for result in found['results']:
+            print(f"  {result['score']:>7.2f}  {result['scope']} / {result['package']} "
+                  f"#{result['itemNumber']}: {result['description'][:70]}")
@@ -2,41 +2,492 @@
 """
 Simple HTTP server to serve the UI files.
 Run this script and open http://localhost:8000 in your browser.
+
+Besides the static files it answers the JSON API, search, status updates and
+change events of every project in projects.json, each under /projects/<id>/
+and the default one also at /.
 """
 
+import argparse
+import gzip
+import hashlib
 import http.server
-import socketserver
+import io
+import json
 import os
-import subprocess
-import tempfile
+import threading
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from bid_item_index import DEFAULT_PAGE_SIZE, BidItemIndexCache
+from grps_index import GRPS_INDEX_FILE, GrpsIndexFile, grps_input_files
+from incremental import fingerprint_file
+from project_registry import REGISTRY_FILE, ProjectError, load_projects
+from search_index import DEFAULT_RESULTS, SEARCH_INDEX_FILE, SearchIndexCache
 
 PORT = 8000
+DEFAULT_WORKERS = 16
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'Data')
+REGISTRY_PATH = os.path.join(BASE_DIR, REGISTRY_FILE)
+# Projects whose parsed data.json and search index are kept in memory
+MAX_LOADED_PROJECTS = 4
+
+# Text assets served with ETags and compression
+CACHED_EXTENSIONS = {'.json', '.js', '.css', '.html', '.txt'}
+SUPPORTED_ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+MIN_COMPRESS_BYTES = 1024
+NO_CACHE_PREFIXES = ('/data_scopes/', '/scope-data/', '/api/', '/events', '/search')
+STATIC_CACHE_BYTES = 64 * 1024 * 1024
+# Files a project's pages load from the UI itself when the project's directories do not have them
+UI_EXTENSIONS = {'.html', '.js', '.css', '.ico', '.png', '.svg'}
+
+# Server-Sent Events: idle clients get a comment this often, slow ones are dropped after SEND_TIMEOUT
+KEEPALIVE_SECONDS = 15
+SEND_TIMEOUT = 5
+RECONNECT_MS = 3000
+
+class ExportError(Exception):
+    """Raised when the GRPS Excel export fails"""
+
+class ExportRunner:
+    """Build the GRPS Excel export in process, off the request threads, and cache it.
+
+    The workbook is built in memory by export_grps_excel and the bytes are kept
+    until one of the input JSON files changes (checked by size/mtime, then
+    content hash), so repeat downloads are served immediately. Requests that
+    arrive while a build is running wait for that build.
+    """
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='export')
+        self.lock = threading.Lock()
+        self.fingerprints = {}
+        self.cached = None
+        self.pending = None
+        self.pending_key = None
+
+    def _input_key(self):
+        """Content hashes of the export's input files, rehashing only files whose size/mtime changed"""
+        key = []
+        for path in grps_input_files(self.data_dir):
+            fingerprint = fingerprint_file(path, self.fingerprints.get(path))
+            self.fingerprints[path] = fingerprint
+            key.append((path, fingerprint['sha256'] if fingerprint else None))
+        return tuple(key)
+
+    def export(self):
+        """Return the exported workbook bytes, raising ExportError on failure"""
+        with self.lock:
+            key = self._input_key()
+            if self.cached is not None and self.cached[0] == key:
+                return self.cached[1]
+            if self.pending is None or self.pending_key != key or (self.pending.done() and self.pending.exception()):
+                self.pending = self.executor.submit(self._build_export, key)
+                self.pending_key = key
+            future = self.pending
+        return future.result()
+
+    def _build_export(self, key):
+        # Imported here so starting the server does not load openpyxl
+        import export_grps_excel
+
+        try:
+            excel_data = export_grps_excel.create_grps_excel_bytes(self.data_dir)
+        except Exception as e:
+            raise ExportError(f"Error generating Excel: {e}") from e
+
+        with self.lock:
+            self.cached = (key, excel_data)
+        return excel_data
+
+    def clear(self):
+        """Forget the cached workbook; the next export() builds it again"""
+        with self.lock:
+            self.cached, self.pending, self.pending_key = None, None, None
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+class StaticFileCache:
+    """In-memory cache of text assets with their content-hash ETag and compressed bodies.
+
+    Entries are revalidated against the file's size/mtime on every request and
+    evicted least recently used once max_bytes is exceeded. Compressed bodies
+    are produced once per encoding and reused for every later request.
+    """
+
+    def __init__(self, max_bytes=STATIC_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        stat = os.stat(path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry.stamp == (stat.st_size, stat.st_mtime_ns):
+                self.entries.move_to_end(path)
+                return entry
+
+        with open(path, 'rb') as f:
+            entry = StaticFileEntry(f.read(), (stat.st_size, stat.st_mtime_ns))
+
+        with self.lock:
+            old = self.entries.pop(path, None)
+            if old is not None:
+                self.total_bytes -= old.size
+            self.entries[path] = entry
+            self.total_bytes += entry.size
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= evicted.size
+        return entry
+
+class StaticFileEntry:
+    """One cached file: raw bytes, ETag base and compressed bodies by encoding"""
+
+    def __init__(self, data, stamp):
+        self.data = data
+        self.stamp = stamp
+        self.etag_base = hashlib.sha256(data).hexdigest()[:20]
+        self.bodies = {'identity': data}
+        self.lock = threading.Lock()
+
+    @property
+    def size(self):
+        return sum(len(body) for body in self.bodies.values())
+
+    def etag(self, encoding):
+        """Each encoding is a different representation and gets its own strong ETag"""
+        if encoding == 'identity':
+            return f'"{self.etag_base}"'
+        return f'"{self.etag_base}-{encoding}"'
+
+    def all_etags(self):
+        return {self.etag(encoding) for encoding in ('identity',) + SUPPORTED_ENCODINGS}
+
+    def body(self, encoding):
+        with self.lock:
+            if encoding not in self.bodies:
+                if encoding == 'br':
+                    self.bodies[encoding] = brotli.compress(self.data)
+                else:
+                    self.bodies[encoding] = gzip.compress(self.data, compresslevel=6, mtime=0)
+            return self.bodies[encoding]
+
+def data_version(data_file):
+    """Changes whenever data.json is rewritten; lets reconnecting pages spot missed updates"""
+    try:
+        stat = os.stat(data_file)
+    except OSError:
+        return None
+    return f'{stat.st_size}-{stat.st_mtime_ns}'
+
+class EventStream:
+    """Server-Sent Events pushed to every page connected to /events.
+
+    A subscribed socket is handed over by its request thread once the response
+    headers are sent, so an open stream does not hold one of the pooled worker
+    threads. Events are written to all sockets from the publishing thread, and
+    a keepalive comment every KEEPALIVE_SECONDS notices clients that went away.
+    """
+
+    def __init__(self):
+        self.clients = []
+        self.lock = threading.Lock()
+        self.event_id = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._keepalive, name='events', daemon=True)
+        self.thread.start()
+
+    def subscribe(self, sock, event, data):
+        """Take over sock and send it a first event"""
+        sock.settimeout(SEND_TIMEOUT)
+        with self.lock:
+            message = f'retry: {RECONNECT_MS}\n' + self._format(self.event_id, event, data)
+            if self._send(sock, message.encode('utf-8')):
+                self.clients.append(sock)
+
+    def publish(self, event, data):
+        with self.lock:
+            self.event_id += 1
+            self._broadcast(self._format(self.event_id, event, data).encode('utf-8'))
+
+    def _format(self, event_id, event, data):
+        return f'id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n'
+
+    def _broadcast(self, message):
+        self.clients = [sock for sock in self.clients if self._send(sock, message)]
+
+    def _send(self, sock, message):
+        try:
+            sock.sendall(message)
+            return True
+        except OSError:
+            sock.close()
+            return False
+
+    def _keepalive(self):
+        while not self.stopped.wait(KEEPALIVE_SECONDS):
+            with self.lock:
+                self._broadcast(b': keepalive\n\n')
+
+    def close(self):
+        self.stopped.set()
+        with self.lock:
+            for sock in self.clients:
+                sock.close()
+            self.clients = []
+
+def choose_encoding(accept_encoding, size):
+    """Pick br or gzip from an Accept-Encoding header, or identity"""
+    if size < MIN_COMPRESS_BYTES or not accept_encoding:
+        return 'identity'
+
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for encoding in SUPPORTED_ENCODINGS:
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return 'identity'
+
+class ProjectContext:
+    """Everything the server keeps for one project of the registry (see project_registry.py).
+
+    data_index and search_index cache the parsed data.json and
+    search_index.json; LoadedProjects decides whose stay in memory, and
+    unload() drops them until the next request needs them again. The status
+    updates, watcher and event stream live as long as the server, so pending
+    changes survive an unload: they are re-applied to every index loaded
+    later through the cache's on_load hook.
+    """
+
+    def __init__(self, project):
+        self.project = project
+        self.data_index = BidItemIndexCache(project.data_file)
+        self.search_index = SearchIndexCache(project.search_index_file)
+        self.export_runner = ExportRunner(project.data_dir)
+        self.grps_index = GrpsIndexFile(project.data_dir, project.output_path(GRPS_INDEX_FILE))
+        self.sqlite_file = None
+        self.events = None
+        self.watcher = None
+        self.status_updates = None
+
+    def data_version(self):
+        return data_version(self.project.data_file)
+
+    def use_database(self, db_file):
+        """Answer /api/ and /scope-data/ queries from the project's SQLite database (see sqlite_store.py)"""
+        from sqlite_store import BidItemDatabase
+
+        self.sqlite_file = self.project.output_path(db_file)
+        self.data_index = BidItemDatabase(self.sqlite_file)
+
+    def watch(self, source, interval):
+        """Rebuild data.json (and the SQLite database) when its inputs change and push the changed scopes to events"""
+        from data_watcher import DataWatcher
+
+        self.events = EventStream()
+        self.watcher = DataWatcher(self._data_changed, source, interval, self.project.data_file, self.sqlite_file,
+                                   self.project.root)
+        self.watcher.start()
+        return self.watcher
+
+    def track_statuses(self, interval):
+        """Accept status changes and write them back to the project's inputs every interval seconds"""
+        from status_journal import JOURNAL_FILE, StatusUpdates
+
+        self.status_updates = StatusUpdates(self.data_index, self.project.output_path(JOURNAL_FILE), interval,
+                                            self.project.data_dir, self.project.data_file, self.sqlite_file,
+                                            self.project.root, self.project.source)
+        self.status_updates.start()
+        return self.status_updates
+
+    def _data_changed(self, scope_ids, packages_changed):
+        if scope_ids:
+            self.events.publish('data', {'scopes': scope_ids, 'version': self.data_version()})
+        if packages_changed:
+            self.events.publish('packages', {})
+
+    def unload(self):
+        """Drop the parsed data.json and search index held in memory"""
+        self.data_index.clear()
+        self.search_index.clear()
+
+    def close(self):
+        self.export_runner.shutdown()
+        if self.status_updates is not None:
+            self.status_updates.stop()
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.events.close()
+
+class LoadedProjects:
+    """Least recently used bound on the projects whose parsed data is held in memory.
+
+    Every request that reads a project's index or search index touches its
+    ProjectContext first. Once more than max_loaded projects have been
+    touched, the least recently used ones are unloaded, so serving many
+    projects costs the memory of max_loaded and a reload (about as long as
+    the first load) when an evicted project is used again.
+    """
+
+    def __init__(self, max_loaded=MAX_LOADED_PROJECTS):
+        self.max_loaded = max_loaded
+        self.recent = OrderedDict()
+        self.lock = threading.Lock()
+
+    def touch(self, context):
+        """Mark context as the most recently used and return it"""
+        with self.lock:
+            self.recent[context.project.id] = context
+            self.recent.move_to_end(context.project.id)
+            evicted = []
+            while len(self.recent) > self.max_loaded:
+                evicted.append(self.recent.popitem(last=False)[1])
+        # Outside the lock: unloading waits for loads in progress on the evicted caches
+        for evicted_context in evicted:
+            evicted_context.unload()
+        return context
+
+class PooledHTTPServer(http.server.HTTPServer):
+    """HTTPServer that handles each connection on a bounded thread pool, so a slow export blocks no one else"""
+    
+    # The default listen backlog of 5 drops connections during bursts of page loads
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, max_workers=DEFAULT_WORKERS, registry=None,
+                 max_projects=MAX_LOADED_PROJECTS):
+        super().__init__(server_address, handler_class)
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='http')
+        self.static_cache = StaticFileCache()
+        self.projects = registry if registry is not None else load_projects(REGISTRY_PATH)
+        self.contexts = {project.id: ProjectContext(project) for project in self.projects}
+        self.loaded = LoadedProjects(max_projects)
+        self.detached = set()
+        self.detached_lock = threading.Lock()
+
+    @property
+    def default_context(self):
+        return self.contexts[self.projects.default_id]
+
+    def use_database(self, db_file):
+        """Answer /api/ and /scope-data/ queries from each project's SQLite database instead of its data.json"""
+        for context in self.contexts.values():
+            context.use_database(db_file)
+
+    def watch(self, source='auto', interval=None):
+        """Watch every project's inputs; an explicit source overrides the one of the project served at /"""
+        from data_watcher import POLL_INTERVAL
+
+        watchers = []
+        for context in self.contexts.values():
+            project_source = source if source != 'auto' and context is self.default_context else context.project.source
+            watchers.append(context.watch(project_source, interval or POLL_INTERVAL))
+        return watchers
+
+    def track_statuses(self, interval=None):
+        """Accept status changes on POST /api/items/... and write them back every interval seconds"""
+        from status_journal import COMPACT_INTERVAL
+
+        return [context.track_statuses(interval or COMPACT_INTERVAL) for context in self.contexts.values()]
+
+    def detach_request(self, request):
+        """Keep the connection open after its handler returns (the socket now belongs to someone else)"""
+        with self.detached_lock:
+            self.detached.add(request)
+
+    def shutdown_request(self, request):
+        with self.detached_lock:
+            if request in self.detached:
+                self.detached.discard(request)
+                return
+        super().shutdown_request(request)
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)
+        for context in self.contexts.values():
+            context.close()
 
 class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    project = None
+
+    def route_project(self):
+        """Pick the project a request is for and strip its /projects/<id> prefix from self.path.
+
+        Requests without the prefix are for the registry's default project.
+        Returns False when the request has been answered already (unknown
+        project, or a redirect adding the trailing slash the page's relative
+        URLs need).
+        """
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != '/projects' and not url.path.startswith('/projects/'):
+            self.project = self.server.default_context
+            return True
+
+        parts = url.path.split('/', 3)
+        project_id = urllib.parse.unquote(parts[2]) if len(parts) > 2 else ''
+        self.project = self.server.contexts.get(project_id)
+        if self.project is None:
+            self.send_error(404, f"Unknown project: {project_id}")
+            return False
+        if len(parts) < 4:
+            self.send_response(301)
+            self.send_header('Location', url.path + '/' + (f'?{url.query}' if url.query else ''))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return False
+        self.path = '/' + parts[3] + (f'?{url.query}' if url.query else '')
+        return True
+
+    def loaded_project(self):
+        """The request's project, marked as just used so its parsed data stays loaded"""
+        return self.server.loaded.touch(self.project)
+
+    def do_HEAD(self):
+        if self.route_project():
+            super().do_HEAD()
+
     def do_GET(self):
+        if not self.route_project():
+            return
         if self.path == '/export-grps-excel':
             try:
-                # Run the export script
-                result = subprocess.run(
-                    ['python', 'export_grps_excel.py'],
-                    capture_output=True,
-                    text=True,
-                    cwd=os.path.dirname(os.path.abspath(__file__))
-                )
-                
-                if result.returncode != 0:
-                    self.send_error(500, f"Error generating Excel: {result.stderr}")
-                    return
-                
-                # Read the generated Excel file
-                excel_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Data', 'GRPS_Scope_Items_Mapping.xlsx')
-                if not os.path.exists(excel_file):
-                    self.send_error(404, "Excel file not found")
-                    return
-                
-                with open(excel_file, 'rb') as f:
-                    excel_data = f.read()
-                
+                excel_data = self.project.export_runner.export()
+
                 # Send the file
                 self.send_response(200)
                 self.send_header('Content-Type', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
@@ -44,28 +495,334 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                 self.send_header('Content-Length', str(len(excel_data)))
                 self.end_headers()
                 self.wfile.write(excel_data)
+            except ExportError as e:
+                self.send_error(500, str(e))
             except Exception as e:
                 self.send_error(500, f"Server error: {str(e)}")
+        elif self.path == '/events':
+            self.send_event_stream()
+        elif self.path.startswith('/scope-data/'):
+            self.send_scope_data(urllib.parse.unquote(self.path[len('/scope-data/'):]))
+        elif self.path.startswith('/api/'):
+            self.send_api_response()
+        elif urllib.parse.urlsplit(self.path).path == '/search':
+            self.send_search_results()
+        elif urllib.parse.urlsplit(self.path).path == f'/{GRPS_INDEX_FILE}':
+            self.send_grps_index()
         else:
             # Default file serving
             super().do_GET()
-    
+
+    def do_POST(self):
+        # Only the UI's own pages may change statuses: a JSON body needs a CORS preflight, which is never granted
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            self.send_error(415, "Expected a JSON body (Content-Type: application/json)")
+            return
+        origin = self.headers.get('Origin')
+        if origin and urllib.parse.urlsplit(origin).netloc != self.headers.get('Host'):
+            self.send_error(403, "Cross-origin requests may not change data")
+            return
+        if not self.route_project():
+            return
+        parts = [urllib.parse.unquote(part) for part in urllib.parse.urlsplit(self.path).path.split('/')[1:]]
+        if len(parts) == 5 and parts[:2] == ['api', 'items'] and parts[4] == 'status':
+            self.update_status(parts[2], parts[3])
+        else:
+            self.send_error(404, "Not found")
+
+    def update_status(self, scope_id, item_number):
+        """POST /api/items/<scope id>/<item number>/status with {"status": "Pending" | "Yes" | "No"}.
+
+        The change is journaled and served at once; it reaches the source
+        CSV/40th_*.json and data.json in batches (see status_journal.py).
+        """
+        status_updates = self.loaded_project().status_updates
+        if status_updates is None:
+            self.send_error(404, "Status updates are off")
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            status = body.get('status') if isinstance(body, dict) else None
+            found = status_updates.set_status(scope_id, item_number, status)
+        except ValueError as e:
+            self.send_error(400, str(e))
+            return
+        except FileNotFoundError as e:
+            self.send_not_built(e)
+            return
+        except OSError as e:
+            self.send_error(500, f"Could not record the change: {e}")
+            return
+        if not found:
+            self.send_error(404, f"Unknown item: {scope_id} #{item_number}")
+            return
+        if self.project.events is not None:
+            self.project.events.publish('data', {'scopes': [scope_id], 'version': self.project.data_version()})
+        self.send_json({'scope': scope_id, 'itemNumber': item_number, 'status': status})
+
+    def send_not_built(self, error):
+        """404 for a project whose generated files are missing (listed but never built)"""
+        self.send_error(404, f"Project {self.project.project.id} not built ({error.filename} is missing)")
+
+    def send_event_stream(self):
+        """Hand the connection to the server's EventStream (watch mode only)"""
+        events = self.project.events
+        if events is None:
+            self.send_error(404, "Watch mode is off (start the server with --watch)")
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        self.close_connection = True
+        self.server.detach_request(self.request)
+        events.subscribe(self.request, 'hello', {'version': self.project.data_version()})
+
+    def send_scope_data(self, scope_id):
+        """One scope of data.json with expanded references, for pages refreshing a changed scope"""
+        try:
+            scope_data = self.loaded_project().data_index.get().scope_data(scope_id)
+        except FileNotFoundError as e:
+            self.send_not_built(e)
+            return
+        except (OSError, ValueError) as e:
+            self.send_error(500, f"Could not read data.json: {e}")
+            return
+        if scope_data is None:
+            self.send_error(404, f"Unknown scope: {scope_id}")
+            return
+        self.send_json(scope_data)
+
+    def send_api_response(self):
+        """Query API over the in-memory index of data.json (bid_item_index.py), or SQLite with --sqlite:
+
+        /api/scopes                     scopes with their status counts
+        /api/scopes/<id>/packages       packages of a scope with their status counts
+        /api/scopes/<id>/items          one page of items: ?package=&status=&offset=&limit=
+        /api/projects                   the projects this server hosts and the one the page is for
+        """
+        url = urllib.parse.urlsplit(self.path)
+        parts = [urllib.parse.unquote(part) for part in url.path.split('/')[2:]]
+        query = urllib.parse.parse_qs(url.query)
+        if parts == ['projects']:
+            self.send_json({
+                'default': self.server.projects.default_id,
+                'current': self.project.project.id,
+                'projects': [project.to_json() for project in self.server.projects]
+            })
+            return
+        try:
+            index = self.loaded_project().data_index.get()
+        except FileNotFoundError as e:
+            self.send_not_built(e)
+            return
+        except (OSError, ValueError) as e:
+            self.send_error(500, f"Could not read data.json: {e}")
+            return
+
+        result = None
+        if parts == ['scopes']:
+            result = {'version': index.version, 'scopes': index.scope_list()}
+        elif len(parts) == 3 and parts[0] == 'scopes' and parts[2] == 'packages':
+            packages = index.package_list(parts[1])
+            if packages is not None:
+                result = {'scope': parts[1], 'packages': packages}
+        elif len(parts) == 3 and parts[0] == 'scopes' and parts[2] == 'items':
+            try:
+                result = index.items(
+                    parts[1],
+                    package=query.get('package', [None])[0],
+                    status=query.get('status', ['all'])[0],
+                    offset=int(query.get('offset', [0])[0]),
+                    limit=int(query.get('limit', [DEFAULT_PAGE_SIZE])[0])
+                )
+            except ValueError as e:
+                self.send_error(400, str(e))
+                return
+        if result is None:
+            self.send_error(404, "Not found")
+            return
+        self.send_json(result)
+
+    def send_search_results(self):
+        """/search?q=&scope=&limit=: ranked bid items matching every word of q (words match as prefixes)"""
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        try:
+            index = self.loaded_project().search_index.get()
+        except FileNotFoundError as e:
+            self.send_not_built(e)
+            return
+        except (OSError, ValueError) as e:
+            self.send_error(500, f"Could not read {SEARCH_INDEX_FILE}: {e}")
+            return
+
+        q = query.get('q', [''])[0]
+        try:
+            found = index.search(q, scope=query.get('scope', [None])[0],
+                                 limit=int(query.get('limit', [DEFAULT_RESULTS])[0]))
+        except ValueError as e:
+            self.send_error(400, str(e))
+            return
+        status_updates = self.project.status_updates
+        if status_updates is not None:
+            # search_index.json catches up with status changes when they are written back
+            for result in found['results']:
+                result['status'] = status_updates.status_of(result['scope'], result['itemNumber']) or result['status']
+        self.send_json({'query': q, 'version': index.version, **found})
+
+    def send_grps_index(self):
+        """grps_index.json, rebuilt first when the grps_*.json files changed since it was written"""
+        try:
+            self.project.grps_index.refresh()
+        except (OSError, ValueError) as e:
+            self.send_error(500, f"Could not rebuild {GRPS_INDEX_FILE}: {e}")
+            return
+        super().do_GET()
+
+    def send_json(self, obj):
+        data = json.dumps(obj, ensure_ascii=False).encode('utf-8')
+        encoding = choose_encoding(self.headers.get('Accept-Encoding'), len(data))
+        body = StaticFileEntry(data, None).body(encoding)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def translate_path(self, path):
+        """Project files come from the project's output directory, then Data/ from its root, then the UI files"""
+        project = self.project.project
+        output_path = self._translate_path(path, project.output_dir)
+        if os.path.isfile(output_path):
+            return output_path
+        url_path = urllib.parse.urlsplit(path).path
+        if url_path.startswith('/Data/'):
+            return self._translate_path(path, project.root)
+        if url_path == '/' or os.path.splitext(url_path)[1].lower() in UI_EXTENSIONS:
+            return super().translate_path(path)
+        return output_path
+
+    def _translate_path(self, path, directory):
+        """SimpleHTTPRequestHandler.translate_path() with another directory served"""
+        served = self.directory
+        self.directory = os.path.abspath(directory)
+        try:
+            return super().translate_path(path)
+        finally:
+            self.directory = served
+
+    def send_head(self):
+        """Serve text assets with ETag revalidation and compression, everything else as usual"""
+        path = self.translate_path(self.path)
+        if os.path.splitext(path)[1].lower() in CACHED_EXTENSIONS and os.path.isfile(path):
+            try:
+                return self.send_cached_file(path)
+            except OSError:
+                self.send_error(404, "File not found")
+                return None
+        return super().send_head()
+
+    def send_cached_file(self, path):
+        entry = self.server.static_cache.get(path)
+        encoding = choose_encoding(self.headers.get('Accept-Encoding'), len(entry.data))
+
+        # Conditional GET: the client already has this content
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+            if '*' in tags or tags & entry.all_etags():
+                self.send_response(304)
+                self.send_header('ETag', entry.etag(encoding))
+                self.send_header('Vary', 'Accept-Encoding')
+                self.end_headers()
+                return None
+
+        body = entry.body(encoding)
+
+        self.send_response(200)
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', entry.etag(encoding))
+        self.send_header('Last-Modified', self.date_time_string(entry.stamp[1] // 1_000_000_000))
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        return io.BytesIO(body)
+
     def end_headers(self):
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        # Prevent caching of data.json to ensure fresh data
-        if self.path.endswith('data.json'):
-            self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
-            self.send_header('Pragma', 'no-cache')
-            self.send_header('Expires', '0')
+        # Other sites may read the UI files, but the API (status updates included) is same-origin only
+        if not self.path.startswith('/api/'):
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET')
+        # Always revalidate data.json (and its per-scope shards) so the UI sees fresh data;
+        # the ETag makes an unchanged file a cheap 304. Generated responses are never cached.
+        if self.path.endswith('data.json') or self.path.startswith(NO_CACHE_PREFIXES):
+            self.send_header('Cache-Control', 'no-cache')
         super().end_headers()
 
+def create_server(port=PORT, workers=DEFAULT_WORKERS, bind='', handler_class=MyHTTPRequestHandler, registry=None,
+                  max_projects=MAX_LOADED_PROJECTS):
+    """Create the UI server, serving the UI files from this script's directory and the projects of registry
+    (by default projects.json next to this script)"""
+    handler = lambda *args, **kwargs: handler_class(*args, directory=BASE_DIR, **kwargs)
+    return PooledHTTPServer((bind, port), handler, max_workers=workers, registry=registry, max_projects=max_projects)
+
 if __name__ == "__main__":
-    os.chdir(os.path.dirname(os.path.abspath(__file__)))
-    
-    with socketserver.TCPServer(("", PORT), MyHTTPRequestHandler) as httpd:
-        print(f"Server running at http://localhost:{PORT}/")
+    from data_watcher import POLL_INTERVAL, WATCH_SOURCES
+    from status_journal import COMPACT_INTERVAL
+
+    parser = argparse.ArgumentParser(description='Serve the Bid Items UI')
+    parser.add_argument('--port', type=int, default=PORT, help=f'port to listen on (default: {PORT})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'maximum number of requests handled at once (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--watch', nargs='?', const='auto', choices=WATCH_SOURCES,
+                        help="rebuild each project's data.json when its inputs change and push updates to open "
+                             'pages; packages watches the Data/ CSVs and package files, 40th the 40th_*.json files '
+                             f'(default: auto, the source in {REGISTRY_FILE}; an explicit source applies to the '
+                             'project served at /)')
+    parser.add_argument('--watch-interval', type=float, default=POLL_INTERVAL,
+                        help=f'seconds between checks of the watched files (default: {POLL_INTERVAL})')
+    parser.add_argument('--sqlite', nargs='?', const='bid_items.db', metavar='FILE',
+                        help='answer /api/ queries from the SQLite database the generators write with --sqlite '
+                             "instead of indexing data.json in memory (default file: bid_items.db in each project's "
+                             'output directory)')
+    parser.add_argument('--compact-interval', type=float, default=COMPACT_INTERVAL,
+                        help='seconds between write-backs of status changes to the source files and data.json '
+                             f'(default: {COMPACT_INTERVAL:g})')
+    parser.add_argument('--max-projects', type=int, default=MAX_LOADED_PROJECTS,
+                        help='number of projects whose parsed data is kept in memory; the least recently used '
+                             f'beyond that are unloaded (default: {MAX_LOADED_PROJECTS})')
+    args = parser.parse_args()
+    if args.max_projects < 1:
+        parser.error('--max-projects must be at least 1')
+
+    os.chdir(BASE_DIR)
+
+    try:
+        registry = load_projects(REGISTRY_FILE)
+    except ProjectError as e:
+        parser.error(str(e))
+
+    with create_server(args.port, args.workers, registry=registry, max_projects=args.max_projects) as httpd:
+        if args.sqlite:
+            httpd.use_database(args.sqlite)
+        httpd.track_statuses(args.compact_interval)
+        if args.watch:
+            httpd.watch(args.watch, args.watch_interval)
+        for context in httpd.contexts.values():
+            project = context.project
+            url_path = '/' if project.id == registry.default_id else f'/projects/{project.id}/'
+            print(f"Project {project.name}: http://localhost:{args.port}{url_path} ({project.data_file})")
+            if args.sqlite:
+                print(f"  Answering queries from {context.sqlite_file}")
+            if context.watcher is not None:
+                print(f"  Watching the {context.watcher.source} inputs of data.json for changes")
+        print(f"Server running at http://localhost:{args.port}/ ({args.workers} workers, "
+              f"{args.max_projects} projects kept loaded)")
         print("Press Ctrl+C to stop the server")
         try:
             httpd.serve_forever()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Local load test for server.py.
+
+Starts the server on a free port, measures static file latency while idle,
+then measures it again while several clients keep requesting GRPS Excel
+exports. The export cache is cleared before every request, so each one
+builds the workbook again instead of sharing one cached build. With the
+pooled server the static numbers should stay close to the idle ones.
+
+    python server_load_test.py --exports 4 --requests 200
+"""
+
+import argparse
+import statistics
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from server import DEFAULT_WORKERS, MyHTTPRequestHandler, create_server
+
+STATIC_PATHS = ['/index.html', '/styles.css', '/app.js', '/data.json']
+
+class QuietHandler(MyHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+def fetch(url):
+    """GET url and return (status, seconds)"""
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=120) as response:
+        response.read()
+        status = response.status
+    return status, time.perf_counter() - start
+
+def measure_static(base_url, requests, concurrency):
+    """Latencies in milliseconds for requests static GETs spread over concurrency clients"""
+    urls = [base_url + STATIC_PATHS[i % len(STATIC_PATHS)] for i in range(requests)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, urls))
+    return [seconds * 1000 for _, seconds in results]
+
+def summarize(label, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    print(f"{label:<32} n={len(latencies):<5} p50={statistics.median(latencies):7.2f}ms "
+          f"p95={p95:7.2f}ms max={latencies[-1]:7.2f}ms")
+
+def run_load_test(exports, requests, concurrency, workers):
+    server = create_server(port=0, workers=workers, bind='127.0.0.1', handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"Server on {base_url} with {workers} workers")
+
+    try:
+        summarize('static, idle', measure_static(base_url, requests, concurrency))
+
+        export_times = []
+        export_errors = []
+        measuring = threading.Event()
+        measuring.set()
+        runner = server.default_context.export_runner
+
+        def run_exports():
+            # Keep exporting until the static measurement is done, each request an uncached build
+            while measuring.is_set():
+                runner.clear()
+                try:
+                    export_times.append(fetch(base_url + '/export-grps-excel')[1])
+                except Exception as e:
+                    export_errors.append(e)
+                    return
+
+        export_threads = [threading.Thread(target=run_exports) for _ in range(exports)]
+        for thread in export_threads:
+            thread.start()
+        # Give the exports a moment to occupy their workers
+        time.sleep(0.05)
+
+        in_flight = measure_static(base_url, requests, concurrency)
+        measuring.clear()
+        summarize(f'static, {exports} export clients busy', in_flight)
+
+        for thread in export_threads:
+            thread.join()
+
+        if export_times:
+            summarize('exports (uncached builds)', [seconds * 1000 for seconds in export_times])
+        if export_errors:
+            print(f"Export errors: {export_errors[0]}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Load test static files while uncached exports are in flight')
+    parser.add_argument('--exports', type=int, default=4, help='concurrent export clients (default: 4)')
+    parser.add_argument('--requests', type=int, default=200, help='static requests per measurement (default: 200)')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent static clients (default: 8)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'server worker limit (default: {DEFAULT_WORKERS})')
+    args = parser.parse_args()
+
+    run_load_test(args.exports, args.requests, args.concurrency, args.workers)
@@ -0,0 +1,389 @@
+import contextlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from aggregates import STATUS_FILTERS, is_document_reference, status_filter
+from bid_item_index import DEFAULT_PAGE_SIZE, BidItemIndex, check_page_args
+from interned_refs import ReferenceInterner
+
+SQLITE_FILE = 'bid_items.db'
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE scopes (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    code TEXT,
+    name TEXT NOT NULL
+);
+CREATE TABLE packages (
+    id INTEGER PRIMARY KEY,
+    scope_id TEXT NOT NULL REFERENCES scopes(id),
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE (scope_id, name)
+);
+CREATE TABLE bid_items (
+    id INTEGER PRIMARY KEY,
+    scope_id TEXT NOT NULL REFERENCES scopes(id),
+    package_id INTEGER NOT NULL REFERENCES packages(id),
+    item_number TEXT,
+    description TEXT,
+    status TEXT,
+    status_filter TEXT,
+    listed INTEGER NOT NULL
+);
+CREATE TABLE ref_categories (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE sheets (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE specs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    code TEXT
+);
+CREATE TABLE drawing_refs (
+    item_id INTEGER NOT NULL REFERENCES bid_items(id),
+    ref_group INTEGER NOT NULL,
+    category_id INTEGER NOT NULL REFERENCES ref_categories(id),
+    sheet_id INTEGER NOT NULL REFERENCES sheets(id)
+);
+CREATE TABLE spec_refs (
+    item_id INTEGER NOT NULL REFERENCES bid_items(id),
+    ref_group INTEGER NOT NULL,
+    category_id INTEGER NOT NULL REFERENCES ref_categories(id),
+    spec_id INTEGER NOT NULL REFERENCES specs(id)
+);
+"""
+
+# Created after the bulk load, which is faster than maintaining them row by row
+INDEXES = """
+CREATE INDEX idx_bid_items_scope ON bid_items (scope_id, listed, status_filter);
+CREATE INDEX idx_bid_items_package ON bid_items (package_id, listed, status_filter);
+CREATE INDEX idx_specs_code ON specs (code);
+CREATE INDEX idx_drawing_refs_item ON drawing_refs (item_id);
+CREATE INDEX idx_spec_refs_item ON spec_refs (item_id);
+CREATE INDEX idx_spec_refs_spec ON spec_refs (spec_id);
+"""
+
+REF_TABLES = {
+    'drawingRefs': ('drawing_refs', 'sheet_id', 'sheets'),
+    'specRefs': ('spec_refs', 'spec_id', 'specs')
+}
+
+def spec_code(spec):
+    """'26 05 19 - Low-Voltage Conductors' -> '26 05 19'"""
+    return spec.split(' - ', 1)[0].strip()
+
+class BidItemDatabaseWriter:
+    """Write generated scopes into a normalized SQLite database.
+
+    Takes the same write_scope(scope, groups) calls as DataJsonWriter, so a
+    generator can fill both. Bid item IDs follow the output order (scope,
+    package, item), so ordering by ID lists items as data.json does. Rows
+    are collected per scope and inserted with executemany inside one
+    transaction; reference strings are interned into the sheets/specs/
+    ref_categories tables (see interned_refs.py) and the indexes are created
+    once everything is loaded. The database is built in a temporary file and
+    moved over db_file on close(), so readers never see a half-written
+    database.
+    """
+
+    def __init__(self, db_file=SQLITE_FILE):
+        self.db_file = db_file
+        self.temp_file = db_file + '.tmp'
+        if os.path.exists(self.temp_file):
+            os.remove(self.temp_file)
+        self.conn = sqlite3.connect(self.temp_file)
+        # Nothing reads the file until it is complete, so skip the rollback journal
+        self.conn.execute('PRAGMA journal_mode = OFF')
+        self.conn.execute('PRAGMA synchronous = OFF')
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        self.conn.execute('BEGIN')
+        self.interner = ReferenceInterner()
+        self.scope_count = 0
+        self.package_count = 0
+        self.item_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.conn.close()
+            os.remove(self.temp_file)
+        return False
+
+    def write_scope(self, scope, groups):
+        """Insert one scope; groups is a dict or an iterable of (group, items)"""
+        scope_id = scope['id']
+        self.conn.execute('INSERT INTO scopes VALUES (?, ?, ?, ?)',
+                          (scope_id, self.scope_count, scope.get('code'), scope['name']))
+        self.scope_count += 1
+
+        packages = []
+        items = []
+        refs = {key: [] for key in REF_TABLES}
+        for position, (name, group_items) in enumerate(groups.items() if isinstance(groups, dict) else groups):
+            self.package_count += 1
+            package_id = self.package_count
+            packages.append((package_id, scope_id, position, name))
+            for item in group_items:
+                self.item_count += 1
+                item_id = self.item_count
+                status = item.get('status')
+                items.append((item_id, scope_id, package_id, item.get('itemNumber'), item.get('description'),
+                              status, status_filter(status), int(not is_document_reference(item))))
+                interned = self.interner.intern_item(item)
+                for key in REF_TABLES:
+                    for ref_group, (category_id, *value_ids) in enumerate(interned.get(key, [])):
+                        refs[key].extend((item_id, ref_group, category_id, value_id) for value_id in value_ids)
+
+        self.conn.executemany('INSERT INTO packages VALUES (?, ?, ?, ?)', packages)
+        self.conn.executemany('INSERT INTO bid_items VALUES (?, ?, ?, ?, ?, ?, ?, ?)', items)
+        for key, (table, _, _) in REF_TABLES.items():
+            self.conn.executemany(f'INSERT INTO {table} VALUES (?, ?, ?, ?)', refs[key])
+
+    def close(self):
+        """Write the reference tables and indexes, commit and move the database into place"""
+        tables = self.interner.tables
+        self.conn.executemany('INSERT INTO ref_categories VALUES (?, ?)', enumerate(tables['categories']))
+        self.conn.executemany('INSERT INTO sheets VALUES (?, ?)', enumerate(tables['sheets']))
+        self.conn.executemany('INSERT INTO specs VALUES (?, ?, ?)',
+                              ((spec_id, spec, spec_code(spec)) for spec_id, spec in enumerate(tables['specs'])))
+        self.conn.executescript(INDEXES)
+        self.conn.commit()
+        self.conn.execute('ANALYZE')
+        self.conn.close()
+        os.replace(self.temp_file, self.db_file)
+        return self.db_file
+
+class BidItemDatabase:
+    """Answers the same queries as BidItemIndex (bid_item_index.py) from a bid items database.
+
+    Every query opens the database read-only, so requests on different threads
+    never share a connection, and a database the generator has replaced since
+    is picked up by the next query. get() returns the database itself, so it
+    can stand in for a BidItemIndexCache, including its on_load hook, which
+    is called whenever the generator has replaced the file. set_status()
+    updates a single row.
+    """
+
+    def __init__(self, db_file=SQLITE_FILE):
+        self.db_file = db_file
+        self.lock = threading.Lock()
+        self.inode = None
+        self.on_load = None
+
+    def get(self):
+        try:
+            stat = os.stat(self.db_file)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"{self.db_file} not found") from None
+        with self.lock:
+            # The generator moves a new database into place, so a new file means a new inode
+            if stat.st_ino != self.inode:
+                if self.on_load is not None:
+                    self.on_load(self)
+                self.inode = stat.st_ino
+        return self
+
+    def clear(self):
+        """Nothing to drop: the items stay on disk (BidItemIndexCache.clear() counterpart)"""
+
+    @property
+    def version(self):
+        stat = os.stat(self.db_file)
+        return f'{stat.st_size}-{stat.st_mtime_ns}'
+
+    def _connect(self):
+        uri = 'file:' + os.path.abspath(self.db_file).replace('?', '%3F') + '?mode=ro'
+        return contextlib.closing(sqlite3.connect(uri, uri=True))
+
+    def _counts(self, conn, where, params):
+        counts = dict.fromkeys(STATUS_FILTERS, 0)
+        for key, n in conn.execute(
+                f'SELECT status_filter, COUNT(*) FROM bid_items WHERE listed = 1 AND {where} GROUP BY status_filter',
+                params):
+            counts['all'] += n
+            if key is not None:
+                counts[key] = n
+        return counts
+
+    def scope_list(self):
+        with self._connect() as conn:
+            scopes = conn.execute('SELECT id, code, name FROM scopes ORDER BY position').fetchall()
+            return [{'code': code, 'name': name, 'id': scope_id,
+                     'counts': self._counts(conn, 'scope_id = ?', (scope_id,))}
+                    for scope_id, code, name in scopes]
+
+    def package_list(self, scope_id):
+        with self._connect() as conn:
+            packages = conn.execute('SELECT id, name FROM packages WHERE scope_id = ? ORDER BY position',
+                                    (scope_id,)).fetchall()
+            if not packages and not self._scope_exists(conn, scope_id):
+                return None
+            return [{'name': name, **self._counts(conn, 'package_id = ?', (package_id,))}
+                    for package_id, name in packages]
+
+    def _scope_exists(self, conn, scope_id):
+        return conn.execute('SELECT 1 FROM scopes WHERE id = ?', (scope_id,)).fetchone() is not None
+
+    def items(self, scope_id, package=None, status='all', offset=0, limit=DEFAULT_PAGE_SIZE):
+        """Same result as BidItemIndex.items()"""
+        check_page_args(status, offset, limit)
+        with self._connect() as conn:
+            if not self._scope_exists(conn, scope_id):
+                return None
+            where, params = 'b.scope_id = ? AND b.listed = 1', [scope_id]
+            if package is not None:
+                row = conn.execute('SELECT id FROM packages WHERE scope_id = ? AND name = ?',
+                                   (scope_id, package)).fetchone()
+                if row is None:
+                    return None
+                where, params = 'b.package_id = ? AND b.listed = 1', [row[0]]
+            if status != 'all':
+                where += ' AND b.status_filter = ?'
+                params.append(status)
+
+            total = conn.execute(f'SELECT COUNT(*) FROM bid_items b WHERE {where}', params).fetchone()[0]
+            rows = conn.execute(
+                f'SELECT b.id, p.name, b.item_number, b.description, b.status '
+                f'FROM bid_items b JOIN packages p ON p.id = b.package_id '
+                f'WHERE {where} ORDER BY b.id LIMIT ? OFFSET ?',
+                params + [limit, offset]).fetchall()
+            items = self._load_items(conn, rows, f'r.item_id IN ({",".join("?" * len(rows))})',
+                                     [row[0] for row in rows])
+        return {'total': total, 'offset': offset, 'limit': limit,
+                'items': [{**item, 'package': row[1]} for row, item in zip(rows, items)]}
+
+    def scope_data(self, scope_id):
+        """Same result as BidItemIndex.scope_data(): the whole scope, including document reference rows"""
+        with self._connect() as conn:
+            scope = conn.execute('SELECT code, name FROM scopes WHERE id = ?', (scope_id,)).fetchone()
+            if scope is None:
+                return None
+            rows = conn.execute(
+                'SELECT b.id, p.name, b.item_number, b.description, b.status '
+                'FROM bid_items b JOIN packages p ON p.id = b.package_id '
+                'WHERE b.scope_id = ? ORDER BY b.id', (scope_id,)).fetchall()
+            # A scope's items have consecutive IDs
+            items = self._load_items(conn, rows, 'r.item_id BETWEEN ? AND ?', [rows[0][0], rows[-1][0]] if rows else [])
+            aggregates = {**self._counts(conn, 'scope_id = ?', (scope_id,)), 'groups': {}}
+            groups = {}
+            for package_id, name in conn.execute('SELECT id, name FROM packages WHERE scope_id = ? ORDER BY position',
+                                                 (scope_id,)).fetchall():
+                aggregates['groups'][name] = self._counts(conn, 'package_id = ?', (package_id,))
+                groups[name] = []
+
+        for row, item in zip(rows, items):
+            groups[row[1]].append(item)
+        return {
+            'scope': {'code': scope[0], 'name': scope[1], 'id': scope_id},
+            'aggregates': aggregates,
+            'bidItems': groups
+        }
+
+    def has_item(self, scope_id, item_number):
+        with self._connect() as conn:
+            return conn.execute('SELECT 1 FROM bid_items WHERE scope_id = ? AND item_number = ? AND listed = 1',
+                                (scope_id, item_number)).fetchone() is not None
+
+    def set_status(self, scope_id, item_number, status):
+        """Change a listed item's status; False for an unknown item"""
+        with contextlib.closing(sqlite3.connect(self.db_file)) as conn, conn:
+            cursor = conn.execute(
+                'UPDATE bid_items SET status = ?, status_filter = ? WHERE scope_id = ? AND item_number = ? AND listed = 1',
+                (status, status_filter(status), scope_id, item_number))
+        return cursor.rowcount > 0
+
+    def _load_items(self, conn, rows, ref_condition, params):
+        """Bid item dicts for (id, package, number, description, status) rows, with their references"""
+        refs = {row[0]: {key: [] for key in REF_TABLES} for row in rows}
+        if rows:
+            for key, (table, value_column, value_table) in REF_TABLES.items():
+                query = (f'SELECT r.item_id, r.ref_group, c.name, v.name FROM {table} r '
+                         f'JOIN ref_categories c ON c.id = r.category_id JOIN {value_table} v ON v.id = r.{value_column} '
+                         f'WHERE {ref_condition} ORDER BY r.item_id, r.rowid')
+                for item_id, ref_group, category, value in conn.execute(query, params):
+                    groups = refs[item_id][key]
+                    if len(groups) <= ref_group:
+                        groups.append({'category': category, 'count': 0, 'items': []})
+                    groups[ref_group]['count'] += 1
+                    groups[ref_group]['items'].append(value)
+        return [
+            {
+                'itemNumber': number,
+                'description': description,
+                'status': status,
+                'drawingRefs': refs[item_id]['drawingRefs'],
+                'specRefs': refs[item_id]['specRefs']
+            }
+            for item_id, _, number, description, status in rows
+        ]
+
+def write_database(data, db_file=SQLITE_FILE):
+    """Write {scopes, bidItems} (as read_data_json returns it) to db_file"""
+    with BidItemDatabaseWriter(db_file) as writer:
+        for scope in data['scopes']:
+            writer.write_scope(scope, data['bidItems'].get(scope['id'], {}))
+    return db_file
+
+def compare_with_json(data_file='data.json', db_file=SQLITE_FILE, repeat=20):
+    """Time loading and querying data_file through BidItemIndex against db_file through BidItemDatabase"""
+    from json_writer import read_data_json
+
+    start = time.perf_counter()
+    data = read_data_json(data_file)
+    index = BidItemIndex(data)
+    json_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    write_database(data, db_file)
+    db_write = time.perf_counter() - start
+
+    database = BidItemDatabase(db_file)
+    start = time.perf_counter()
+    database.scope_list()
+    db_load = time.perf_counter() - start
+
+    print(f"{data_file}: {os.path.getsize(data_file):,} bytes, {db_file}: {os.path.getsize(db_file):,} bytes "
+          f"(written in {db_write:.3f}s)")
+    print(f"{'query':<40} {'JSON index':>11} {'SQLite':>11}")
+    print(f"{'load (first query)':<40} {json_load * 1000:>9.2f}ms {db_load * 1000:>9.2f}ms")
+
+    scope_id = data['scopes'][0]['id']
+    packages = index.package_list(scope_id)
+    largest = max(packages, key=lambda package: package['all'])['name']
+    total = index.items(scope_id, limit=1)['total']
+    queries = [
+        ('scope list', lambda source: source.scope_list()),
+        ('package list', lambda source: source.package_list(scope_id)),
+        ('first page (100)', lambda source: source.items(scope_id)),
+        ('last page (100)', lambda source: source.items(scope_id, offset=max(total - 100, 0))),
+        ('package page, pending (100)', lambda source: source.items(scope_id, largest, 'pending')),
+        ('whole scope', lambda source: source.scope_data(scope_id))
+    ]
+    for label, query in queries:
+        if query(index) != query(database):
+            print(f"Warning: {label} differs between the JSON index and the database")
+        times = []
+        for source in (index, database):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                query(source)
+            times.append((time.perf_counter() - start) / repeat)
+        print(f"{label:<40} {times[0] * 1000:>9.2f}ms {times[1] * 1000:>9.2f}ms")
+
+if __name__ == '__main__':
+    compare_with_json(*sys.argv[1:3])
@@ -0,0 +1,277 @@
+import csv
+import io
+import json
+import os
+import threading
+import traceback
+from datetime import datetime
+
+from data_watcher import detect_source, rebuild_data_json
+from disciplines import DISCIPLINE_FILES
+from incremental import MANIFEST_FILE
+
+JOURNAL_FILE = 'status_journal.jsonl'
+STATUSES = ('Pending', 'Yes', 'No')
+COMPACT_INTERVAL = 30.0
+# Compact early once this many items have pending changes
+COMPACT_BATCH = 500
+
+def _csv_records(text):
+    """(raw text, fields) per CSV record; a record spans several lines when a quoted field contains newlines"""
+    lines = []
+
+    def feed():
+        for line in io.StringIO(text, newline=''):
+            lines.append(line)
+            yield line
+
+    for row in csv.reader(feed()):
+        raw = ''.join(lines)
+        lines.clear()
+        yield raw, row
+
+def write_csv_statuses(csv_file, statuses):
+    """Set the Status cell of items ({item number: status}) in a *_BidItems.csv export.
+
+    Only the changed records are written out again (every field quoted, the
+    export's leading tab kept), so the rest of the file stays byte-identical.
+    Returns the item numbers that were not found.
+    """
+    with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+
+    remaining = dict(statuses)
+    status_column = None
+    records = []
+    for raw, row in _csv_records(text):
+        if status_column is None:
+            # Rows above the header hold the project name
+            cells = [cell.strip() for cell in row]
+            if 'Status' in cells:
+                status_column = cells.index('Status')
+        elif row and len(row) > status_column:
+            item_number = row[0].strip().strip('"').strip()
+            if item_number in remaining:
+                cell = row[status_column]
+                row[status_column] = cell[:len(cell) - len(cell.lstrip())] + remaining.pop(item_number)
+                ending = raw[len(raw.rstrip('\r\n')):]
+                out = io.StringIO()
+                csv.writer(out, quoting=csv.QUOTE_ALL, lineterminator=ending).writerow(row)
+                raw = out.getvalue()
+        records.append(raw)
+
+    temp_file = csv_file + '.tmp'
+    with open(temp_file, 'w', encoding='utf-8', newline='') as f:
+        f.write(''.join(records))
+    os.replace(temp_file, csv_file)
+    return list(remaining)
+
+def write_40th_statuses(json_file, statuses):
+    """Set a "status" field on items ({item id: status}) of a 40th_*.json file; returns the ids not found"""
+    with open(json_file, 'r', encoding='utf-8') as f:
+        items = json.load(f)
+
+    remaining = dict(statuses)
+    for item in items:
+        item_number = str(item.get('id', ''))
+        if item_number in remaining:
+            item['status'] = remaining.pop(item_number)
+
+    temp_file = json_file + '.tmp'
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(items, f, indent=2, ensure_ascii=False)
+    os.replace(temp_file, json_file)
+    return list(remaining)
+
+class StatusJournal:
+    """Append-only log of status changes, one JSON line per change.
+
+    append() writes and fsyncs a single line, so a change is on disk before it
+    is acknowledged, however large the project. replay() returns the latest
+    status per item; rewrite() replaces the log with the changes still pending.
+    """
+
+    def __init__(self, journal_file=JOURNAL_FILE):
+        self.journal_file = journal_file
+        self.file = None
+
+    def replay(self):
+        """{(scope id, item number): status}, the last change of each item winning"""
+        changes = {}
+        try:
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut short by a crash was never acknowledged
+                        continue
+                    changes[(entry['scope'], entry['itemNumber'])] = entry['status']
+        except FileNotFoundError:
+            pass
+        return changes
+
+    def _open(self):
+        self.file = open(self.journal_file, 'a+', encoding='utf-8')
+        # Start on a new line after a write cut short by a crash
+        if self.file.tell() > 0:
+            self.file.seek(self.file.tell() - 1)
+            if self.file.read(1) != '\n':
+                self.file.write('\n')
+
+    def append(self, scope_id, item_number, status):
+        if self.file is None:
+            self._open()
+        entry = {'scope': scope_id, 'itemNumber': item_number, 'status': status,
+                 'time': datetime.now().isoformat(timespec='seconds')}
+        self.file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def rewrite(self, changes):
+        """Replace the journal with changes ({(scope id, item number): status})"""
+        self.close()
+        temp_file = self.journal_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            for (scope_id, item_number), status in changes.items():
+                f.write(json.dumps({'scope': scope_id, 'itemNumber': item_number, 'status': status},
+                                   ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.journal_file)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+class StatusUpdates:
+    """Status changes made through the server, journaled at once and written back in batches.
+
+    set_status() appends the change to the StatusJournal and applies it to
+    the served index (a BidItemIndexCache or BidItemDatabase), so the next
+    response already shows it; nothing else is rewritten per change. The
+    latest status of each changed item stays pending until compact() writes
+    the batch back to the generator's source, the Status column of the
+    *_BidItems.csv exports or a "status" field on the 40th_*.json items. It
+    then rebuilds data.json incrementally (and with it search_index.json and
+    sqlite_file) and trims the journal to the changes made meanwhile.
+
+    compact() runs every interval seconds while changes are pending, sooner
+    once COMPACT_BATCH items are pending, and on stop(). Changes left in the
+    journal by an earlier run are pending again at start-up; pending changes
+    are re-applied to every index the cache loads (its on_load hook).
+
+    source is the generator to write back for ('auto': whichever last wrote
+    the data.manifest.json next to output_file) and root the directory
+    holding its inputs (see project_registry.py); relative paths are relative
+    to the working directory.
+    """
+
+    def __init__(self, data_index, journal_file=JOURNAL_FILE, interval=COMPACT_INTERVAL, data_dir='Data',
+                 output_file='data.json', sqlite_file=None, root='.', source='auto'):
+        self.data_index = data_index
+        self.journal = StatusJournal(journal_file)
+        self.interval = interval
+        self.data_dir = data_dir
+        self.output_file = output_file
+        self.sqlite_file = sqlite_file
+        self.root = root
+        self.source = source
+        self.pending = self.journal.replay()
+        self.lock = threading.Lock()
+        self.compact_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+        data_index.on_load = self.apply_to
+
+    def apply_to(self, index):
+        """Apply the pending changes to a freshly loaded index"""
+        for (scope_id, item_number), status in self.pending.copy().items():
+            index.set_status(scope_id, item_number, status)
+
+    def set_status(self, scope_id, item_number, status):
+        """Record and apply a change; False for an unknown item, ValueError for an invalid status"""
+        if status not in STATUSES:
+            raise ValueError(f"status must be one of {', '.join(STATUSES)}")
+        index = self.data_index.get()
+        with self.lock:
+            if not index.has_item(scope_id, item_number):
+                return False
+            self.journal.append(scope_id, item_number, status)
+            self.pending[(scope_id, item_number)] = status
+            pending = len(self.pending)
+        index.set_status(scope_id, item_number, status)
+        # An index loaded while this change was recorded may not have it yet
+        current = self.data_index.get()
+        if current is not index:
+            current.set_status(scope_id, item_number, status)
+        if pending >= COMPACT_BATCH:
+            self.wake.set()
+        return True
+
+    def status_of(self, scope_id, item_number):
+        """Pending status of an item, or None when it has no change waiting for write-back"""
+        return self.pending.get((scope_id, item_number))
+
+    def compact(self):
+        """Write the pending changes back to the source files and rebuild data.json; returns the number written"""
+        with self.compact_lock:
+            batch = self.pending.copy()
+            if not batch:
+                return 0
+
+            source = self.source
+            if source == 'auto':
+                source = detect_source(os.path.join(os.path.dirname(self.output_file), MANIFEST_FILE))
+            by_scope = {}
+            for (scope_id, item_number), status in batch.items():
+                by_scope.setdefault(scope_id, {})[item_number] = status
+            for scope_id, statuses in by_scope.items():
+                discipline = DISCIPLINE_FILES.get(scope_id)
+                if discipline is None:
+                    print(f"Status: unknown scope {scope_id}, dropping {len(statuses)} changes")
+                    continue
+                if source == '40th':
+                    path = os.path.normpath(os.path.join(self.root, discipline['file_40th']))
+                    missing = write_40th_statuses(path, statuses)
+                else:
+                    path = os.path.join(self.data_dir, discipline['csv'])
+                    missing = write_csv_statuses(path, statuses)
+                if missing:
+                    print(f"Status: items {', '.join(missing)} not found in {path}, dropping their changes")
+            rebuild_data_json(source, self.output_file, self.sqlite_file, self.root)
+
+            with self.lock:
+                for key, status in batch.items():
+                    if self.pending.get(key) == status:
+                        del self.pending[key]
+                self.journal.rewrite(self.pending)
+            print(f"Status: wrote {len(batch)} changes back to the {source} inputs")
+            return len(batch)
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='status-compaction', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Compact whatever is pending and stop the background thread"""
+        self.stopped.set()
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.journal.close()
+
+    def _run(self):
+        while True:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            if self.pending:
+                try:
+                    self.compact()
+                except Exception:
+                    print("Status: writing changes back failed; they stay in the journal and are retried")
+                    traceback.print_exc()
+            if self.stopped.is_set():
+                break
@@ -0,0 +1,237 @@
+import argparse
+import csv
+import json
+import os
+import random
+
+# Discipline layouts of the real project files
+DISCIPLINES = {
+    'electrical': {
+        'name': 'Electrical',
+        'division': '26',
+        'csv': '26 00 00 - Electrical_BidItems.csv',
+        'categories_txt': 'electrical.txt',
+        'package_bid_items': 'elec_package_bid items.txt',
+        'package_specs': 'elec_package.txt',
+        'file_40th': '40th_E.json',
+        'sheet_prefixes': ['E', 'E-', 'ES', 'EL', 'EP', 'FA', 'T']
+    },
+    'mechanical': {
+        'name': 'Mechanical',
+        'division': '23',
+        'csv': '23 00 00 - Mechanical_BidItems.csv',
+        'categories_txt': 'mechanical.txt',
+        'package_bid_items': 'mech_package_bid items.txt',
+        'package_specs': 'mech_package.txt',
+        'file_40th': '40th_M.json',
+        'sheet_prefixes': ['M', 'M-', 'MH', 'MP', 'H']
+    },
+    'plumbing': {
+        'name': 'Plumbing',
+        'division': '22',
+        'csv': '22 00 00 - Plumbing_BidItems.csv',
+        'categories_txt': 'plumbing.txt',
+        'package_bid_items': 'plumb_package_bid items.txt',
+        'package_specs': 'plumbing_package.txt',
+        'file_40th': '40th_P.json',
+        'sheet_prefixes': ['P', 'P-', 'PL', 'FP']
+    }
+}
+
+# Sheets of other trades that show up in every discipline's references
+SHARED_SHEET_PREFIXES = ['A', 'C', 'CIV', 'G', 'S', 'L', 'D', 'ID']
+
+WORDS = [
+    'Furnish', 'Install', 'Provide', 'Conduit', 'Raceway', 'Panelboard', 'Feeder', 'Branch', 'Circuit',
+    'Lighting', 'Fixture', 'Control', 'Ductwork', 'Diffuser', 'Damper', 'Boiler', 'Chiller', 'Pump',
+    'Valve', 'Piping', 'Domestic', 'Water', 'Sanitary', 'Vent', 'Storm', 'Drain', 'Insulation',
+    'Testing', 'Balancing', 'Seismic', 'Support', 'Hanger', 'Fire', 'Alarm', 'Grounding', 'Roof',
+    'Floor', 'Level', 'Basement', 'Site', 'Utility', 'Temporary', 'Service', 'Equipment', 'Schedule'
+]
+SHEET_WORDS = ['Plan', 'Floor', 'Enlarged', 'Details', 'Schedules', 'Riser', 'Diagram', 'Sections',
+               'Roof', 'Site', 'Notes', 'Legends', 'Demolition', 'Elevations', 'Level']
+PACKAGE_WORDS = ['Site', 'Distribution', 'Lighting', 'Controls', 'Equipment', 'Piping', 'Fixtures',
+                 'Systems', 'Testing', 'Safety', 'Rough-In', 'Finishes']
+STATUSES = ['Pending'] * 8 + ['Yes', 'No']
+
+PROJECT_NAME = 'Synthetic Benchmark Project'
+PACKAGES_PER_DISCIPLINE = 12
+CATEGORIES_PER_DISCIPLINE = 15
+
+def split_items(total):
+    """Share total bid items between the disciplines"""
+    count = len(DISCIPLINES)
+    return {discipline: total // count + (1 if i < total % count else 0)
+            for i, discipline in enumerate(DISCIPLINES)}
+
+class DisciplineVocabulary:
+    """Sheets, specs, packages and categories one synthetic discipline draws from"""
+
+    def __init__(self, discipline, config, items, rng):
+        self.config = config
+        # Reference pools grow with the dataset, like a bigger drawing set
+        sheet_count = max(50, items // 20)
+        spec_count = max(30, items // 50)
+
+        self.sheets = []
+        prefixes = config['sheet_prefixes'] + SHARED_SHEET_PREFIXES
+        for i in range(sheet_count):
+            prefix = prefixes[i % len(prefixes)]
+            number = f"{prefix}{100 + i // len(prefixes)}"
+            name = ' '.join(rng.sample(SHEET_WORDS, 3))
+            self.sheets.append((number, name))
+
+        division = config['division']
+        self.specs = []
+        for i in range(spec_count):
+            code = f"{division} {5 + i // 40:02d} {10 + i % 40 * 2:02d}"
+            title = ' '.join(rng.sample(WORDS, 3))
+            self.specs.append((code, title))
+
+        self.packages = [f"{config['name']} {' & '.join(rng.sample(PACKAGE_WORDS, 2))} {i + 1}"
+                         for i in range(PACKAGES_PER_DISCIPLINE)]
+        self.categories = [f"{config['name']} {rng.choice(PACKAGE_WORDS)} Category {i + 1}"
+                           for i in range(CATEGORIES_PER_DISCIPLINE)]
+
+class SyntheticItem:
+    __slots__ = ('number', 'description', 'status', 'sheets', 'specs', 'package', 'category')
+
+def iter_items(discipline, vocabulary, items, rng):
+    """Yield the synthetic bid items of one discipline; item 1 is the document references row"""
+    name = vocabulary.config['name']
+    for number in range(1, items + 1):
+        item = SyntheticItem()
+        item.number = number
+        if number == 1:
+            item.description = f"All Document References for {name}"
+        else:
+            item.description = f"{' '.join(rng.sample(WORDS, rng.randint(3, 8)))} #{number}"
+        item.status = rng.choice(STATUSES)
+        item.sheets = rng.sample(vocabulary.sheets, rng.randint(0, min(8, len(vocabulary.sheets))))
+        item.specs = rng.sample(vocabulary.specs, rng.randint(0, min(4, len(vocabulary.specs))))
+        item.package = vocabulary.packages[number % len(vocabulary.packages)] if number > 1 else 'others'
+        item.category = vocabulary.categories[number % len(vocabulary.categories)]
+        yield item
+
+def _write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+def write_discipline(root, discipline, config, items, rng):
+    """Write every input file of one discipline and return its item count"""
+    data_dir = os.path.join(root, 'Data')
+    vocabulary = DisciplineVocabulary(discipline, config, items, rng)
+
+    package_bid_items = {}
+    category_lines = ['Item #\tBid Item Description\tCategory']
+    items_40th = []
+    grps_bid_items = {}
+
+    # Bid items export: "Project Name" row, blank row, then every cell quoted and tab-prefixed
+    with open(os.path.join(data_dir, config['csv']), 'w', encoding='utf-8-sig', newline='') as f:
+        f.write(f'"Project Name:","{PROJECT_NAME}"\n\n')
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL, lineterminator='\n')
+        writer.writerow(['Item #', 'Bid Item Description', 'Status', 'Drawing Reference', 'Specification Reference'])
+        for item in iter_items(discipline, vocabulary, items, rng):
+            writer.writerow(['\t' + value for value in (
+                str(item.number),
+                item.description,
+                item.status,
+                ','.join(f"{number} - {name}" for number, name in item.sheets),
+                ','.join(f"{code} - {title}" for code, title in item.specs)
+            )])
+
+            package_bid_items[str(item.number)] = (item.description, item.package)
+            category_lines.append(f"{item.number}\t{item.description}\t{item.category}")
+
+            sheet = item.sheets[0] if item.sheets else ('', '')
+            spec = item.specs[0] if item.specs else ('', '')
+            items_40th.append({
+                'id': item.number,
+                'bid item': item.description,
+                'sheet number': sheet[0],
+                'sheet name': sheet[1],
+                'spec code': spec[0],
+                'spec name': spec[1],
+                'grouping text': item.category
+            })
+
+            grps_bid_items[item.description] = {
+                'id': item.number,
+                'sheets': [[name, number] for number, name in item.sheets],
+                'specs': [[code, title] for code, title in item.specs]
+            }
+
+    with open(os.path.join(data_dir, config['categories_txt']), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(category_lines) + '\n')
+
+    # Package mappings, in each discipline's own format
+    if discipline == 'electrical':
+        mapping = {number: package for number, (_, package) in package_bid_items.items()}
+    else:
+        group_key = 'group' if discipline == 'mechanical' else 'category'
+        mapping = {'bid_items': [
+            {'item_number': number, 'description': description, group_key: package}
+            for number, (description, package) in package_bid_items.items()
+        ]}
+    _write_json(os.path.join(data_dir, config['package_bid_items']), mapping)
+
+    package_specs = {}
+    for i, package in enumerate(vocabulary.packages):
+        specs = vocabulary.specs[i::len(vocabulary.packages)]
+        if discipline == 'plumbing':
+            package_specs[package] = [{'code': code, 'title': title} for code, title in specs]
+        else:
+            key = f"Package {i + 1}: {package}" if discipline == 'electrical' else package
+            package_specs[key] = [f"{code} - {title}" for code, title in specs]
+    _write_json(os.path.join(data_dir, config['package_specs']), package_specs)
+
+    _write_json(os.path.join(root, config['file_40th']), items_40th)
+
+    write_grps_files(data_dir, discipline, grps_bid_items, rng)
+    return items
+
+def write_grps_files(data_dir, discipline, grps_bid_items, rng):
+    """GRPS bid, contract and scope item files; contract item IDs follow the bid item IDs"""
+    _write_json(os.path.join(data_dir, f'grps_{discipline}_bid_items.json'), grps_bid_items)
+
+    if discipline == 'electrical':
+        contract_items = {str(item['id']): f"Contractor shall {description.lower()}"
+                          for description, item in grps_bid_items.items()}
+    elif discipline == 'mechanical':
+        contract_items = {f"Contractor shall {description.lower()}": item
+                          for description, item in grps_bid_items.items()}
+    else:
+        contract_items = {description: f"Contractor shall {description.lower()}"
+                          for description in grps_bid_items}
+    _write_json(os.path.join(data_dir, f'grps_{discipline}_contract_items.json'), contract_items)
+
+    item_count = len(grps_bid_items)
+    scope_items = {}
+    for scope_item_id in range(1, max(1, item_count // 10) + 1):
+        combined_from = sorted(rng.sample(range(1, item_count + 1), min(item_count, rng.randint(1, 12))))
+        scope_items[f"{discipline.title()} Scope Item {scope_item_id}"] = {
+            'scope_item_id': scope_item_id,
+            'combined_from': combined_from
+        }
+    _write_json(os.path.join(data_dir, f'grps_{discipline}_scope_items.json'), scope_items)
+
+def write_synthetic_dataset(root, total_items, seed=0):
+    """Write a project tree (Data/ plus 40th_*.json) with total_items bid items across the disciplines"""
+    os.makedirs(os.path.join(root, 'Data'), exist_ok=True)
+    rng = random.Random(seed)
+    counts = split_items(total_items)
+    for discipline, config in DISCIPLINES.items():
+        write_discipline(root, discipline, config, counts[discipline], rng)
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Write a synthetic project dataset for benchmarking')
+    parser.add_argument('root', help='directory to write Data/ and 40th_*.json into')
+    parser.add_argument('--items', type=int, default=1000, help='total bid items across all disciplines (default: 1000)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+    args = parser.parse_args()
+
+    counts = write_synthetic_dataset(args.root, args.items, args.seed)
+    print(f"Wrote {args.items} bid items to {args.root}: "
+          + ', '.join(f"{discipline} {count}" for discipline, count in counts.items()))